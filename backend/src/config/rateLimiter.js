@@ -1,5 +1,6 @@
 const rateLimit = require('express-rate-limit');
 const logger = require('./logger');
+const { recordRateLimitRejection } = require('../utilities/metrics');
 
 /**
  * Rate limiting configurations for different route groups
@@ -24,6 +25,7 @@ const logger = require('./logger');
  *
  * All rate limiters include:
  * - Detailed logging of rate limit violations
+ * - A count of rejections per limiter, exposed at /metrics
  * - Standard HTTP headers for rate limit information
  * - Custom error responses with retry-after information
  */
@@ -39,6 +41,7 @@ const generalApiLimiter = rateLimit({
   standardHeaders: true, // Return rate limit info in the `RateLimit-*` headers
   legacyHeaders: false, // Disable the `X-RateLimit-*` headers
   handler: (req, res) => {
+    recordRateLimitRejection('general');
     logger.warn('Rate limit exceeded', {
       ip: req.ip,
       path: req.path,
@@ -62,6 +65,7 @@ const adminApiLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   handler: (req, res) => {
+    recordRateLimitRejection('admin');
     logger.warn('Admin rate limit exceeded', {
       ip: req.ip,
       path: req.path,
@@ -85,6 +89,7 @@ const userApiLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   handler: (req, res) => {
+    recordRateLimitRejection('user');
     logger.warn('User API rate limit exceeded', {
       ip: req.ip,
       path: req.path,
@@ -108,6 +113,7 @@ const healthCheckLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   handler: (req, res) => {
+    recordRateLimitRejection('health_check');
     logger.warn('Health check rate limit exceeded', {
       ip: req.ip,
       path: req.path,
@@ -131,6 +137,7 @@ const externalApiLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   handler: (req, res) => {
+    recordRateLimitRejection('external');
     logger.warn('External API rate limit exceeded', {
       ip: req.ip,
       path: req.path,
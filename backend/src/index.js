@@ -8,6 +8,10 @@ const cors = require('cors');
 const cookieParser = require('cookie-parser');
 const compression = require('compression');
 const logger = require('./config/logger');
+const { serverTiming } = require('./utilities/serverTiming');
+const { metricsMiddleware } = require('./utilities/metrics');
+// Registers the cache and process collectors with the metrics registry
+require('./utilities/metricsCollectors');
 const {
   generalApiLimiter,
   adminApiLimiter,
@@ -23,10 +27,15 @@ const copilotRoutes = require('./routes/copilot');
 const userRoutes = require('./routes/user');
 const addressbookRoutes = require('./routes/addressBook');
 const alertsRoutes = require('./routes/alerts');
+const metricsRoutes = require('./routes/metrics');
 
 const app = express();
 const port = process.env.PORT || 5001;
 
+// Record latency and bytes per route. Mounted first so that latency covers
+// the whole request and response bytes are counted after compression.
+app.use(metricsMiddleware);
+
 app.use(
   compression({
     filter: (req, res) => {
@@ -79,6 +88,11 @@ app.use(
 
 app.use(cookieParser());
 
+// Collect per-stage timings for the Server-Timing header. Mounted after the
+// body parsers, which resume the request from stream events and would lose
+// the timing context otherwise.
+app.use(serverTiming);
+
 // Apply rate limiting middleware before mounting routes
 // Note: Health endpoint has its own rate limiter applied directly in the route
 app.use('/api', generalApiLimiter, apiRoutes);
@@ -89,6 +103,13 @@ app.use('/user/api', userApiLimiter, userRoutes);
 app.use('/addressbook/api', userApiLimiter, addressbookRoutes);
 app.use('/alerts/api', externalApiLimiter, alertsRoutes);
 
+// Prometheus scrape endpoint, left out of rate limiting so scrapes never fail.
+// It is not authenticated, so it is only mounted with METRICS_ENABLED=true,
+// for deployments where the backend port is not reachable publicly.
+if (process.env.METRICS_ENABLED === 'true') {
+  app.use('/metrics', metricsRoutes);
+}
+
 // Error handling
 process.on('uncaughtException', error => {
   logger.error('Uncaught Exception:', { error });
@@ -1,9 +1,24 @@
 const logger = require('../config/logger');
 const express = require('express');
 const addressBookService = require('../services/addressBookService');
+const { streamRows } = require('../utilities/streamRows');
 
 const router = express.Router();
 
+// Maximum number of identifiers accepted by one bulk request
+const MAX_BULK_IDENTIFIERS = 50000;
+
+const BULK_FIELDS = [
+  'input',
+  'found',
+  'username',
+  'email',
+  'accountID',
+  'avatarUrl',
+  'url',
+  'fullname',
+];
+
 // GET /addressbook/api/request
 router.get('/request', async (req, res) => {
   try {
@@ -30,4 +45,43 @@ router.get('/request', async (req, res) => {
   }
 });
 
+// POST /addressbook/api/request/bulk
+// Body: { "q": ["username", "email", ...] } (or a bare array / comma-separated string)
+// Streams one NDJSON line per unique identifier
+router.post('/request/bulk', async (req, res) => {
+  try {
+    const query = Array.isArray(req.body) ? req.body : req.body?.q;
+
+    let input = [];
+    if (Array.isArray(query)) {
+      input = query.flatMap(v => String(v).split(','));
+    } else if (typeof query === 'string') {
+      input = query.split(',');
+    }
+
+    input = input.map(v => v.trim()).filter(Boolean);
+
+    if (input.length === 0) {
+      return res.status(400).json({ error: 'Missing input' });
+    }
+
+    if (input.length > MAX_BULK_IDENTIFIERS) {
+      return res.status(413).json({
+        error: `Too many identifiers (maximum ${MAX_BULK_IDENTIFIERS})`,
+      });
+    }
+
+    const results = await addressBookService.resolveAddressBookEntries(input);
+    await streamRows(res, results, { format: 'ndjson', fields: BULK_FIELDS });
+  } catch (error) {
+    logger.error('Error resolving addressbook users in bulk', {
+      error: error.message,
+    });
+    if (res.headersSent) {
+      return res.destroy(error);
+    }
+    return res.status(500).json({ error: 'Internal Server Error' });
+  }
+});
+
 module.exports = router;
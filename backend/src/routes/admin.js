@@ -1,10 +1,15 @@
 const express = require('express');
 const s3Service = require('../services/s3Service');
 const techRadarService = require('../services/techRadarService');
+const bannerService = require('../services/bannerService');
 const logger = require('../config/logger');
 const {
-  updateTechnologyInArray,
-} = require('../utilities/updateTechnologyInArray');
+  buildRenameLookup,
+  normaliseProjectTechnologies,
+} = require('../utilities/normaliseTechnologies');
+const {
+  getProjectsUsingTechnologies,
+} = require('../utilities/technologyIndex');
 const { verifyJwt, requireAdmin } = require('../services/cognitoService');
 
 const router = express.Router();
@@ -24,6 +29,7 @@ router.use(requireAdmin);
  * @returns {Object} Success message or error response
  * @returns {string} response.message - Success confirmation message
  * @throws {Error} 400 - If entries data is invalid
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
  * @throws {Error} 500 - If update operation fails
  */
 router.post('/tech-radar/update', async (req, res) => {
@@ -35,7 +41,7 @@ router.post('/tech-radar/update', async (req, res) => {
     if (error.message.includes('Invalid')) {
       return res.status(400).json({ error: error.message });
     }
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
@@ -46,49 +52,43 @@ router.post('/tech-radar/update', async (req, res) => {
  * @param {Object} req.body.banner - Banner object with message, pages, and show properties
  * @returns {Object} Success message or error response
  * @throws {Error} 400 - If banner data is invalid
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
  * @throws {Error} 500 - If update operation fails
  */
 router.post('/banners/update', async (req, res) => {
   try {
     const { banner } = req.body;
-
-    // Validate banner data
-    if (
-      !banner ||
-      !banner.message ||
-      !Array.isArray(banner.pages) ||
-      banner.pages.length === 0
-    ) {
-      return res.status(400).json({ error: 'Invalid banner data' });
-    }
-
-    let messagesData;
-
-    try {
-      // Try to get existing messages.json file
-      messagesData = await s3Service.getObject('main', 'messages.json');
-    } catch (error) {
-      // If file doesn't exist, create a new structure
-      messagesData = { messages: [] };
-      logger.error('Creating new messages.json file: ', error);
-    }
-
-    // Add the new banner to messages
-    messagesData.messages.push({
-      title: banner.title || '',
-      message: banner.message,
-      description: banner.message, // For backwards compatibility
-      type: banner.type || 'info',
-      pages: banner.pages,
-      show: banner.show !== false, // Default to true if not explicitly set to false
-    });
-
-    // Save the updated data
-    await s3Service.putObject('main', 'messages.json', messagesData);
+    await bannerService.mutate([{ action: 'add', banner }]);
     res.json({ message: 'Banner added successfully' });
   } catch (error) {
     logger.error('Error updating banner messages:', { error: error.message });
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
+  }
+});
+
+/**
+ * Endpoint for applying several banner changes at once. The operations are
+ * applied in order to a single read of messages.json and written back with
+ * one conditional put, which is retried if another change got there first.
+ * @route POST /admin/api/banners/batch
+ * @param {Object} req.body - The batch data
+ * @param {Object[]} req.body.operations - Operations, each one of
+ *   `{action: 'add', banner}`, `{action: 'toggle', index, show}` or
+ *   `{action: 'delete', index}`; indexes refer to the messages as left by the
+ *   previous operations
+ * @returns {Object} Success message and the updated banner messages
+ * @throws {Error} 400 - If an operation is invalid or an index is out of range
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
+ * @throws {Error} 500 - If the batch fails
+ */
+router.post('/banners/batch', async (req, res) => {
+  try {
+    const { operations } = req.body;
+    const { messages } = await bannerService.mutate(operations);
+    res.json({ message: 'Banners updated successfully', messages });
+  } catch (error) {
+    logger.error('Error applying banner operations:', { error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
@@ -123,42 +123,17 @@ router.get('/banners', async (req, res) => {
  * @param {boolean} req.body.show - Whether to show or hide the banner
  * @returns {Object} Success message or error response
  * @throws {Error} 400 - If index is invalid
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
  * @throws {Error} 500 - If toggle operation fails
  */
 router.post('/banners/toggle', async (req, res) => {
   try {
     const { index, show } = req.body;
-
-    if (index === undefined || typeof index !== 'number') {
-      return res.status(400).json({ error: 'Invalid banner index' });
-    }
-
-    let messagesData;
-    try {
-      messagesData = await s3Service.getObject('main', 'messages.json');
-    } catch (error) {
-      logger.error('Error fetching messages:', error);
-      return res.status(400).json({ error: 'Messages file not found' });
-    }
-
-    // Check if index is valid
-    if (
-      !messagesData.messages ||
-      index >= messagesData.messages.length ||
-      index < 0
-    ) {
-      return res.status(400).json({ error: 'Banner index out of range' });
-    }
-
-    // Update the banner visibility
-    messagesData.messages[index].show = show;
-
-    // Save the updated data
-    await s3Service.putObject('main', 'messages.json', messagesData);
+    await bannerService.mutate([{ action: 'toggle', index, show }]);
     res.json({ message: 'Banner visibility updated successfully' });
   } catch (error) {
     logger.error('Error toggling banner visibility:', { error: error.message });
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
@@ -169,42 +144,17 @@ router.post('/banners/toggle', async (req, res) => {
  * @param {number} req.body.index - Index of the banner to delete
  * @returns {Object} Success message or error response
  * @throws {Error} 400 - If index is invalid
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
  * @throws {Error} 500 - If delete operation fails
  */
 router.post('/banners/delete', async (req, res) => {
   try {
     const { index } = req.body;
-
-    if (index === undefined || typeof index !== 'number') {
-      return res.status(400).json({ error: 'Invalid banner index' });
-    }
-
-    let messagesData;
-    try {
-      messagesData = await s3Service.getObject('main', 'messages.json');
-    } catch (error) {
-      logger.error('Error fetching messages:', error);
-      return res.status(400).json({ error: 'Messages file not found' });
-    }
-
-    // Check if index is valid
-    if (
-      !messagesData.messages ||
-      index >= messagesData.messages.length ||
-      index < 0
-    ) {
-      return res.status(400).json({ error: 'Banner index out of range' });
-    }
-
-    // Remove the banner
-    messagesData.messages.splice(index, 1);
-
-    // Save the updated data
-    await s3Service.putObject('main', 'messages.json', messagesData);
+    await bannerService.mutate([{ action: 'delete', index }]);
     res.json({ message: 'Banner deleted successfully' });
   } catch (error) {
     logger.error('Error deleting banner:', { error: error.message });
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
@@ -320,6 +270,70 @@ router.get('/tech-radar', async (req, res) => {
   }
 });
 
+/**
+ * Apply technology renames to new_project_data.json in one pass over the
+ * projects, and write it back once if anything changed. The write is
+ * conditional on the version that was read, so a concurrent change to the
+ * project data is not overwritten. A dry run only counts the renames.
+ * @param {Map<string, {from: string, to: string}>} lookup - Lookup from buildRenameLookup
+ * @param {Object} options - caseInsensitive and dryRun options for normaliseProjectTechnologies
+ * @returns {Promise<{updatedProjects: number, replacements: number, hits: Object<string, number>}>} Rename counts
+ * @throws {Error} With status 500 if the project data cannot be read, or 409 if it changed while being normalised
+ */
+async function normaliseProjectData(lookup, options) {
+  if (options.dryRun) {
+    // Nothing is written, so count the renames on the cached copy, in only the
+    // projects that the technology index says use one of the names
+    const { data } = await s3Service.getCachedObject(
+      'tat',
+      'new_project_data.json',
+      { ttlMs: 0 }
+    );
+    const affected = getProjectsUsingTechnologies(
+      data,
+      Array.from(lookup.values(), ({ from }) => from)
+    );
+    return normaliseProjectTechnologies(affected, lookup, options);
+  }
+
+  let projectData;
+  let etag;
+  try {
+    ({ data: projectData, etag } = await s3Service.getObjectWithETag(
+      'tat',
+      'new_project_data.json'
+    ));
+  } catch (error) {
+    logger.error('Error fetching project data:', { error: error.message });
+    const fetchError = new Error('Failed to fetch project data');
+    fetchError.status = 500;
+    throw fetchError;
+  }
+
+  const result = normaliseProjectTechnologies(
+    projectData.projects,
+    lookup,
+    options
+  );
+
+  if (result.updatedProjects > 0) {
+    try {
+      await s3Service.putObject('tat', 'new_project_data.json', projectData, {
+        ifMatch: etag,
+      });
+    } catch (error) {
+      if (!s3Service.isWriteConflict(error)) throw error;
+      const conflictError = new Error(
+        'Project data was changed by another request, please try again'
+      );
+      conflictError.status = 409;
+      throw conflictError;
+    }
+  }
+
+  return result;
+}
+
 /**
  * Endpoint for normalising technology names in project data.
  * @route POST /admin/api/normalise-technology
@@ -328,6 +342,7 @@ router.get('/tech-radar', async (req, res) => {
  * @param {string} req.body.to - New technology name
  * @returns {Object} Success message or error response
  * @throws {Error} 400 - If data is invalid
+ * @throws {Error} 409 - If the project data changed while being normalised
  * @throws {Error} 500 - If normalisation operation fails
  */
 router.post('/normalise-technology', async (req, res) => {
@@ -341,286 +356,62 @@ router.post('/normalise-technology', async (req, res) => {
         .json({ error: "Both 'from' and 'to' values are required" });
     }
 
-    // Get existing project data
-    let projectData;
+    const { updatedProjects } = await normaliseProjectData(
+      buildRenameLookup([{ from, to }]),
+      {}
+    );
+    res.json({
+      message: 'Technology names normalised successfully',
+      updatedProjects,
+    });
+  } catch (error) {
+    logger.error('Error normalising technology names:', {
+      error: error.message,
+    });
+    res.status(error.status || 500).json({ error: error.message });
+  }
+});
+
+/**
+ * Endpoint for normalising many technology names at once. All renames are
+ * applied in a single pass over the project data, which is written back once.
+ * @route POST /admin/api/normalise-technology/bulk
+ * @param {Object} req.body - The normalisation data
+ * @param {Object<string, string>|Object[]} req.body.mapping - Renames, as a `{from: to}` object or an array of `{from, to}` pairs
+ * @param {boolean} [req.body.caseInsensitive=false] - Match technology names regardless of case
+ * @param {boolean} [req.body.dryRun=false] - Report the renames without saving them
+ * @returns {Object} Success message, counts of updated projects and replaced names, and the number of replacements for each name in the mapping
+ * @throws {Error} 400 - If the mapping is invalid
+ * @throws {Error} 409 - If the project data changed while being normalised
+ * @throws {Error} 500 - If normalisation operation fails
+ */
+router.post('/normalise-technology/bulk', async (req, res) => {
+  try {
+    const { mapping, caseInsensitive = false, dryRun = false } = req.body;
+
+    let lookup;
     try {
-      projectData = await s3Service.getObject('tat', 'new_project_data.json');
+      lookup = buildRenameLookup(mapping, { caseInsensitive });
     } catch (error) {
-      logger.error('Error fetching project data:', { error: error.message });
-      return res.status(500).json({ error: 'Failed to fetch project data' });
+      return res.status(400).json({ error: error.message });
     }
 
-    // Update technology names in project data
-    let updateCount = 0;
-    projectData.projects = projectData.projects.map(project => {
-      let updated = false;
-      const architecture = project.architecture;
-
-      // Update languages
-      if (architecture.languages) {
-        const mainResult = updateTechnologyInArray(
-          architecture.languages.main,
-          from,
-          to
-        );
-        const othersResult = updateTechnologyInArray(
-          architecture.languages.others,
-          from,
-          to
-        );
-
-        if (mainResult.updated) {
-          architecture.languages.main = mainResult.array;
-          updated = true;
-        }
-
-        if (othersResult.updated) {
-          architecture.languages.others = othersResult.array;
-          updated = true;
-        }
-      }
-
-      // Update frameworks
-      const frameworksResult = updateTechnologyInArray(
-        architecture.frameworks?.others,
-        from,
-        to
-      );
-      if (frameworksResult.updated) {
-        architecture.frameworks.others = frameworksResult.array;
-        updated = true;
-      }
-
-      // Update infrastructure
-      const infrastructureResult = updateTechnologyInArray(
-        architecture.infrastructure?.others,
-        from,
-        to
-      );
-      if (infrastructureResult.updated) {
-        architecture.infrastructure.others = infrastructureResult.array;
-        updated = true;
-      }
-
-      // Update CICD
-      const cicdResult = updateTechnologyInArray(
-        architecture.cicd?.others,
-        from,
-        to
-      );
-      if (cicdResult.updated) {
-        architecture.cicd.others = cicdResult.array;
-        updated = true;
-      }
-
-      // Update database
-      if (architecture.database) {
-        const dbMainResult = updateTechnologyInArray(
-          architecture.database.main,
-          from,
-          to
-        );
-        const dbOthersResult = updateTechnologyInArray(
-          architecture.database.others,
-          from,
-          to
-        );
-
-        if (dbMainResult.updated) {
-          architecture.database.main = dbMainResult.array;
-          updated = true;
-        }
-
-        if (dbOthersResult.updated) {
-          architecture.database.others = dbOthersResult.array;
-          updated = true;
-        }
-      }
-
-      // Update supporting tools
-      if (project.supporting_tools) {
-        const supportingTools = project.supporting_tools;
-
-        // Update code_editors
-        if (supportingTools.code_editors) {
-          const codeEditorsMainResult = updateTechnologyInArray(
-            supportingTools.code_editors.main,
-            from,
-            to
-          );
-          const codeEditorsOthersResult = updateTechnologyInArray(
-            supportingTools.code_editors.others,
-            from,
-            to
-          );
-
-          if (codeEditorsMainResult.updated) {
-            supportingTools.code_editors.main = codeEditorsMainResult.array;
-            updated = true;
-          }
-
-          if (codeEditorsOthersResult.updated) {
-            supportingTools.code_editors.others = codeEditorsOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update user_interface
-        if (supportingTools.user_interface) {
-          const uiMainResult = updateTechnologyInArray(
-            supportingTools.user_interface.main,
-            from,
-            to
-          );
-          const uiOthersResult = updateTechnologyInArray(
-            supportingTools.user_interface.others,
-            from,
-            to
-          );
-
-          if (uiMainResult.updated) {
-            supportingTools.user_interface.main = uiMainResult.array;
-            updated = true;
-          }
-
-          if (uiOthersResult.updated) {
-            supportingTools.user_interface.others = uiOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update diagrams
-        if (supportingTools.diagrams) {
-          const diagramsMainResult = updateTechnologyInArray(
-            supportingTools.diagrams.main,
-            from,
-            to
-          );
-          const diagramsOthersResult = updateTechnologyInArray(
-            supportingTools.diagrams.others,
-            from,
-            to
-          );
-
-          if (diagramsMainResult.updated) {
-            supportingTools.diagrams.main = diagramsMainResult.array;
-            updated = true;
-          }
-
-          if (diagramsOthersResult.updated) {
-            supportingTools.diagrams.others = diagramsOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update documentation
-        if (supportingTools.documentation) {
-          const docMainResult = updateTechnologyInArray(
-            supportingTools.documentation.main,
-            from,
-            to
-          );
-          const docOthersResult = updateTechnologyInArray(
-            supportingTools.documentation.others,
-            from,
-            to
-          );
-
-          if (docMainResult.updated) {
-            supportingTools.documentation.main = docMainResult.array;
-            updated = true;
-          }
-
-          if (docOthersResult.updated) {
-            supportingTools.documentation.others = docOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update communication
-        if (supportingTools.communication) {
-          const commMainResult = updateTechnologyInArray(
-            supportingTools.communication.main,
-            from,
-            to
-          );
-          const commOthersResult = updateTechnologyInArray(
-            supportingTools.communication.others,
-            from,
-            to
-          );
-
-          if (commMainResult.updated) {
-            supportingTools.communication.main = commMainResult.array;
-            updated = true;
-          }
-
-          if (commOthersResult.updated) {
-            supportingTools.communication.others = commOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update collaboration
-        if (supportingTools.collaboration) {
-          const collabMainResult = updateTechnologyInArray(
-            supportingTools.collaboration.main,
-            from,
-            to
-          );
-          const collabOthersResult = updateTechnologyInArray(
-            supportingTools.collaboration.others,
-            from,
-            to
-          );
-
-          if (collabMainResult.updated) {
-            supportingTools.collaboration.main = collabMainResult.array;
-            updated = true;
-          }
-
-          if (collabOthersResult.updated) {
-            supportingTools.collaboration.others = collabOthersResult.array;
-            updated = true;
-          }
-        }
-
-        // Update project_tracking and incident_management if they're string values
-        if (
-          typeof supportingTools.project_tracking === 'string' &&
-          supportingTools.project_tracking === from
-        ) {
-          supportingTools.project_tracking = to;
-          updated = true;
-        }
-
-        if (
-          typeof supportingTools.incident_management === 'string' &&
-          supportingTools.incident_management === from
-        ) {
-          supportingTools.incident_management = to;
-          updated = true;
-        }
-      }
-
-      if (updated) {
-        updateCount++;
-      }
-
-      return project;
+    const result = await normaliseProjectData(lookup, {
+      caseInsensitive,
+      dryRun,
     });
-
-    // Save the updated data
-    await s3Service.putObject('tat', 'new_project_data.json', projectData);
     res.json({
-      message: 'Technology names normalised successfully',
-      updatedProjects: updateCount,
+      message: dryRun
+        ? 'Technology normalisation dry run completed'
+        : 'Technology names normalised successfully',
+      dryRun,
+      ...result,
     });
   } catch (error) {
-    logger.error('Error normalising technology names:', {
+    logger.error('Error bulk normalising technology names:', {
       error: error.message,
     });
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
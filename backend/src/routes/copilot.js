@@ -1,10 +1,22 @@
 const logger = require('../config/logger');
 const express = require('express');
 const s3Service = require('../services/s3Service');
+const githubService = require('../services/githubService');
 const { checkCopilotAdminStatus } = require('../utilities/copilotAdminChecker');
 const {
   getTeamsHistoricDataWithCache,
+  queryTeamsHistoric,
 } = require('../utilities/teamsHistoricCache');
+const {
+  GRANULARITIES,
+  queryOrgUsageRollups,
+  sliceOrgUsage,
+} = require('../utilities/copilotUsageRollups');
+const { timeStage } = require('../utilities/serverTiming');
+const {
+  responseCache,
+  sendCompressed,
+} = require('../utilities/compressedResponseCache');
 
 const router = express.Router();
 
@@ -29,18 +41,69 @@ router.get('/auth/status', (req, res) => {
 });
 
 /**
- * Endpoint for fetching Copilot organisation historic usage data from S3.
+ * Parses an optional date query parameter to a day (YYYY-MM-DD).
+ * @param {string} [value] - Date query parameter
+ * @returns {string|undefined|null} The day, undefined if not given, or null if invalid
+ */
+function parseDay(value) {
+  if (value === undefined || value === '') return undefined;
+  const time = Date.parse(value);
+  return isNaN(time) ? null : new Date(time).toISOString().slice(0, 10);
+}
+
+/**
+ * Endpoint for fetching Copilot organisation historic usage data. The data
+ * is cached in memory and revalidated against S3 once the cache TTL expires.
+ * With a granularity, returns daily, weekly (Sunday-start) or monthly
+ * rollups of the code completion and chat metrics instead of the raw data.
+ * The full data is serialised and compressed once per version.
  * @route GET /copilot/api/org/historic
- * @returns {Object} Organisation usage JSON data
+ * @param {string} [granularity] - One of 'day', 'week' or 'month'
+ * @param {string} [since] - First day to include, e.g. 2025-01-01
+ * @param {string} [until] - Last day to include, e.g. 2025-12-31
+ * @returns {Object[]|Object} Organisation usage JSON data (sorted by date if a range is given), or `{granularity, points, totals}`
+ * @throws {Error} 400 - If granularity, since or until is invalid
  * @throws {Error} 500 - If fetching fails
  */
 router.get('/org/historic', async (req, res) => {
+  const { granularity } = req.query;
+  if (granularity !== undefined && !GRANULARITIES.includes(granularity)) {
+    return res.status(400).json({
+      error: `Invalid granularity, expected one of: ${GRANULARITIES.join(', ')}`,
+    });
+  }
+
+  const since = parseDay(req.query.since);
+  const until = parseDay(req.query.until);
+  if (since === null || until === null) {
+    return res.status(400).json({ error: 'Invalid since or until date' });
+  }
+
   try {
-    const data = await s3Service.getObjectViaSignedUrl(
+    const entry = await s3Service.getCachedObject(
       'copilot',
       'historic_usage_data.json'
     );
-    res.json(data);
+    const { data } = entry;
+
+    if (granularity) {
+      return res.json(
+        timeStage('query', () =>
+          queryOrgUsageRollups(data, { granularity, since, until })
+        )
+      );
+    }
+    if (since || until) {
+      return res.json(
+        timeStage('query', () => sliceOrgUsage(data, { since, until }))
+      );
+    }
+    const response = await responseCache.get(
+      '/copilot/api/org/historic',
+      entry.etag ?? entry.fetchedAt,
+      () => JSON.stringify(data)
+    );
+    sendCompressed(req, res, response);
   } catch (error) {
     logger.error('Error fetching JSON:', { error: error.message });
     res.status(500).json({ error: error.message });
@@ -48,10 +111,17 @@ router.get('/org/historic', async (req, res) => {
 });
 
 /**
- * Endpoint for fetching all teams' historic usage data from S3.
+ * Endpoint for fetching teams' historic usage data from S3. Copilot admins
+ * can see all teams; other users only their own teams. Each team's daily
+ * usage is sorted by date, and can be limited to a date range.
  * @route GET /copilot/api/teams/historic
- * @returns {Object} All teams historic usage JSON data
+ * @param {string|string[]} [teams] - Slugs of the teams to return, comma-separated or repeated
+ * @param {string} [since] - First day to include, e.g. 2025-01-01
+ * @param {string} [until] - Last day to include, e.g. 2025-01-31
+ * @returns {Object[]} Teams historic usage data, `[{team, data}]`
+ * @throws {Error} 400 - If since or until is not a valid date
  * @throws {Error} 401 - If user token is missing
+ * @throws {Error} 403 - If a non-admin requests a team they are not a member of
  * @throws {Error} 500 - If token validation or fetching fails
  */
 router.get('/teams/historic', async (req, res) => {
@@ -61,30 +131,54 @@ router.get('/teams/historic', async (req, res) => {
     return res.status(401).json({ response: 'No user token found' });
   }
 
+  const since = parseDay(req.query.since);
+  const until = parseDay(req.query.until);
+  if (since === null || until === null) {
+    return res.status(400).json({ error: 'Invalid since or until date' });
+  }
+
+  const requested = req.query.teams;
+  const teams = requested
+    ? (Array.isArray(requested) ? requested : [requested])
+        .flatMap(team => String(team).split(','))
+        .map(team => team.trim())
+        .filter(Boolean)
+    : undefined;
+
   try {
     // Validate token by checking copilot admin status
     // This will throw an error if the token is invalid
     const adminStatus = await checkCopilotAdminStatus(userToken);
 
+    // Non-admins can only see data for their own teams
+    let selectedTeams = teams;
+    if (!adminStatus.isAdmin) {
+      if (teams) {
+        const forbidden = teams.filter(
+          team => !adminStatus.userTeamSlugs.includes(team)
+        );
+        if (forbidden.length > 0) {
+          return res.status(403).json({
+            error: `User is not a member of the team(s): ${forbidden.join(', ')}`,
+          });
+        }
+      } else {
+        selectedTeams = adminStatus.userTeamSlugs;
+      }
+    }
+
     // Fetch the cached data (contains all teams)
     const copilotBucketName =
       process.env.COPILOT_BUCKET_NAME || 'sdp-dev-copilot-usage-dashboard';
-    const fullData = await getTeamsHistoricDataWithCache(copilotBucketName);
-
-    // Filter data based on permissions
-    let filteredData;
-    if (adminStatus.isAdmin) {
-      // Admin can see data for all teams
-      filteredData = fullData;
-    } else {
-      // Non-admin can only see data for their own teams
-      const userTeamSlugs = adminStatus.userTeamSlugs;
-      filteredData = fullData.filter(teamEntry =>
-        userTeamSlugs.includes(teamEntry.team?.slug)
-      );
-    }
+    const fullData = await timeStage('teams_cache', () =>
+      getTeamsHistoricDataWithCache(copilotBucketName)
+    );
 
-    res.json(filteredData);
+    res.json(
+      timeStage('query', () =>
+        queryTeamsHistoric(fullData, { teams: selectedTeams, since, until })
+      )
+    );
   } catch (error) {
     logger.error('Error fetching teams historic JSON:', {
       error: error.message,
@@ -146,6 +240,57 @@ router.get('/teams', async (req, res) => {
   }
 });
 
+/**
+ * Endpoint for fetching the members of several teams in one request.
+ * Copilot admins can request any team; other users only their own teams.
+ * @route POST /copilot/api/teams/members
+ * @param {string[]} req.body.teams - Slugs of the teams to fetch members for
+ * @returns {Object} Team members keyed by team slug
+ * @throws {Error} 400 - If no teams are given
+ * @throws {Error} 401 - If user token is missing
+ * @throws {Error} 403 - If a non-admin requests a team they are not a member of
+ * @throws {Error} 500 - If fetching fails
+ */
+router.post('/teams/members', async (req, res) => {
+  const userToken = req.cookies?.githubUserToken;
+
+  if (!userToken) {
+    return res.status(401).json({ error: 'Missing GitHub user token' });
+  }
+
+  const requested = req.body?.teams;
+  const teams = (Array.isArray(requested) ? requested : [requested])
+    .filter(team => typeof team === 'string')
+    .flatMap(team => team.split(','))
+    .map(team => team.trim())
+    .filter(Boolean);
+
+  if (teams.length === 0) {
+    return res.status(400).json({ error: 'Missing teams' });
+  }
+
+  try {
+    const adminStatus = await checkCopilotAdminStatus(userToken);
+
+    if (!adminStatus.isAdmin) {
+      const forbidden = teams.filter(
+        team => !adminStatus.userTeamSlugs.includes(team)
+      );
+      if (forbidden.length > 0) {
+        return res.status(403).json({
+          error: `User is not a member of the team(s): ${forbidden.join(', ')}`,
+        });
+      }
+    }
+
+    const members = await githubService.getMembersOfTeams(teams);
+    res.json(members);
+  } catch (error) {
+    logger.error('Error fetching team members:', { error: error.message });
+    res.status(500).json({ error: error.message });
+  }
+});
+
 /**
  * Endpoint for exchanging GitHub OAuth code for access token.
  * @route POST /copilot/api/github/oauth/token
@@ -212,6 +357,9 @@ router.post('/github/oauth/token', async (req, res) => {
  * @returns {Object} Success response
  */
 router.post('/github/oauth/logout', (req, res) => {
+  if (req.cookies?.githubUserToken) {
+    githubService.clearUserTeams(req.cookies.githubUserToken);
+  }
   res.clearCookie('githubUserToken', {
     httpOnly: true,
     secure: process.env.NODE_ENV === 'production',
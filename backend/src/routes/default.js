@@ -1,57 +1,202 @@
 const express = require('express');
 const s3Service = require('../services/s3Service');
+const bannerService = require('../services/bannerService');
 const logger = require('../config/logger');
 const {
-  transformProjectsToCSVFormat,
-} = require('../utilities/projectDataTransformer');
+  getProjectCsvData,
+  serialiseProjectCsvData,
+  iterateProjectCsvRows,
+} = require('../utilities/projectCsvCache');
+const {
+  STREAM_FORMATS,
+  parseFields,
+  streamRows,
+} = require('../utilities/streamRows');
+const {
+  calculateRepositoryStatistics,
+  getRepositoryStatsIndex,
+  queryRepositoryStats,
+} = require('../utilities/repositoryStatsIndex');
+const {
+  findRepositoriesByName,
+  parseRepositoryNames,
+} = require('../utilities/repositoryNameIndex');
+const {
+  getTechnologyIndex,
+  findProjectsByTechnology,
+  parseTechnologyNames,
+} = require('../utilities/technologyIndex');
+const {
+  getInstallationTokenMetrics,
+} = require('../utilities/getAppAndInstallation');
 const { healthCheckLimiter } = require('../config/rateLimiter');
+const { timeStage } = require('../utilities/serverTiming');
+const {
+  responseCache,
+  sendCompressed,
+} = require('../utilities/compressedResponseCache');
 
 const router = express.Router();
 
 /**
  * Endpoint for fetching project data and converting it to CSV format.
+ * The transformed body is built once per version of new_project_data.json and
+ * served from memory, with gzip and brotli copies built once per version.
+ * Requests for other formats or a subset of fields are streamed row by row.
  * @route GET /api/csv
+ * @param {string} [format] - Optional 'json' (default), 'csv' or 'ndjson'
+ * @param {string} [fields] - Optional comma-separated list of columns to return
  * @returns {Object[]} Array of objects containing parsed project data in CSV format
+ * @throws {Error} 400 - If the format or fields are invalid
  * @throws {Error} 500 - If data fetching or processing fails
  */
 router.get('/csv', async (req, res) => {
   try {
-    const jsonData = await s3Service.getObjectViaSignedUrl(
+    const { format = 'json', fields } = req.query;
+    if (!STREAM_FORMATS.includes(format)) {
+      return res.status(400).json({ error: `Invalid format: ${format}` });
+    }
+
+    const entry = await s3Service.getCachedObject(
       'tat',
       'new_project_data.json'
     );
 
-    // Transform JSON data to CSV format using the utility function that handles reverse dependencies
-    const transformedData = transformProjectsToCSVFormat(jsonData.projects);
+    // Transformed rows (including reverse dependencies) are rebuilt only when the source changes
+    const csvData = await timeStage('transform', () =>
+      getProjectCsvData(entry)
+    );
+
+    if (format !== 'json' || fields) {
+      let selectedFields;
+      try {
+        selectedFields = parseFields(fields, csvData.columns);
+      } catch (error) {
+        return res.status(400).json({ error: error.message });
+      }
+
+      if (format === 'csv') {
+        res.attachment('projects.csv');
+      }
+      res.set('Vary', 'Accept-Encoding');
+
+      return await streamRows(res, iterateProjectCsvRows(csvData), {
+        format,
+        fields: selectedFields,
+      });
+    }
 
-    res.status(200).json(transformedData);
+    const response = await responseCache.get('/api/csv', csvData.etag, () =>
+      serialiseProjectCsvData(csvData)
+    );
+    sendCompressed(req, res, response);
   } catch (error) {
     logger.error('Error fetching and transforming project data:', {
       error: error.message,
     });
+    if (res.headersSent) {
+      return res.destroy(error);
+    }
     res.status(500).json({ error: error.message });
   }
 });
 
 /**
  * Endpoint for fetching tech radar JSON data from S3. The tech data that goes on the radar and states where it belongs on the radar.
+ * The radar is revalidated against S3 on every request, and its serialised
+ * and compressed bodies are rebuilt only when it has changed.
  * @route GET /api/tech-radar/json
  * @returns {Object} The tech radar configuration data
  * @throws {Error} 500 - If JSON fetching fails
  */
 router.get('/tech-radar/json', async (req, res) => {
   try {
-    const jsonData = await s3Service.getObjectViaSignedUrl(
+    const entry = await s3Service.getCachedObject(
       'main',
-      'onsRadarSkeleton.json'
+      'onsRadarSkeleton.json',
+      { ttlMs: 0 }
+    );
+    const response = await responseCache.get(
+      '/api/tech-radar/json',
+      entry.etag ?? entry.fetchedAt,
+      () => JSON.stringify(entry.data)
     );
-    res.json(jsonData);
+    sendCompressed(req, res, response);
   } catch (error) {
     logger.error('Error fetching JSON:', { error: error.message });
     res.status(500).json({ error: error.message });
   }
 });
 
+/**
+ * Endpoint for fetching how many projects use each technology. Counts come
+ * from an inverted index built once per version of new_project_data.json.
+ * @route GET /api/technologies
+ * @returns {Object} response.technologies - Technologies sorted by number of projects, each with its spellings and per-field usage counts
+ * @throws {Error} 500 - If data fetching fails
+ */
+router.get('/technologies', async (req, res) => {
+  try {
+    const { data } = await s3Service.getCachedObject(
+      'tat',
+      'new_project_data.json'
+    );
+    const { summary } = timeStage('index', () => getTechnologyIndex(data));
+    res.json({ technologies: summary });
+  } catch (error) {
+    logger.error('Error fetching technology usage:', { error: error.message });
+    res.status(500).json({ error: error.message });
+  }
+});
+
+/**
+ * Endpoint for fetching the projects that use given technologies. Each
+ * technology is one lookup in the technology index, matched regardless of
+ * case, so the cost depends only on the size of the result.
+ * @route GET /api/technologies/projects
+ * @param {string|string[]} technology - Technology names, comma-separated or repeated
+ * @returns {Object} response.technologies - For each technology in use, its project count and the projects and fields using it
+ * @returns {string[]} response.not_found - Requested technologies that no project uses
+ * @throws {Error} 400 - If no technology is given
+ * @throws {Error} 500 - If data fetching fails
+ */
+router.get('/technologies/projects', async (req, res) => {
+  try {
+    const names = parseTechnologyNames(req.query.technology);
+    if (names.length === 0) {
+      return res
+        .status(400)
+        .json({ error: 'At least one technology is required' });
+    }
+
+    const { data } = await s3Service.getCachedObject(
+      'tat',
+      'new_project_data.json'
+    );
+    const { found, notFound } = timeStage('lookup', () =>
+      findProjectsByTechnology(data, names)
+    );
+
+    res.json({
+      technologies: found.map(
+        ({ technology, variants, count, fields, projects }) => ({
+          technology,
+          variants,
+          count,
+          fields,
+          projects,
+        })
+      ),
+      not_found: notFound,
+    });
+  } catch (error) {
+    logger.error('Error fetching projects by technology:', {
+      error: error.message,
+    });
+    res.status(500).json({ error: error.message });
+  }
+});
+
 /**
  * Endpoint for fetching repository statistics.
  * @route GET /api/json
@@ -66,74 +211,17 @@ router.get('/tech-radar/json', async (req, res) => {
 router.get('/json', async (req, res) => {
   try {
     const { datetime, archived } = req.query;
-    const jsonData = await s3Service.getObjectViaSignedUrl(
+    const { data: jsonData } = await s3Service.getCachedObject(
       'main',
       'repositories.json'
     );
 
-    // First filter by date if provided
-    let filteredRepos = jsonData.repositories;
-
-    if (datetime && !isNaN(Date.parse(datetime))) {
-      const targetDate = new Date(datetime);
-      const now = new Date();
-      filteredRepos = jsonData.repositories.filter(repo => {
-        const lastCommitDate = new Date(repo.last_commit);
-        return lastCommitDate >= targetDate && lastCommitDate <= now;
-      });
-    }
-
-    // Then filter by archived status if specified
-    if (archived === 'true') {
-      filteredRepos = filteredRepos.filter(repo => repo.is_archived);
-    } else if (archived === 'false') {
-      filteredRepos = filteredRepos.filter(repo => !repo.is_archived);
-    }
-    // If archived is not specified, use all repos (for total view)
-
-    // Calculate statistics
-    const stats = {
-      total_repos: filteredRepos.length,
-      total_private_repos: filteredRepos.filter(
-        repo => repo.visibility === 'PRIVATE'
-      ).length,
-      total_public_repos: filteredRepos.filter(
-        repo => repo.visibility === 'PUBLIC'
-      ).length,
-      total_internal_repos: filteredRepos.filter(
-        repo => repo.visibility === 'INTERNAL'
-      ).length,
-    };
-
-    // Calculate language statistics
-    const languageStats = {};
-    filteredRepos.forEach(repo => {
-      if (!repo.technologies?.languages) return;
-
-      repo.technologies.languages.forEach(lang => {
-        if (!languageStats[lang.name]) {
-          languageStats[lang.name] = {
-            repo_count: 0,
-            total_percentage: 0,
-            total_size: 0,
-          };
-        }
-        languageStats[lang.name].repo_count++;
-        languageStats[lang.name].total_percentage += lang.percentage;
-        languageStats[lang.name].total_size += lang.size;
-      });
-    });
-
-    // Calculate averages
-    Object.keys(languageStats).forEach(lang => {
-      languageStats[lang] = {
-        repo_count: languageStats[lang].repo_count,
-        average_percentage: +(
-          languageStats[lang].total_percentage / languageStats[lang].repo_count
-        ).toFixed(3),
-        total_size: languageStats[lang].total_size,
-      };
-    });
+    // Answer the date/archived filter combination from the precomputed index
+    const index = timeStage('index', () => getRepositoryStatsIndex(jsonData));
+    const { stats, language_statistics: languageStats } = timeStage(
+      'query',
+      () => queryRepositoryStats(index, { datetime, archived })
+    );
 
     res.json({
       stats,
@@ -151,38 +239,36 @@ router.get('/json', async (req, res) => {
 });
 
 /**
- * Endpoint for fetching specific repository information.
- * @route GET /api/repository/project/json
- * @param {string} repositories - Comma-separated list of repository names to fetch
- * @param {string} [datetime] - Optional ISO date string to filter repositories by last commit date
- * @param {string} [archived] - Optional 'true'/'false' to filter archived repositories
- * @returns {Object} Repository data
- * @returns {Object[]} response.repositories - Array of repository objects with their details
- * @returns {Object} response.stats - Repository statistics
- * @returns {Object} response.language_statistics - Language statistics for the requested repositories
- * @returns {Object} response.metadata - Last updated timestamp and repository request details
- * @throws {Error} 400 - If no repositories are specified
- * @throws {Error} 500 - If repository data fetching fails
+ * Sends repository data and statistics for a set of repository names.
+ * Shared by the GET and POST (bulk) forms of /api/repository/project/json.
+ * @param {Object} res - Express response object
+ * @param {Object} params - Request parameters
+ * @param {string|string[]} params.repositories - Repository names, comma-separated or as an array
+ * @param {string} [params.datetime] - Optional ISO date string to filter repositories by last commit date
+ * @param {string} [params.archived] - Optional 'true'/'false' to filter archived repositories
  */
-router.get('/repository/project/json', async (req, res) => {
+async function sendRepositoryProjectData(
+  res,
+  { repositories, datetime, archived }
+) {
   try {
-    const { repositories, datetime, archived } = req.query;
-    if (!repositories) {
+    if (
+      !repositories ||
+      (Array.isArray(repositories) && repositories.length === 0)
+    ) {
       return res.status(400).json({ error: 'No repositories specified' });
     }
 
-    const repoNames = repositories
-      .split(',')
-      .map(repo => repo.toLowerCase().trim());
+    const repoNames = parseRepositoryNames(repositories);
 
-    const jsonData = await s3Service.getObjectViaSignedUrl(
+    const { data: jsonData } = await s3Service.getCachedObject(
       'main',
       'repositories.json'
     );
 
-    // Filter repositories based on provided names
-    let filteredRepos = jsonData.repositories.filter(repo =>
-      repoNames.includes(repo.name.toLowerCase())
+    // Look up repositories by name in the cached name index
+    let filteredRepos = timeStage('lookup', () =>
+      findRepositoriesByName(jsonData, repoNames)
     );
 
     // Apply date filter if provided
@@ -203,46 +289,10 @@ router.get('/repository/project/json', async (req, res) => {
     }
 
     // Calculate statistics from filtered repository data
-    const stats = {
-      total_repos: filteredRepos.length,
-      total_private_repos: filteredRepos.filter(r => r.visibility === 'PRIVATE')
-        .length,
-      total_public_repos: filteredRepos.filter(r => r.visibility === 'PUBLIC')
-        .length,
-      total_internal_repos: filteredRepos.filter(
-        r => r.visibility === 'INTERNAL'
-      ).length,
-    };
-
-    // Calculate language statistics
-    const languageStats = {};
-    filteredRepos.forEach(repo => {
-      if (!repo.technologies?.languages) return;
-
-      repo.technologies.languages.forEach(lang => {
-        if (!languageStats[lang.name]) {
-          languageStats[lang.name] = {
-            repo_count: 0,
-            total_percentage: 0,
-            total_size: 0,
-          };
-        }
-        languageStats[lang.name].repo_count++;
-        languageStats[lang.name].total_percentage += lang.percentage;
-        languageStats[lang.name].total_size += lang.size;
-      });
-    });
-
-    // Calculate averages
-    Object.keys(languageStats).forEach(lang => {
-      languageStats[lang] = {
-        repo_count: languageStats[lang].repo_count,
-        average_percentage: +(
-          languageStats[lang].total_percentage / languageStats[lang].repo_count
-        ).toFixed(3),
-        total_size: languageStats[lang].total_size,
-      };
-    });
+    const { stats, language_statistics: languageStats } = timeStage(
+      'stats',
+      () => calculateRepositoryStatistics(filteredRepos)
+    );
 
     res.json({
       repositories: filteredRepos,
@@ -261,7 +311,41 @@ router.get('/repository/project/json', async (req, res) => {
     logger.error('Error fetching repository data:', { error: error.message });
     res.status(500).json({ error: error.message });
   }
-});
+}
+
+/**
+ * Endpoint for fetching specific repository information.
+ * @route GET /api/repository/project/json
+ * @param {string|string[]} repositories - Comma-separated list of repository names to fetch, or repeated parameters
+ * @param {string} [datetime] - Optional ISO date string to filter repositories by last commit date
+ * @param {string} [archived] - Optional 'true'/'false' to filter archived repositories
+ * @returns {Object} Repository data
+ * @returns {Object[]} response.repositories - Array of repository objects with their details
+ * @returns {Object} response.stats - Repository statistics
+ * @returns {Object} response.language_statistics - Language statistics for the requested repositories
+ * @returns {Object} response.metadata - Last updated timestamp and repository request details
+ * @throws {Error} 400 - If no repositories are specified
+ * @throws {Error} 500 - If repository data fetching fails
+ */
+router.get('/repository/project/json', (req, res) =>
+  sendRepositoryProjectData(res, req.query)
+);
+
+/**
+ * Endpoint for fetching information for many repositories in one call.
+ * Accepts the same parameters as the GET form in the request body, so that
+ * hundreds of repository names can be requested without URL length limits.
+ * @route POST /api/repository/project/json
+ * @param {string[]|string} req.body.repositories - Array or comma-separated list of repository names
+ * @param {string} [req.body.datetime] - Optional ISO date string to filter repositories by last commit date
+ * @param {string} [req.body.archived] - Optional 'true'/'false' to filter archived repositories
+ * @returns {Object} Repository data in the same format as the GET endpoint
+ * @throws {Error} 400 - If no repositories are specified
+ * @throws {Error} 500 - If repository data fetching fails
+ */
+router.post('/repository/project/json', (req, res) =>
+  sendRepositoryProjectData(res, { ...req.query, ...req.body })
+);
 
 /**
  * Endpoint to fetch list of directorates from S3.
@@ -281,32 +365,18 @@ router.get('/directorates/json', async (req, res) => {
 
 /**
  * Endpoint to fetch active banner messages.
+ * Banners are served from the in-memory banner store, indexed by page.
  * @route GET /api/banners
+ * @param {string} [page] - Optional page name to return only that page's banners
  * @returns {Object} Active banner messages data
  * @throws {Error} 500 - If fetching fails
  */
 router.get('/banners', async (req, res) => {
   try {
-    let messagesData = { messages: [] };
-
-    try {
-      // Try to get existing messages.json file
-      const data = await s3Service.getObject('main', 'messages.json');
-
-      // Filter only active banners
-      messagesData.messages = data.messages.filter(
-        banner => banner.show === true
-      );
-    } catch (error) {
-      // If file doesn't exist, return empty array
-      logger.error(
-        'No messages.json file found, returning empty array:',
-        error
-      );
-      messagesData = { messages: [] };
-    }
-
-    res.json(messagesData);
+    const page =
+      typeof req.query.page === 'string' ? req.query.page : undefined;
+    const messages = await bannerService.getActiveBanners(page);
+    res.json({ messages });
   } catch (error) {
     logger.error('Error fetching banner messages:', { error: error.message });
     res.status(500).json({ error: error.message });
@@ -321,26 +391,8 @@ router.get('/banners', async (req, res) => {
  */
 router.get('/banners/all', async (req, res) => {
   try {
-    let messagesData = { messages: [] };
-
-    try {
-      // Try to get existing messages.json file
-      const data = await s3Service.getObject('main', 'messages.json');
-
-      // Filter only active banners
-      messagesData.messages = data.messages.filter(
-        banner => banner.show === true
-      );
-    } catch (error) {
-      // If file doesn't exist, return empty array
-      logger.error(
-        'No messages.json file found, returning empty array:',
-        error
-      );
-      messagesData = { messages: [] };
-    }
-
-    res.json(messagesData);
+    const messages = await bannerService.getActiveBanners();
+    res.json({ messages });
   } catch (error) {
     logger.error('Error fetching all banner messages:', {
       error: error.message,
@@ -358,6 +410,7 @@ router.get('/banners/all', async (req, res) => {
  * @returns {number} response.uptime - Server uptime in seconds
  * @returns {Object} response.memory - Memory usage statistics
  * @returns {number} response.pid - Process ID
+ * @returns {Object} response.githubInstallationToken - GitHub installation token acquisition metrics
  */
 router.get('/health', healthCheckLimiter, (req, res) => {
   logger.info('Health check endpoint called', {
@@ -378,6 +431,7 @@ router.get('/health', healthCheckLimiter, (req, res) => {
     uptime: process.uptime(),
     memory: process.memoryUsage(),
     pid: process.pid,
+    githubInstallationToken: getInstallationTokenMetrics(),
   };
 
   logger.debug('Health check details', healthResponse);
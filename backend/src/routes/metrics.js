@@ -0,0 +1,23 @@
+const express = require('express');
+const router = express.Router();
+const logger = require('../config/logger');
+const { registry } = require('../utilities/metrics');
+
+/**
+ * Endpoint for scraping backend metrics in the Prometheus text format.
+ * @route GET /metrics
+ * @returns {string} Request latency and sizes by route, S3 and GitHub calls, cache counters, rate limiter rejections, event loop lag and memory usage
+ * @throws {Error} 500 - If the metrics cannot be formatted
+ */
+router.get('/', (req, res) => {
+  try {
+    res
+      .set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+      .send(registry.render());
+  } catch (error) {
+    logger.error('Error rendering metrics:', { error: error.message });
+    res.status(500).json({ error: error.message });
+  }
+});
+
+module.exports = router;
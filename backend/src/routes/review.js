@@ -19,6 +19,7 @@ router.use(requireReviewer);
  * @returns {Object} Success message or error response
  * @returns {string} response.message - Success confirmation message
  * @throws {Error} 400 - If entries data is invalid
+ * @throws {Error} 409 - If the update kept conflicting with concurrent changes
  * @throws {Error} 500 - If update operation fails
  */
 router.post('/tech-radar/update', async (req, res) => {
@@ -30,7 +31,7 @@ router.post('/tech-radar/update', async (req, res) => {
     if (error.message.includes('Invalid')) {
       return res.status(400).json({ error: error.message });
     }
-    res.status(500).json({ error: error.message });
+    res.status(error.status || 500).json({ error: error.message });
   }
 });
 
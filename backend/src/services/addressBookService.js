@@ -9,28 +9,93 @@ class AddressBookService {
     this.emailKey = 'addressBookEmailKey.json'; // Dictionary for Emails to Usernames
     this.usernameKey = 'addressBookUsernameKey.json'; // Dictionary for Usernames to Emails
     this.IDKey = 'addressBookIDKey.json'; // Dictionary for Usernames to ID
+
+    // How often the resident index is checked against S3
+    this.refreshIntervalMs =
+      parseInt(process.env.ADDRESS_BOOK_REFRESH_MS, 10) || 5 * 60 * 1000;
+    this.index = null;
+    this.refreshing = null;
+  }
+
+  /**
+   * Get the resident address book index. The first call loads it from S3;
+   * after that the current index is returned immediately and, once it is older
+   * than the refresh interval, a refresh is started in the background.
+   * @returns {Promise<{version: string, users: Map<string, {email: string|undefined, accountID: string|undefined}>, emails: Map<string, string>, checkedAt: number}>} Address book index
+   * @throws {Error} If no index has been loaded yet and S3 retrieval fails.
+   */
+  async getAddressBookIndex() {
+    if (!this.index) {
+      return this.refreshIndex();
+    }
+
+    if (Date.now() - this.index.checkedAt >= this.refreshIntervalMs) {
+      // Failures are logged in loadIndex; keep serving the current index
+      this.refreshIndex().catch(() => {});
+    }
+
+    return this.index;
+  }
+
+  /**
+   * Refresh the resident index, sharing a refresh that is already in progress.
+   * @returns {Promise<Object>} The refreshed address book index
+   * @throws {Error} If S3 retrieval fails.
+   */
+  refreshIndex() {
+    if (!this.refreshing) {
+      this.refreshing = this.loadIndex().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
   }
 
   /**
-   * Fetch address book lookup maps from S3.
-   * @returns {Promise<{emailToUsernameData: Record<string, string>, usernameToEmailData: Record<string, string>}>} Maps for conversion between usernames and emails.
+   * Revalidate the three lookup maps in S3 and rebuild the index if any of
+   * them changed.
+   * @returns {Promise<Object>} The current address book index
    * @throws {Error} If S3 retrieval fails.
    */
-  async getAddressBookData() {
+  async loadIndex() {
     try {
       let folder = 'AddressBook/';
 
+      // ttlMs 0 always revalidates; unchanged objects are answered with a 304
+      const entries = await Promise.all(
+        [this.emailKey, this.usernameKey, this.IDKey].map(key =>
+          s3Service.getCachedObject('main', folder + key, { ttlMs: 0 })
+        )
+      );
+      const sources = entries.map(entry => entry.data);
+
+      if (
+        this.index &&
+        sources.every((source, i) => source === this.index.sources[i])
+      ) {
+        this.index.checkedAt = Date.now();
+        return this.index;
+      }
+
       const [emailToUsernameRaw, usernameToEmailRaw, usernameToIdRaw] =
-        await Promise.all([
-          s3Service.getObject('main', folder + this.emailKey),
-          s3Service.getObject('main', folder + this.usernameKey),
-          s3Service.getObject('main', folder + this.IDKey),
-        ]);
-      const emailToUsernameData = this.normaliseMap(emailToUsernameRaw);
-      const usernameToEmailData = this.normaliseMap(usernameToEmailRaw);
-      const usernameToIDData = this.normaliseMap(usernameToIdRaw);
-      logger.info('Successfully fetched address book data');
-      return { emailToUsernameData, usernameToEmailData, usernameToIDData };
+        sources;
+      this.index = {
+        ...this.buildIndex(
+          emailToUsernameRaw,
+          usernameToEmailRaw,
+          usernameToIdRaw
+        ),
+        sources,
+        version: entries.map(entry => entry.etag).join(','),
+        checkedAt: Date.now(),
+      };
+
+      logger.info('Successfully built address book index', {
+        version: this.index.version,
+        users: this.index.users.size,
+        emails: this.index.emails.size,
+      });
+      return this.index;
     } catch (error) {
       logger.error('Error fetching address book data', {
         error: error.message,
@@ -40,22 +105,70 @@ class AddressBookService {
   }
 
   /**
-   * Create a new object with all keys in lowercase (for case-insensitive lookups).
+   * Merge the three lookup maps into one index keyed by lowercase username,
+   * plus a lowercase email to username map.
+   * @param {Record<string, string>} emailToUsernameRaw - Email to username map
+   * @param {Record<string, string>} usernameToEmailRaw - Username to email map
+   * @param {Record<string, string>} usernameToIdRaw - Username to account ID map
+   * @returns {{users: Map<string, {email: string|undefined, accountID: string|undefined}>, emails: Map<string, string>}} Merged index
+   */
+  buildIndex(emailToUsernameRaw, usernameToEmailRaw, usernameToIdRaw) {
+    const users = new Map();
+    const getUser = key => {
+      if (!users.has(key)) {
+        users.set(key, { email: undefined, accountID: undefined });
+      }
+      return users.get(key);
+    };
+
+    this.normaliseMap(usernameToEmailRaw).forEach((email, key) => {
+      getUser(key).email = email;
+    });
+    this.normaliseMap(usernameToIdRaw).forEach((accountID, key) => {
+      getUser(key).accountID = accountID;
+    });
+
+    return { users, emails: this.normaliseMap(emailToUsernameRaw) };
+  }
+
+  /**
+   * Create a Map with all keys in lowercase (for case-insensitive lookups).
    * @param {Record<string, string>} obj
-   * @returns {Record<string, string>}
+   * @returns {Map<string, string>}
    */
   normaliseMap(obj) {
     try {
       const entries = Object.entries(obj || {});
-      return entries.reduce((acc, [k, v]) => {
-        acc[String(k).toLowerCase()] = v;
-        return acc;
-      }, {});
+      return new Map(entries.map(([k, v]) => [String(k).toLowerCase(), v]));
     } catch {
-      return {};
+      return new Map();
     }
   }
 
+  /**
+   * Resolve a single identifier against the address book index.
+   * @param {{users: Map, emails: Map}} index - Index from getAddressBookIndex
+   * @param {string} userDetail - Username or email
+   * @returns {[string|undefined, string|undefined, string|undefined]} [username, email, accountID]
+   */
+  resolveIdentifier({ users, emails }, userDetail) {
+    const raw = String(userDetail).trim();
+    const isUsername = !raw.includes('@');
+    const key = raw.toLowerCase();
+
+    if (isUsername) {
+      const user = users.get(key);
+      return [raw, user?.email, user?.accountID];
+    }
+
+    const username = emails.get(key);
+    const user = username
+      ? users.get(String(username).toLowerCase())
+      : undefined;
+    const canonicalEmail = user?.email || raw.toLowerCase();
+    return [username, canonicalEmail, user?.accountID];
+  }
+
   /**
    * Resolve the counterpart for each identifier.
    * @param {string[]} input - List of usernames or emails.
@@ -63,34 +176,32 @@ class AddressBookService {
    * @throws {Error} If address book data cannot be fetched.
    */
   async filterAddressBookData(input) {
-    const { emailToUsernameData, usernameToEmailData, usernameToIDData } =
-      await this.getAddressBookData();
-
-    let output = [];
+    const index = await this.getAddressBookIndex();
+    return input.map(userDetail => this.resolveIdentifier(index, userDetail));
+  }
 
-    input.forEach(userDetail => {
-      const raw = String(userDetail).trim();
-      const isUsername = !raw.includes('@');
-      const key = raw.toLowerCase();
+  /**
+   * Build the user info object for a resolved identifier.
+   * @param {[string|undefined, string|undefined, string|undefined]} user - [username, email, accountID]
+   * @returns {{username: string, email: string, accountID: string, avatarUrl: string, url: string, fullname: string}|null} User details, or null if any detail is missing
+   */
+  formatUser([username, email, accountID]) {
+    const avatarLink = this.getAvatarLink(accountID);
+    const githubLink = this.getGitHubLink(username);
+    const fullName = this.getNameByEmail(email);
 
-      if (isUsername) {
-        const email = usernameToEmailData?.[key];
-        const accountID = usernameToIDData?.[key];
-        output.push([raw, email, accountID]);
-      } else {
-        const username = emailToUsernameData?.[key];
-        const canonicalEmail = username
-          ? usernameToEmailData?.[String(username).toLowerCase()] ||
-            raw.toLowerCase()
-          : raw.toLowerCase();
-        const accountID = username
-          ? usernameToIDData?.[String(username).toLowerCase()]
-          : undefined;
-        output.push([username, canonicalEmail, accountID]);
-      }
-    });
+    if (!(username && email && accountID && githubLink && fullName)) {
+      return null;
+    }
 
-    return output;
+    return {
+      username,
+      email,
+      accountID,
+      avatarUrl: avatarLink,
+      url: githubLink,
+      fullname: fullName,
+    };
   }
 
   /**
@@ -110,25 +221,12 @@ class AddressBookService {
     const seenUsernames = new Set();
 
     for (const user of output) {
-      const username = user[0];
-      const email = user[1];
-      const accountID = user[2];
-      const avatarLink = this.getAvatarLink(accountID);
-      const githubLink = this.getGitHubLink(username);
-      const fullName = this.getNameByEmail(email);
-
-      if (username && email && accountID && githubLink && fullName) {
-        const key = String(username).toLowerCase();
+      const userInfo = this.formatUser(user);
+
+      if (userInfo) {
+        const key = String(userInfo.username).toLowerCase();
         if (seenUsernames.has(key)) continue;
         seenUsernames.add(key);
-        const userInfo = {
-          username,
-          email,
-          accountID,
-          avatarUrl: avatarLink,
-          url: githubLink,
-          fullname: fullName,
-        };
         formattedOutput.push(userInfo);
       }
     }
@@ -136,6 +234,36 @@ class AddressBookService {
     return formattedOutput;
   }
 
+  /**
+   * Resolve a large batch of usernames/emails in one pass over the resident
+   * index. Identifiers are de-duplicated case-insensitively and results are
+   * produced lazily so they can be streamed.
+   * @param {string[]} input - Usernames or emails.
+   * @returns {Promise<Iterable<{input: string, found: boolean}>>} One result per unique identifier, with the user info fields when found
+   * @throws {Error} If address book data cannot be fetched.
+   */
+  async resolveAddressBookEntries(input) {
+    const index = await this.getAddressBookIndex();
+    const unique = new Map();
+    input.forEach(userDetail => {
+      const raw = String(userDetail).trim();
+      const key = raw.toLowerCase();
+      if (raw && !unique.has(key)) unique.set(key, raw);
+    });
+
+    const service = this;
+    return (function* () {
+      for (const raw of unique.values()) {
+        const userInfo = service.formatUser(
+          service.resolveIdentifier(index, raw)
+        );
+        yield userInfo
+          ? { input: raw, found: true, ...userInfo }
+          : { input: raw, found: false };
+      }
+    })();
+  }
+
   /**
    * Get the employee’s GitHub avatar URL.
    * @param {string} accountID
@@ -0,0 +1,305 @@
+const s3Service = require('./s3Service');
+const logger = require('../config/logger');
+
+const BANNER_ACTIONS = ['add', 'toggle', 'delete'];
+
+/**
+ * Create an error for an invalid banner operation, reported to the client as
+ * a 400 response.
+ * @param {string} message - Error message
+ * @returns {Error} Error with a 400 status
+ */
+function invalidOperation(message) {
+  const error = new Error(message);
+  error.status = 400;
+  return error;
+}
+
+/**
+ * Wait for the given number of milliseconds.
+ * @param {number} ms - Delay in milliseconds
+ * @returns {Promise<void>}
+ */
+function sleep(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+/**
+ * BannerService holds the banner messages from messages.json in memory,
+ * indexed by page, so that banner reads do not go to S3.
+ */
+class BannerService {
+  constructor() {
+    this.key = 'messages.json';
+
+    // How long the store is served before it is revalidated in the background
+    this.refreshIntervalMs =
+      parseInt(process.env.BANNER_REFRESH_MS, 10) || 5 * 60 * 1000;
+    // How soon to retry when messages.json could not be loaded at all
+    this.retryIntervalMs = Math.min(this.refreshIntervalMs, 60 * 1000);
+    this.store = null;
+    this.version = 0;
+    this.loading = null;
+
+    // Attempts at a conditional write before giving up on a conflicting batch
+    this.writeAttempts = parseInt(process.env.BANNER_WRITE_ATTEMPTS, 10) || 10;
+    this.writeBackoffMs = 20;
+  }
+
+  /**
+   * Get the banner store. The first call loads messages.json from S3; later
+   * calls return the store from memory and, once it is older than the refresh
+   * interval, revalidate it in the background.
+   * @returns {Promise<{version: number, messages: Object[], active: Object[], byPage: Map<string, Object[]>, loadedAt: number, refreshAt: number}>} Banner store
+   */
+  async getStore() {
+    if (!this.store) {
+      return this.loadOnce();
+    }
+
+    if (Date.now() >= this.store.refreshAt) {
+      // Failures are logged in load; keep serving the current store
+      this.loadOnce().catch(() => {});
+    }
+
+    return this.store;
+  }
+
+  /**
+   * Get the active banners, optionally only those for one page.
+   * @param {string} [page] - Page name, e.g. 'radar'
+   * @returns {Promise<Object[]>} Active banner messages
+   */
+  async getActiveBanners(page) {
+    const store = await this.getStore();
+    if (page === undefined) return store.active;
+    return store.byPage.get(page) || [];
+  }
+
+  /**
+   * Load messages.json, sharing a load that is already in progress.
+   * @returns {Promise<Object>} The banner store
+   */
+  loadOnce() {
+    if (!this.loading) {
+      this.loading = this.load().finally(() => {
+        this.loading = null;
+      });
+    }
+    return this.loading;
+  }
+
+  /**
+   * Load messages.json from S3 and rebuild the store. A missing or unreadable
+   * file is treated as having no banners until a retry shortly after; if a
+   * store is already held it is kept until the next refresh interval.
+   * @returns {Promise<Object>} The banner store
+   */
+  async load() {
+    const version = this.version;
+    let messagesData;
+    try {
+      messagesData = await s3Service.getObject('main', this.key);
+    } catch (error) {
+      logger.error('No messages.json file found, returning empty array:', {
+        error: error.message,
+      });
+      if (this.store) {
+        // Wait a full interval before trying again
+        this.store.refreshAt = Date.now() + this.refreshIntervalMs;
+        return this.store;
+      }
+      // Serve no banners rather than going to S3 on every request
+      this.store = this.buildStore({ messages: [] });
+      this.store.refreshAt = Date.now() + this.retryIntervalMs;
+      return this.store;
+    }
+
+    // A write while loading has already replaced the store with newer data
+    if (version !== this.version) return this.store;
+    return this.replace(messagesData);
+  }
+
+  /**
+   * Replace the store with new messages data, e.g. after an admin update has
+   * been written to S3.
+   * @param {{messages: Object[]}} messagesData - Banner messages data
+   * @returns {Object} The new banner store
+   */
+  replace(messagesData) {
+    this.version++;
+    this.store = this.buildStore(messagesData);
+    logger.info('Built banner store', {
+      version: this.store.version,
+      banners: this.store.messages.length,
+      active: this.store.active.length,
+    });
+    return this.store;
+  }
+
+  /**
+   * Check the shape of a list of banner operations before any are applied.
+   * @param {Object[]} operations - Banner operations
+   * @throws {Error} 400 error if an operation is invalid
+   */
+  validateOperations(operations) {
+    if (!Array.isArray(operations) || operations.length === 0) {
+      throw invalidOperation('Invalid banner operations');
+    }
+
+    operations.forEach(operation => {
+      if (!BANNER_ACTIONS.includes(operation?.action)) {
+        throw invalidOperation('Invalid banner action');
+      }
+      if (operation.action === 'add') {
+        const { banner } = operation;
+        if (
+          !banner ||
+          !banner.message ||
+          !Array.isArray(banner.pages) ||
+          banner.pages.length === 0
+        ) {
+          throw invalidOperation('Invalid banner data');
+        }
+      } else if (!Number.isInteger(operation.index)) {
+        throw invalidOperation('Invalid banner index');
+      } else if (
+        operation.action === 'toggle' &&
+        typeof operation.show !== 'boolean'
+      ) {
+        throw invalidOperation('Invalid banner visibility');
+      }
+    });
+  }
+
+  /**
+   * Apply banner operations, in order, to a list of banner messages. Indexes
+   * refer to the list as left by the previous operations in the batch.
+   * @param {Object[]} messages - Banner messages, modified in place
+   * @param {Object[]} operations - Validated banner operations
+   * @throws {Error} 400 error if an index is out of range
+   */
+  applyOperations(messages, operations) {
+    operations.forEach(({ action, banner, index, show }) => {
+      if (action === 'add') {
+        messages.push({
+          title: banner.title || '',
+          message: banner.message,
+          description: banner.message, // For backwards compatibility
+          type: banner.type || 'info',
+          pages: banner.pages,
+          show: banner.show !== false, // Default to true if not explicitly set to false
+        });
+        return;
+      }
+
+      if (index >= messages.length || index < 0) {
+        throw invalidOperation('Banner index out of range');
+      }
+      if (action === 'toggle') {
+        messages[index].show = show;
+      } else {
+        messages.splice(index, 1);
+      }
+    });
+  }
+
+  /**
+   * Apply a batch of banner operations to messages.json in a single
+   * read-modify-write. The write is conditional on the ETag that was read, so
+   * a concurrent change by another request or instance is never overwritten;
+   * on a conflict the batch is re-applied to the new contents and retried.
+   * @param {Object[]} operations - Banner operations, each one of
+   *   `{action: 'add', banner}`, `{action: 'toggle', index, show}` or
+   *   `{action: 'delete', index}`
+   * @returns {Promise<{messages: Object[], attempts: number}>} The written banner messages and the number of attempts taken
+   * @throws {Error} 400 error if an operation is invalid, 409 error if the write kept conflicting
+   */
+  async mutate(operations) {
+    this.validateOperations(operations);
+
+    for (let attempt = 1; attempt <= this.writeAttempts; attempt++) {
+      let messagesData;
+      let etag;
+      try {
+        ({ data: messagesData, etag } = await s3Service.getObjectWithETag(
+          'main',
+          this.key
+        ));
+      } catch (error) {
+        if (error.name !== 'NoSuchKey') throw error;
+        // Create the file, unless another writer does so first
+        messagesData = { messages: [] };
+        etag = null;
+      }
+      if (!Array.isArray(messagesData.messages)) messagesData.messages = [];
+
+      this.applyOperations(messagesData.messages, operations);
+
+      try {
+        await s3Service.putObject(
+          'main',
+          this.key,
+          messagesData,
+          etag ? { ifMatch: etag } : { ifNoneMatch: '*' }
+        );
+      } catch (error) {
+        if (!s3Service.isWriteConflict(error)) throw error;
+        // Back off with jitter so competing writers do not retry in lockstep
+        await sleep(
+          Math.random() * Math.min(1000, this.writeBackoffMs * 2 ** attempt)
+        );
+        continue;
+      }
+
+      this.replace(messagesData);
+      return { messages: messagesData.messages, attempts: attempt };
+    }
+
+    logger.error('Giving up on banner update after repeated conflicts', {
+      attempts: this.writeAttempts,
+    });
+    const error = new Error(
+      'Banners were changed by another request, please try again'
+    );
+    error.status = 409;
+    throw error;
+  }
+
+  /**
+   * Build the store for a version of the messages data. Banners are indexed
+   * by their `page`, or by each entry of `pages` if no single page is set.
+   * @param {{messages: Object[]}} messagesData - Banner messages data
+   * @returns {Object} Banner store
+   */
+  buildStore(messagesData) {
+    const messages = Array.isArray(messagesData?.messages)
+      ? messagesData.messages
+      : [];
+    const active = messages.filter(banner => banner.show === true);
+
+    const byPage = new Map();
+    active.forEach(banner => {
+      const pages = banner.page
+        ? [banner.page]
+        : Array.isArray(banner.pages)
+          ? banner.pages
+          : [];
+      new Set(pages).forEach(page => {
+        if (!byPage.has(page)) byPage.set(page, []);
+        byPage.get(page).push(banner);
+      });
+    });
+
+    return {
+      version: this.version,
+      messages,
+      active,
+      byPage,
+      loadedAt: Date.now(),
+      refreshAt: Date.now() + this.refreshIntervalMs,
+    };
+  }
+}
+
+module.exports = new BannerService();
@@ -1,6 +1,10 @@
-const {
-  getAppAndInstallation,
-} = require('../utilities/getAppAndInstallation.js');
+const crypto = require('crypto');
+// Called through the module so the installation client can be replaced in tests
+const appInstallation = require('../utilities/getAppAndInstallation.js');
+const { ObjectCache } = require('../utilities/objectCache');
+const { paginate } = require('../utilities/githubPagination');
+const { mapWithConcurrency } = require('../utilities/mapWithConcurrency');
+const { timeStage } = require('../utilities/serverTiming');
 const logger = require('../config/logger');
 
 /**
@@ -9,6 +13,24 @@ const logger = require('../config/logger');
 class GitHubService {
   constructor() {
     this.org = process.env.GITHUB_ORG || 'ONSdigital';
+    // Maximum number of GitHub requests made at once for pages or teams
+    this.concurrency = parseInt(process.env.GITHUB_CONCURRENCY, 10) || 4;
+
+    // User teams, keyed by a hash of the user's token rather than the token
+    this.userTeamsCache = new ObjectCache({
+      maxEntries:
+        parseInt(process.env.USER_TEAMS_CACHE_MAX_ENTRIES, 10) || 1000,
+      ttlMs: parseInt(process.env.USER_TEAMS_CACHE_TTL_MS, 10) || 5 * 60 * 1000,
+    });
+  }
+
+  /**
+   * Get the cache key for a user token
+   * @param {string} userToken - GitHub access token
+   * @returns {string} SHA-256 hash of the token
+   */
+  hashToken(userToken) {
+    return crypto.createHash('sha256').update(String(userToken)).digest('hex');
   }
 
   /**
@@ -34,21 +56,16 @@ class GitHubService {
       }
 
       // Now use the app installation token to access the team members
-      const octokit = await getAppAndInstallation();
-
-      const response = await octokit.request(
-        `GET /orgs/${this.org}/teams/${teamSlug}/members`,
-        {
-          headers: {
-            'X-GitHub-Api-Version': '2022-11-28',
-          },
-          per_page: 100,
-        }
+      const octokit = await timeStage('github_auth', () =>
+        appInstallation.getAppAndInstallation()
+      );
+
+      const members = await timeStage('github_members', () =>
+        this.fetchTeamMembers(octokit, teamSlug)
       );
       logger.info('Successfully fetched GitHub team members');
 
-      // Only return login, name, and url for each member
-      return response.data || [];
+      return members;
     } catch (error) {
       logger.error('GitHub API error while fetching team members:', {
         error: error.message,
@@ -58,26 +75,49 @@ class GitHubService {
   }
 
   /**
-   * Get teams the authenticated user is a member of in the organisation
+   * Get teams the authenticated user is a member of in the organisation.
+   * Results are cached per token, and concurrent requests with the same token
+   * share a single GitHub API call. Failed lookups are not cached.
    * @param {string} userToken - GitHub access token
    * @returns {Promise<Array>} Array of teams the user is a member of in the organisation
    */
   async getUserTeams(userToken) {
+    const { teams } = await this.userTeamsCache.getOrLoad(
+      this.hashToken(userToken),
+      async () => ({ teams: await this.fetchUserTeams(userToken) })
+    );
+    return teams;
+  }
+
+  /**
+   * Remove a user's cached teams (e.g. when they log out)
+   * @param {string} userToken - GitHub access token
+   */
+  clearUserTeams(userToken) {
+    this.userTeamsCache.delete(this.hashToken(userToken));
+  }
+
+  /**
+   * Fetch teams the authenticated user is a member of from the GitHub API
+   * @param {string} userToken - GitHub access token
+   * @returns {Promise<Array>} Array of teams the user is a member of in the organisation
+   */
+  async fetchUserTeams(userToken) {
     try {
       const { Octokit } = await import('@octokit/rest');
 
-      const octokit = new Octokit({ auth: userToken });
-
-      const response = await octokit.request(`GET /user/teams`, {
-        headers: {
-          'X-GitHub-Api-Version': '2022-11-28',
-        },
-        per_page: 100,
+      const octokit = new Octokit({
+        auth: userToken,
+        baseUrl: process.env.GITHUB_API_URL,
       });
+
+      const teams = await timeStage('github_teams', () =>
+        paginate(octokit, 'GET /user/teams', { concurrency: this.concurrency })
+      );
       logger.info('Successfully fetched GitHub teams');
 
       // Only return slug, name, description, and url for each team
-      return (response.data || []).map(team => ({
+      return teams.map(team => ({
         slug: team.slug,
         name: team.name,
         description: team.description,
@@ -91,27 +131,54 @@ class GitHubService {
     }
   }
 
+  /**
+   * Fetch every page of a team's members
+   * @param {Object} octokit - Octokit instance authenticated as the app installation
+   * @param {string} teamSlug - The slug of the team to fetch members for
+   * @returns {Promise<Array>} Array of team members
+   */
+  async fetchTeamMembers(octokit, teamSlug) {
+    return paginate(octokit, 'GET /orgs/{org}/teams/{team_slug}/members', {
+      params: { org: this.org, team_slug: teamSlug },
+      concurrency: this.concurrency,
+    });
+  }
+
   /**
    * Get team members as admin (using app installation)
    * @param {string} teamSlug - The slug of the team to fetch members for
    * @returns {Promise<Array>} Array of team members
    */
   async getTeamMembersAsAdmin(teamSlug) {
+    const membersByTeam = await this.getMembersOfTeams([teamSlug]);
+    return membersByTeam[teamSlug];
+  }
+
+  /**
+   * Get the members of several teams as admin, using one installation client.
+   * Teams are fetched concurrently, up to `this.concurrency` at a time.
+   * @param {string[]} teamSlugs - Slugs of the teams to fetch members for
+   * @returns {Promise<Object<string, Array>>} Team members keyed by team slug
+   */
+  async getMembersOfTeams(teamSlugs) {
     try {
-      const octokit = await getAppAndInstallation();
-
-      const response = await octokit.request(
-        `GET /orgs/${this.org}/teams/${teamSlug}/members`,
-        {
-          headers: {
-            'X-GitHub-Api-Version': '2022-11-28',
-          },
-          per_page: 100,
-        }
+      const octokit = await timeStage('github_auth', () =>
+        appInstallation.getAppAndInstallation()
       );
-      logger.info('Successfully fetched GitHub team members');
+      const slugs = [...new Set(teamSlugs)];
 
-      return response.data || [];
+      const members = await timeStage('github_members', () =>
+        mapWithConcurrency(slugs, this.concurrency, slug =>
+          this.fetchTeamMembers(octokit, slug)
+        )
+      );
+      logger.info('Successfully fetched GitHub team members', {
+        teams: slugs.length,
+      });
+
+      return Object.fromEntries(
+        slugs.map((teamSlug, i) => [teamSlug, members[i]])
+      );
     } catch (error) {
       logger.error('GitHub API error while fetching team members:', {
         error: error.message,
@@ -5,15 +5,38 @@ const {
 } = require('@aws-sdk/client-s3');
 const { getSignedUrl } = require('@aws-sdk/s3-request-presigner');
 const logger = require('../config/logger');
+const { ObjectCache } = require('../utilities/objectCache');
+const { timeStage } = require('../utilities/serverTiming');
+const { recordS3Request } = require('../utilities/metrics');
+
+/**
+ * Gets the size of a fetched object, from Content-Length when S3 sent one.
+ * The body's length is used otherwise, which counts characters rather than
+ * bytes but avoids re-encoding a large body to measure it.
+ * @param {Response} response - Fetch response
+ * @param {string} text - Response body
+ * @returns {number} Object size
+ */
+function contentLength(response, text) {
+  return parseInt(response.headers.get('content-length'), 10) || text.length;
+}
 
 /**
  * S3Service class for managing S3 operations
  */
 class S3Service {
   constructor() {
-    this.s3Client = new S3Client({
+    const clientConfig = {
       region: 'eu-west-2',
-    });
+    };
+
+    // Allow pointing the client at an S3-compatible endpoint (e.g. a local stand-in)
+    if (process.env.S3_ENDPOINT) {
+      clientConfig.endpoint = process.env.S3_ENDPOINT;
+      clientConfig.forcePathStyle = true;
+    }
+
+    this.s3Client = new S3Client(clientConfig);
 
     // Bucket configurations
     this.buckets = {
@@ -22,6 +45,12 @@ class S3Service {
       copilot:
         process.env.COPILOT_BUCKET_NAME || 'sdp-dev-copilot-usage-dashboard',
     };
+
+    // Shared cache of parsed objects fetched via signed URLs
+    this.objectCache = new ObjectCache({
+      maxEntries: parseInt(process.env.S3_CACHE_MAX_ENTRIES, 10) || 20,
+      ttlMs: parseInt(process.env.S3_CACHE_TTL_MS, 10) || 5 * 60 * 1000,
+    });
   }
 
   /**
@@ -38,11 +67,61 @@ class S3Service {
         Key: key,
       });
 
-      const { Body } = await this.s3Client.send(command);
+      const { Body, ContentLength } = await timeStage('s3_get', () =>
+        this.s3Client.send(command)
+      );
+      logger.info(`Successfully fetched ${bucket}/${key} object`);
+      const data = await timeStage('s3_read', () => Body.transformToString());
+      recordS3Request(
+        'get',
+        bucketName,
+        key,
+        'ok',
+        ContentLength ?? data.length
+      );
+      return timeStage('s3_parse', () => JSON.parse(data));
+    } catch (error) {
+      recordS3Request('get', this.getBucketName(bucket), key, 'error');
+      logger.error(`Error getting object from S3: ${bucket}/${key}`, {
+        error: error.message,
+      });
+      throw error;
+    }
+  }
+
+  /**
+   * Get an object from S3 bucket together with its ETag, for use with a
+   * conditional putObject.
+   * @param {string} bucket - Bucket name or bucket key from this.buckets
+   * @param {string} key - Object key
+   * @returns {Promise<{data: Object, etag: string}>} Parsed JSON object and its ETag
+   */
+  async getObjectWithETag(bucket, key) {
+    try {
+      const bucketName = this.buckets[bucket] || bucket;
+      const command = new GetObjectCommand({
+        Bucket: bucketName,
+        Key: key,
+      });
+
+      const { Body, ETag, ContentLength } = await timeStage('s3_get', () =>
+        this.s3Client.send(command)
+      );
       logger.info(`Successfully fetched ${bucket}/${key} object`);
-      const data = await Body.transformToString();
-      return JSON.parse(data);
+      const data = await timeStage('s3_read', () => Body.transformToString());
+      recordS3Request(
+        'get',
+        bucketName,
+        key,
+        'ok',
+        ContentLength ?? data.length
+      );
+      return {
+        data: timeStage('s3_parse', () => JSON.parse(data)),
+        etag: ETag,
+      };
     } catch (error) {
+      recordS3Request('get', this.getBucketName(bucket), key, 'error');
       logger.error(`Error getting object from S3: ${bucket}/${key}`, {
         error: error.message,
       });
@@ -51,32 +130,73 @@ class S3Service {
   }
 
   /**
-   * Put an object to S3 bucket
+   * Put an object to S3 bucket. With `ifMatch` the write only succeeds if the
+   * object still has that ETag, and with `ifNoneMatch: '*'` only if the object
+   * does not exist yet; otherwise S3 rejects it (see isWriteConflict).
    * @param {string} bucket - Bucket name or bucket key from this.buckets
    * @param {string} key - Object key
    * @param {Object} data - Data to store
-   * @returns {Promise<void>}
+   * @param {Object} [options]
+   * @param {string} [options.ifMatch] - ETag the current object must have
+   * @param {string} [options.ifNoneMatch] - '*' to only create a new object
+   * @returns {Promise<{etag: string}>} ETag of the stored object
    */
-  async putObject(bucket, key, data) {
+  async putObject(bucket, key, data, { ifMatch, ifNoneMatch } = {}) {
     try {
       const bucketName = this.buckets[bucket] || bucket;
+      const body = timeStage('s3_serialise', () =>
+        JSON.stringify(data, null, 2)
+      );
       const command = new PutObjectCommand({
         Bucket: bucketName,
         Key: key,
-        Body: JSON.stringify(data, null, 2),
+        Body: body,
         ContentType: 'application/json',
+        ...(ifMatch ? { IfMatch: ifMatch } : {}),
+        ...(ifNoneMatch ? { IfNoneMatch: ifNoneMatch } : {}),
       });
 
-      await this.s3Client.send(command);
+      const { ETag } = await timeStage('s3_put', () =>
+        this.s3Client.send(command)
+      );
+      recordS3Request('put', bucketName, key, 'ok', Buffer.byteLength(body));
+      this.objectCache.delete(`${bucketName}/${key}`);
       logger.info(`Successfully put object to S3: ${bucket}/${key}`);
+      return { etag: ETag };
     } catch (error) {
-      logger.error(`Error putting object to S3: ${bucket}/${key}`, {
-        error: error.message,
-      });
+      recordS3Request(
+        'put',
+        this.getBucketName(bucket),
+        key,
+        this.isWriteConflict(error) ? 'conflict' : 'error'
+      );
+      if (this.isWriteConflict(error)) {
+        logger.warn(`Conditional put to S3 was rejected: ${bucket}/${key}`);
+      } else {
+        logger.error(`Error putting object to S3: ${bucket}/${key}`, {
+          error: error.message,
+        });
+      }
       throw error;
     }
   }
 
+  /**
+   * Whether an error from a conditional putObject means the object was
+   * changed by another writer, so the read-modify-write should be retried.
+   * @param {Error} error - Error thrown by putObject
+   * @returns {boolean} True for 412 Precondition Failed and 409 conditional request conflicts
+   */
+  isWriteConflict(error) {
+    const status = error?.$metadata?.httpStatusCode;
+    return (
+      error?.name === 'PreconditionFailed' ||
+      error?.name === 'ConditionalRequestConflict' ||
+      status === 412 ||
+      status === 409
+    );
+  }
+
   /**
    * Get a signed URL for an S3 object and fetch its content
    * @param {string} bucket - Bucket name or bucket key from this.buckets
@@ -92,21 +212,30 @@ class S3Service {
         Key: key,
       });
 
-      const signedUrl = await getSignedUrl(this.s3Client, command, {
-        expiresIn,
-      });
+      const signedUrl = await timeStage('s3_presign', () =>
+        getSignedUrl(this.s3Client, command, { expiresIn })
+      );
 
-      const response = await fetch(signedUrl);
+      const response = await timeStage('s3_get', () => fetch(signedUrl));
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const jsonData = await response.json();
+      const text = await timeStage('s3_read', () => response.text());
+      recordS3Request(
+        'get',
+        bucketName,
+        key,
+        'ok',
+        contentLength(response, text)
+      );
+      const jsonData = timeStage('s3_parse', () => JSON.parse(text));
       logger.info(
         `Successfully fetched ${bucket}/${key} object via signed URL`
       );
       return jsonData;
     } catch (error) {
+      recordS3Request('get', this.getBucketName(bucket), key, 'error');
       logger.error(
         `Error getting object via signed URL from S3: ${bucket}/${key}`,
         { error: error.message }
@@ -115,6 +244,90 @@ class S3Service {
     }
   }
 
+  /**
+   * Get an object through the shared object cache. Fresh entries are served
+   * from memory; stale entries are revalidated with If-None-Match so that an
+   * unchanged object is not downloaded or parsed again. Concurrent misses for
+   * the same object share a single request. With `staleWhileRevalidate`, a
+   * stale entry is served straight away while one request revalidates it in
+   * the background.
+   * @param {string} bucket - Bucket name or bucket key from this.buckets
+   * @param {string} key - Object key
+   * @param {Object} [options]
+   * @param {number} [options.ttlMs] - Optional TTL override in milliseconds
+   * @param {number} [options.expiresIn=300] - Signed URL expiration time in seconds
+   * @param {number} [options.jitter] - Fraction of the TTL over which revalidations are spread
+   * @param {boolean} [options.staleWhileRevalidate] - Serve a stale entry while it is revalidated
+   * @param {number} [options.retryMs] - Delay before a failed background revalidation is retried
+   * @returns {Promise<{data: Object, etag: string|null, fetchedAt: number}>} Cached entry
+   */
+  async getCachedObject(
+    bucket,
+    key,
+    { ttlMs, expiresIn = 300, jitter, staleWhileRevalidate, retryMs } = {}
+  ) {
+    const bucketName = this.buckets[bucket] || bucket;
+
+    const load = async stale => {
+      try {
+        const command = new GetObjectCommand({
+          Bucket: bucketName,
+          Key: key,
+        });
+
+        const signedUrl = await timeStage('s3_presign', () =>
+          getSignedUrl(this.s3Client, command, { expiresIn })
+        );
+
+        const headers = {};
+        if (stale?.etag) {
+          headers['If-None-Match'] = stale.etag;
+        }
+
+        const response = await timeStage('s3_get', () =>
+          fetch(signedUrl, { headers })
+        );
+        if (response.status === 304 && stale) {
+          recordS3Request('get', bucketName, key, 'not_modified');
+          logger.info(`Revalidated cached ${bucket}/${key} object`);
+          return { data: stale.data, etag: stale.etag };
+        }
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const text = await timeStage('s3_read', () => response.text());
+        recordS3Request(
+          'get',
+          bucketName,
+          key,
+          'ok',
+          contentLength(response, text)
+        );
+        const data = timeStage('s3_parse', () => JSON.parse(text));
+        logger.info(`Successfully fetched ${bucket}/${key} object into cache`);
+        return { data, etag: response.headers.get('etag') };
+      } catch (error) {
+        recordS3Request('get', bucketName, key, 'error');
+        logger.error(`Error getting cached object from S3: ${bucket}/${key}`, {
+          error: error.message,
+        });
+        throw error;
+      }
+    };
+
+    // Covers cache hits too; the s3_* stages in load are only recorded by
+    // the request that loads the object
+    return timeStage('s3_cache', () =>
+      this.objectCache.getOrLoad(`${bucketName}/${key}`, load, {
+        ttlMs,
+        jitter,
+        staleWhileRevalidate,
+        retryMs,
+      })
+    );
+  }
+
   /**
    * Get bucket name by key
    * @param {string} bucketKey - Key from this.buckets
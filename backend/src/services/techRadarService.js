@@ -1,12 +1,30 @@
 const s3Service = require('./s3Service');
 const logger = require('../config/logger');
 
+/**
+ * Wait for the given number of milliseconds.
+ * @param {number} ms - Delay in milliseconds
+ * @returns {Promise<void>}
+ */
+function sleep(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
 /**
  * TechRadarService class for managing tech radar data
  */
 class TechRadarService {
   constructor() {
     this.radarKey = 'onsRadarSkeleton.json';
+
+    // Updates arriving within this window are written to S3 together
+    this.flushDelayMs = parseInt(process.env.TECH_RADAR_FLUSH_MS, 10) || 100;
+    this.writeAttempts = 5;
+    // Base delay before retrying a conflicting write, doubled on each attempt
+    this.writeBackoffMs = 50;
+    this.pending = [];
+    this.flushTimer = null;
+    this.flushing = null;
   }
 
   /**
@@ -23,107 +41,238 @@ class TechRadarService {
   }
 
   /**
-   * Update tech radar entries
+   * Update tech radar entries. Updates that arrive within the flush window are
+   * queued and written together: each is validated on its own, then all valid
+   * updates are merged, in arrival order, into one copy of the radar and saved
+   * with a single conditional write. The returned promise resolves once this
+   * update has been written to S3.
    * @param {Array} entries - Array of entry objects to update
    * @param {string} role - Role making the request (for logging)
    * @returns {Promise<void>}
    */
-  async updateTechRadarEntries(entries, role = 'unknown') {
-    try {
-      // Validate entries is present, is an array, and is not empty
-      if (!entries || !Array.isArray(entries) || entries.length === 0) {
-        throw new Error('Invalid or empty entries data');
-      }
+  updateTechRadarEntries(entries, role = 'unknown') {
+    // Validate entries is present, is an array, and is not empty
+    if (!entries || !Array.isArray(entries) || entries.length === 0) {
+      logger.error(`Error updating tech radar (${role}):`, {
+        error: 'Invalid or empty entries data',
+      });
+      return Promise.reject(new Error('Invalid or empty entries data'));
+    }
 
-      // Get existing data
-      const existingData = await this.getTechRadarData();
-
-      // Get valid quadrant and ring IDs from existing data
-      const validQuadrantIds = new Set(existingData.quadrants.map(q => q.id));
-      const validRingIds = new Set([
-        ...existingData.rings.map(r => r.id),
-        'ignore',
-        'review',
-      ]);
-
-      // Validate each entry
-      const validEntries = entries.every(entry => {
-        // Required fields validation
-        if (
-          !entry.id ||
-          typeof entry.id !== 'string' ||
-          !entry.title ||
-          typeof entry.title !== 'string' ||
-          !entry.quadrant ||
-          !validQuadrantIds.has(entry.quadrant)
-        ) {
-          return false;
-        }
+    return new Promise((resolve, reject) => {
+      this.pending.push({ entries, role, resolve, reject });
+      this.scheduleFlush();
+    });
+  }
+
+  /**
+   * Start the flush timer, unless one is already running. Updates that arrive
+   * while a flush is being written wait for it and go in the next flush.
+   */
+  scheduleFlush() {
+    if (this.flushTimer || this.flushing) return;
+
+    this.flushTimer = setTimeout(() => {
+      this.flushTimer = null;
+      this.flushing = this.flush().finally(() => {
+        this.flushing = null;
+        if (this.pending.length > 0) this.scheduleFlush();
+      });
+    }, this.flushDelayMs);
+  }
 
-        // Timeline validation
-        if (!Array.isArray(entry.timeline)) return false;
+  /**
+   * Write the queued updates to S3 and settle their promises. The radar is
+   * read with its ETag and written with If-Match; if it was changed elsewhere
+   * in the meantime, the updates are merged into the new version and written
+   * again.
+   * @returns {Promise<void>} Resolves once every queued update is settled
+   */
+  async flush() {
+    let batch = this.pending;
+    this.pending = [];
 
-        const validTimeline = entry.timeline.every(
-          t =>
-            typeof t.moved === 'number' &&
-            validRingIds.has(t.ringId) &&
-            typeof t.date === 'string' &&
-            typeof t.description === 'string'
+    try {
+      for (let attempt = 1; attempt <= this.writeAttempts; attempt++) {
+        const { data: radarData, etag } = await s3Service.getObjectWithETag(
+          'main',
+          this.radarKey
         );
-        if (!validTimeline) return false;
 
-        // Optional fields validation
-        if (entry.description && typeof entry.description !== 'string')
+        // Reject updates that are invalid for this version of the radar
+        batch = batch.filter(update => {
+          if (this.isValidUpdate(update, radarData)) return true;
+          this.settle(update, new Error('Invalid entry structure'));
           return false;
-        if (entry.key && typeof entry.key !== 'string') return false;
-        if (entry.url && typeof entry.url !== 'string') return false;
-        if (entry.links && !Array.isArray(entry.links)) return false;
+        });
+        if (batch.length === 0) return;
 
-        return true;
-      });
+        radarData.entries = this.mergeEntries(radarData.entries, batch);
+
+        try {
+          await s3Service.putObject('main', this.radarKey, radarData, {
+            ifMatch: etag,
+          });
+        } catch (error) {
+          if (!s3Service.isWriteConflict(error)) throw error;
+          // Back off with jitter so competing writers do not retry in lockstep
+          await sleep(
+            Math.random() * Math.min(1000, this.writeBackoffMs * 2 ** attempt)
+          );
+          continue;
+        }
 
-      if (!validEntries) {
-        throw new Error('Invalid entry structure');
+        batch.forEach(update => {
+          logger.info(`Tech radar updated successfully by ${update.role}`, {
+            entriesCount: update.entries.length,
+            totalEntries: radarData.entries.length,
+          });
+          this.settle(update);
+        });
+        if (batch.length > 1) {
+          logger.info('Coalesced tech radar updates into one write', {
+            updates: batch.length,
+            attempts: attempt,
+          });
+        }
+        return;
       }
 
-      // Merge with existing entries
-      const existingEntriesMap = new Map(
-        existingData.entries.map(entry => [entry.id, entry])
+      const error = new Error(
+        'Tech radar was changed by another request, please try again'
       );
+      error.status = 409;
+      throw error;
+    } catch (error) {
+      batch.forEach(update => this.settle(update, error));
+    }
+  }
 
-      // Update or add new entries
+  /**
+   * Resolve a queued update's promise, or log the error and reject it.
+   * @param {Object} update - Queued update
+   * @param {Error} [error] - Error to reject with
+   */
+  settle(update, error) {
+    if (!error) {
+      update.resolve();
+      return;
+    }
+    logger.error(`Error updating tech radar (${update.role}):`, {
+      error: error.message,
+    });
+    update.reject(error);
+  }
+
+  /**
+   * Check one queued update on its own, so that a malformed update (for
+   * example a null entry) is rejected without failing the rest of the batch.
+   * @param {Object} update - Queued update
+   * @param {Object} radarData - Current tech radar data
+   * @returns {boolean} True if every entry in the update is valid
+   */
+  isValidUpdate(update, radarData) {
+    try {
+      return this.validateEntries(update.entries, radarData);
+    } catch (error) {
+      logger.warn(`Malformed tech radar update (${update.role}):`, {
+        error: error.message,
+      });
+      return false;
+    }
+  }
+
+  /**
+   * Merge updated entries into the existing entries. Updates are applied in
+   * order, so a later update to the same entry wins.
+   * @param {Array} existingEntries - Current radar entries
+   * @param {Object[]} updates - Queued updates, each with an `entries` array
+   * @returns {Array} The merged entries, sorted
+   */
+  mergeEntries(existingEntries, updates) {
+    const existingEntriesMap = new Map(
+      existingEntries.map(entry => [entry.id, entry])
+    );
+
+    // Update or add new entries
+    updates.forEach(({ entries }) => {
       entries.forEach(newEntry => {
         existingEntriesMap.set(newEntry.id, {
           ...(existingEntriesMap.get(newEntry.id) || {}),
           ...newEntry,
         });
       });
+    });
 
-      existingData.entries = Array.from(existingEntriesMap.values());
+    return this.sortEntries(Array.from(existingEntriesMap.values()));
+  }
 
-      // Sort entries to maintain consistent order
-      existingData.entries.sort((a, b) => {
-        // First by quadrant
-        if (a.quadrant !== b.quadrant) {
-          return parseInt(a.quadrant) - parseInt(b.quadrant);
-        }
-        // Then by title
-        return a.title.localeCompare(b.title);
-      });
+  /**
+   * Check that entries have the required fields and refer to quadrants and
+   * rings that exist in the radar.
+   * @param {Array} entries - Array of entry objects
+   * @param {Object} radarData - Current tech radar data
+   * @returns {boolean} True if every entry is valid
+   */
+  validateEntries(entries, radarData) {
+    // Get valid quadrant and ring IDs from existing data
+    const validQuadrantIds = new Set(radarData.quadrants.map(q => q.id));
+    const validRingIds = new Set([
+      ...radarData.rings.map(r => r.id),
+      'ignore',
+      'review',
+    ]);
 
-      // Save the updated data
-      await s3Service.putObject('main', this.radarKey, existingData);
+    return entries.every(entry => {
+      // Required fields validation
+      if (
+        !entry.id ||
+        typeof entry.id !== 'string' ||
+        !entry.title ||
+        typeof entry.title !== 'string' ||
+        !entry.quadrant ||
+        !validQuadrantIds.has(entry.quadrant)
+      ) {
+        return false;
+      }
 
-      logger.info(`Tech radar updated successfully by ${role}`, {
-        entriesCount: entries.length,
-        totalEntries: existingData.entries.length,
-      });
-    } catch (error) {
-      logger.error(`Error updating tech radar (${role}):`, {
-        error: error.message,
-      });
-      throw error;
-    }
+      // Timeline validation
+      if (!Array.isArray(entry.timeline)) return false;
+
+      const validTimeline = entry.timeline.every(
+        t =>
+          typeof t.moved === 'number' &&
+          validRingIds.has(t.ringId) &&
+          typeof t.date === 'string' &&
+          typeof t.description === 'string'
+      );
+      if (!validTimeline) return false;
+
+      // Optional fields validation
+      if (entry.description && typeof entry.description !== 'string')
+        return false;
+      if (entry.key && typeof entry.key !== 'string') return false;
+      if (entry.url && typeof entry.url !== 'string') return false;
+      if (entry.links && !Array.isArray(entry.links)) return false;
+
+      return true;
+    });
+  }
+
+  /**
+   * Sort entries to maintain a consistent order: by quadrant, then by title.
+   * @param {Array} entries - Array of entry objects
+   * @returns {Array} The sorted entries
+   */
+  sortEntries(entries) {
+    return entries.sort((a, b) => {
+      // First by quadrant
+      if (a.quadrant !== b.quadrant) {
+        return parseInt(a.quadrant) - parseInt(b.quadrant);
+      }
+      // Then by title
+      return a.title.localeCompare(b.title);
+    });
   }
 }
 
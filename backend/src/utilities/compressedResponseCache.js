@@ -0,0 +1,282 @@
+const crypto = require('crypto');
+const zlib = require('zlib');
+const { promisify } = require('util');
+const logger = require('../config/logger');
+const { timeStage } = require('./serverTiming');
+
+const gzip = promisify(zlib.gzip);
+const brotliCompress = promisify(zlib.brotliCompress);
+
+// Brotli at its highest quality is slow, but each body is compressed once per
+// data version, in the background
+const BROTLI_QUALITY =
+  parseInt(process.env.COMPRESSED_RESPONSE_BROTLI_QUALITY, 10) || 11;
+
+// Bodies smaller than this are left to the compression middleware
+const MIN_COMPRESS_BYTES = 1024;
+
+// Compressed variants, in order of preference when a client accepts several
+const ENCODINGS = {
+  br: body =>
+    brotliCompress(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+        [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+      },
+    }),
+  gzip: body => gzip(body, { level: zlib.constants.Z_BEST_COMPRESSION }),
+};
+
+/**
+ * In-process cache of serialised response bodies and their gzip and brotli
+ * copies, so that large responses are serialised and compressed once per
+ * version of their data rather than on every request.
+ *
+ * Each key holds one version. The compressed copies are built in the
+ * background after the body is cached; until they are ready the body is sent
+ * as it is and compressed on the fly. Entries are kept in a Map in recency
+ * order, and the least recently used are evicted once the bodies and their
+ * copies together exceed `maxBytes`.
+ */
+class CompressedResponseCache {
+  /**
+   * @param {Object} [options]
+   * @param {number} [options.maxBytes=134217728] - Maximum total size of the cached bodies and their compressed copies
+   */
+  constructor({ maxBytes = 128 * 1024 * 1024 } = {}) {
+    this.maxBytes = maxBytes;
+    this.bytes = 0;
+    this.entries = new Map();
+    this.building = new Map();
+    this.stats = { hits: 0, misses: 0, evictions: 0 };
+  }
+
+  /**
+   * Get the cached response for a version of its data, serialising it on a
+   * miss. Concurrent misses for the same version share one serialisation.
+   * @param {string} key - Response key, e.g. '/api/csv'
+   * @param {string|number} version - Version of the data, e.g. its S3 ETag
+   * @param {function(): (string|Buffer|Promise<string|Buffer>)} serialise - Builds the response body
+   * @returns {Promise<{version: string|number, etag: string, body: Buffer, variants: Object<string, Buffer>}>} Cached response, with the compressed copies built so far in `variants`
+   */
+  async get(key, version, serialise) {
+    const cached = this.entries.get(key);
+    if (cached?.version === version) {
+      this.stats.hits++;
+      this.entries.delete(key);
+      this.entries.set(key, cached);
+      return cached;
+    }
+
+    const building = this.building.get(key);
+    if (building?.version === version) {
+      return building.promise;
+    }
+
+    this.stats.misses++;
+    const promise = (async () => {
+      const serialised = await timeStage('serialise', serialise);
+      const body = Buffer.isBuffer(serialised)
+        ? serialised
+        : Buffer.from(serialised);
+      const entry = {
+        version,
+        etag: `W/"${crypto.createHash('sha1').update(body).digest('hex')}"`,
+        body,
+        variants: {},
+        bytes: body.length,
+      };
+
+      this.store(key, entry);
+      const stored = this.entries.get(key) === entry;
+      if (stored && body.length >= MIN_COMPRESS_BYTES) {
+        this.compress(key, entry);
+      }
+      return entry;
+    })().finally(() => {
+      if (this.building.get(key)?.promise === promise) {
+        this.building.delete(key);
+      }
+    });
+
+    this.building.set(key, { version, promise });
+    return promise;
+  }
+
+  /**
+   * Store an entry in place of the key's previous version, evicting the least
+   * recently used entries past the size bound. Entries larger than the bound
+   * are served but not stored.
+   * @param {string} key - Response key
+   * @param {Object} entry - Entry to store
+   */
+  store(key, entry) {
+    this.delete(key);
+    if (entry.bytes > this.maxBytes) {
+      logger.warn('Response is too large for the compressed response cache', {
+        key,
+        bytes: entry.bytes,
+        maxBytes: this.maxBytes,
+      });
+      return;
+    }
+
+    this.entries.set(key, entry);
+    this.bytes += entry.bytes;
+    this.evict(key);
+  }
+
+  /**
+   * Evict the least recently used entries until the cache is within its size
+   * bound. The entry being added to is kept; it is never larger than the bound.
+   * @param {string} keep - Key of the entry being added to
+   */
+  evict(keep) {
+    for (const key of this.entries.keys()) {
+      if (this.bytes <= this.maxBytes) return;
+      if (key === keep) continue;
+      this.delete(key);
+      this.stats.evictions++;
+    }
+  }
+
+  /**
+   * Remove an entry from the cache
+   * @param {string} key - Response key
+   */
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return;
+    this.entries.delete(key);
+    this.bytes -= entry.bytes;
+  }
+
+  /**
+   * Build the compressed copies of an entry's body, one at a time. A copy is
+   * only added while the entry is still cached and stays within the size
+   * bound with it, evicting other entries if needed.
+   * @param {string} key - Response key
+   * @param {Object} entry - Cached entry
+   * @returns {Promise<void>} Resolves once every copy is built or has failed
+   */
+  async compress(key, entry) {
+    // gzip first: it is quick to build and accepted by every client
+    for (const encoding of ['gzip', 'br']) {
+      try {
+        const start = Date.now();
+        const compressed = await ENCODINGS[encoding](entry.body);
+        if (this.entries.get(key) !== entry) return;
+        if (entry.bytes + compressed.length > this.maxBytes) {
+          logger.warn('No room to cache compressed response', {
+            key,
+            encoding,
+          });
+          continue;
+        }
+
+        entry.variants[encoding] = compressed;
+        entry.bytes += compressed.length;
+        this.bytes += compressed.length;
+        this.evict(key);
+        logger.info('Cached compressed response', {
+          key,
+          encoding,
+          bytes: entry.body.length,
+          compressedBytes: compressed.length,
+          durationMs: Date.now() - start,
+        });
+      } catch (error) {
+        logger.error('Error compressing cached response:', {
+          key,
+          encoding,
+          error: error.message,
+        });
+      }
+    }
+  }
+}
+
+/**
+ * Picks the encoding a client prefers from its Accept-Encoding header. The
+ * highest q-value wins; on a tie the earlier of `encodings` is used, so that
+ * brotli is preferred for browsers sending `gzip, deflate, br` with equal
+ * weights. Express's req.acceptsEncodings would break the tie by the header
+ * order instead. `identity` is acceptable unless refused with q=0.
+ * @param {string} [acceptEncoding] - Accept-Encoding request header
+ * @param {string[]} encodings - Available encodings, in order of preference
+ * @returns {string|undefined} Preferred encoding, or undefined if none is acceptable
+ */
+function preferredEncoding(acceptEncoding, encodings) {
+  const weights = new Map();
+  (acceptEncoding || '').split(',').forEach(part => {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    if (!name) return;
+    const q = params.map(param => param.trim()).find(p => p.startsWith('q='));
+    const weight = q ? parseFloat(q.slice(2)) : 1;
+    weights.set(name, Number.isFinite(weight) ? weight : 0);
+  });
+
+  const weightOf = name => {
+    if (weights.has(name)) return weights.get(name);
+    if (weights.has('*')) return weights.get('*');
+    return name === 'identity' ? 1 : 0;
+  };
+
+  let best;
+  encodings.forEach(name => {
+    const weight = weightOf(name);
+    if (weight > 0 && (best === undefined || weight > weightOf(best))) {
+      best = name;
+    }
+  });
+  return best;
+}
+
+/**
+ * Send a cached response in the encoding the client prefers among those that
+ * have been built, with `Vary: Accept-Encoding` and the body's ETag (so Express
+ * answers a matching If-None-Match with 304). Without a ready compressed
+ * copy the body is sent as it is, for the compression middleware to compress.
+ * @param {Object} req - Express request object
+ * @param {Object} res - Express response object
+ * @param {Object} entry - Cached response from CompressedResponseCache.get
+ * @param {string} [contentType='application/json; charset=utf-8'] - Content type of the body
+ */
+function sendCompressed(
+  req,
+  res,
+  entry,
+  contentType = 'application/json; charset=utf-8'
+) {
+  res.set({
+    'Content-Type': contentType,
+    ETag: entry.etag,
+    Vary: 'Accept-Encoding',
+  });
+
+  const built = Object.keys(ENCODINGS).filter(name => entry.variants[name]);
+  const encoding = preferredEncoding(req.headers['accept-encoding'], [
+    ...built,
+    'identity',
+  ]);
+  if (encoding && encoding !== 'identity') {
+    res.set('Content-Encoding', encoding);
+    return res.status(200).send(entry.variants[encoding]);
+  }
+  res.status(200).send(entry.body);
+}
+
+// Shared by the routes serving large, rarely changing responses
+const responseCache = new CompressedResponseCache({
+  maxBytes:
+    parseInt(process.env.COMPRESSED_RESPONSE_CACHE_MAX_BYTES, 10) ||
+    128 * 1024 * 1024,
+});
+
+module.exports = {
+  CompressedResponseCache,
+  responseCache,
+  preferredEncoding,
+  sendCompressed,
+};
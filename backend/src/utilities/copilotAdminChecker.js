@@ -21,19 +21,19 @@ async function getCopilotTeamsWithCache(bucketName) {
  */
 async function checkCopilotAdminStatus(userToken) {
   try {
-    // Get user's teams
+    // Get user's teams (cached per token)
     const userTeams = await githubService.getUserTeams(userToken);
     const userTeamSlugs = userTeams.map(team => team.slug);
 
-    // Get admin teams from S3
+    // Get admin teams from S3 (cached and revalidated by ETag)
     let adminTeams = [];
     try {
       const copilotBucketName =
         process.env.COPILOT_BUCKET_NAME || 'sdp-dev-copilot-usage-dashboard';
-      adminTeams = await s3Service.getObject(
+      ({ data: adminTeams } = await s3Service.getCachedObject(
         copilotBucketName,
         'admin_teams.json'
-      );
+      ));
     } catch (error) {
       logger.warn('Could not fetch admin_teams.json from S3:', {
         error: error.message,
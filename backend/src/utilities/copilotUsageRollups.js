@@ -0,0 +1,226 @@
+const { searchRange } = require('./searchSorted');
+
+// Rollups built per historic_usage_data.json version, keyed by the parsed array
+const rollupCache = new WeakMap();
+
+/**
+ * Period key functions for each granularity. Keys sort in date order: days
+ * and weeks are YYYY-MM-DD (weeks start on Sunday, as on the dashboard) and
+ * months are YYYY-MM.
+ */
+const periodKeys = {
+  day: day => day,
+  week: day => {
+    const date = new Date(`${day}T00:00:00Z`);
+    date.setUTCDate(date.getUTCDate() - date.getUTCDay());
+    return date.toISOString().slice(0, 10);
+  },
+  month: day => day.slice(0, 7),
+};
+
+const GRANULARITIES = Object.keys(periodKeys);
+
+/**
+ * Sums the code completion and chat metrics of one day of usage data.
+ * @param {Object} entry - Daily usage entry
+ * @returns {{completions: Object, chat: Object}} Daily metric totals
+ */
+function summariseDay(entry) {
+  const completions = {
+    suggestions: 0,
+    acceptances: 0,
+    linesSuggested: 0,
+    linesAccepted: 0,
+    engagedUsers: entry.copilot_ide_code_completions?.total_engaged_users ?? 0,
+  };
+  entry.copilot_ide_code_completions?.editors?.forEach(editor => {
+    editor.models?.forEach(model => {
+      model.languages?.forEach(lang => {
+        completions.suggestions += lang.total_code_suggestions ?? 0;
+        completions.acceptances += lang.total_code_acceptances ?? 0;
+        completions.linesSuggested += lang.total_code_lines_suggested ?? 0;
+        completions.linesAccepted += lang.total_code_lines_accepted ?? 0;
+      });
+    });
+  });
+
+  const chat = {
+    chats: 0,
+    insertions: 0,
+    copies: 0,
+    engagedUsers: entry.copilot_ide_chat?.total_engaged_users ?? 0,
+  };
+  entry.copilot_ide_chat?.editors?.forEach(editor => {
+    editor.models?.forEach(model => {
+      chat.chats += model.total_chats ?? 0;
+      chat.insertions += model.total_chat_insertion_events ?? 0;
+      chat.copies += model.total_chat_copy_events ?? 0;
+    });
+  });
+
+  return { completions, chat };
+}
+
+/**
+ * Adds each numeric metric of `source` to `target`.
+ * @param {Object} target - Totals to add to
+ * @param {Object} source - Metrics to add
+ */
+function addMetrics(target, source) {
+  Object.keys(source).forEach(metric => {
+    target[metric] = (target[metric] || 0) + source[metric];
+  });
+}
+
+/**
+ * Creates an empty rollup point for a period.
+ * @param {string} date - Period key
+ * @returns {Object} Rollup point
+ */
+function createPoint(date) {
+  return {
+    date,
+    days: 0,
+    completions: {
+      suggestions: 0,
+      acceptances: 0,
+      linesSuggested: 0,
+      linesAccepted: 0,
+      engagedUsers: 0,
+    },
+    chat: { chats: 0, insertions: 0, copies: 0, engagedUsers: 0 },
+  };
+}
+
+/**
+ * Adds the acceptance and chat rates to a rollup point.
+ * @param {Object} point - Rollup point
+ * @returns {Object} The point
+ */
+function addRates(point) {
+  const { completions, chat } = point;
+  completions.acceptanceRate =
+    completions.suggestions > 0
+      ? (completions.acceptances / completions.suggestions) * 100
+      : 0;
+  chat.insertionRate = chat.chats > 0 ? chat.insertions / chat.chats : 0;
+  chat.copyRate = chat.chats > 0 ? chat.copies / chat.chats : 0;
+  return point;
+}
+
+/**
+ * Builds daily, weekly and monthly rollups of the organisation usage data.
+ * Each day is summarised once and added to its week and month.
+ * @param {Object[]} usageData - Daily usage entries from historic_usage_data.json
+ * @returns {{days: {entries: Object[], keys: string[]}, rollups: Object<string, {points: Object[], keys: string[]}>}} Raw entries in date order with their days, and the rollup points in date order with their period keys for each granularity
+ */
+function buildOrgUsageRollups(usageData) {
+  const days = [];
+  const periods = {};
+  GRANULARITIES.forEach(granularity => {
+    periods[granularity] = new Map();
+  });
+
+  (Array.isArray(usageData) ? usageData : []).forEach(entry => {
+    const day = String(entry?.date ?? '').slice(0, 10);
+    if (!/^\d{4}-\d{2}-\d{2}$/.test(day)) return;
+    days.push({ day, entry });
+    const { completions, chat } = summariseDay(entry);
+
+    GRANULARITIES.forEach(granularity => {
+      const key = periodKeys[granularity](day);
+      let point = periods[granularity].get(key);
+      if (!point) {
+        point = createPoint(key);
+        periods[granularity].set(key, point);
+      }
+      point.days++;
+      addMetrics(point.completions, completions);
+      addMetrics(point.chat, chat);
+    });
+  });
+
+  const rollups = {};
+  GRANULARITIES.forEach(granularity => {
+    const points = Array.from(periods[granularity].values())
+      .sort((a, b) => (a.date < b.date ? -1 : a.date > b.date ? 1 : 0))
+      .map(addRates);
+    rollups[granularity] = { points, keys: points.map(point => point.date) };
+  });
+
+  days.sort((a, b) => (a.day < b.day ? -1 : a.day > b.day ? 1 : 0));
+  return {
+    days: {
+      entries: days.map(({ entry }) => entry),
+      keys: days.map(({ day }) => day),
+    },
+    rollups,
+  };
+}
+
+/**
+ * Returns the rollups for a parsed historic_usage_data.json, building them on
+ * first use for each version of the data.
+ * @param {Object[]} usageData - Daily usage entries
+ * @returns {{days: Object, rollups: Object}} Sorted raw entries and rollups for each granularity
+ */
+function getOrgUsageRollups(usageData) {
+  let rollups = rollupCache.get(usageData);
+  if (!rollups) {
+    rollups = buildOrgUsageRollups(usageData);
+    rollupCache.set(usageData, rollups);
+  }
+  return rollups;
+}
+
+/**
+ * Gets the rollup points of one granularity for a date range. Periods that
+ * overlap the range are included in full; the range is found by binary search.
+ * @param {Object[]} usageData - Daily usage entries
+ * @param {Object} options
+ * @param {string} options.granularity - One of 'day', 'week' or 'month'
+ * @param {string} [options.since] - First day to include, as YYYY-MM-DD
+ * @param {string} [options.until] - Last day to include, as YYYY-MM-DD
+ * @returns {{granularity: string, points: Object[], totals: Object}} Rollup points in date order, and the totals across them
+ */
+function queryOrgUsageRollups(usageData, { granularity, since, until }) {
+  const { points, keys } = getOrgUsageRollups(usageData).rollups[granularity];
+  const toKey = periodKeys[granularity];
+  const { start, end } = searchRange(
+    keys,
+    since && toKey(since),
+    until && toKey(until)
+  );
+  const selected = points.slice(start, end);
+
+  const totals = createPoint(undefined);
+  delete totals.date;
+  selected.forEach(point => {
+    totals.days += point.days;
+    addMetrics(totals.completions, point.completions);
+    addMetrics(totals.chat, point.chat);
+  });
+
+  return { granularity, points: selected, totals: addRates(totals) };
+}
+
+/**
+ * Gets the raw daily usage entries for a date range, in date order.
+ * @param {Object[]} usageData - Daily usage entries
+ * @param {Object} options
+ * @param {string} [options.since] - First day to include, as YYYY-MM-DD
+ * @param {string} [options.until] - Last day to include, as YYYY-MM-DD
+ * @returns {Object[]} Daily usage entries
+ */
+function sliceOrgUsage(usageData, { since, until }) {
+  const { entries, keys } = getOrgUsageRollups(usageData).days;
+  const { start, end } = searchRange(keys, since, until);
+  return entries.slice(start, end);
+}
+
+module.exports = {
+  GRANULARITIES,
+  getOrgUsageRollups,
+  queryOrgUsageRollups,
+  sliceOrgUsage,
+};
@@ -2,13 +2,33 @@ const {
   SecretsManagerClient,
   GetSecretValueCommand,
 } = require('@aws-sdk/client-secrets-manager');
+const { performance } = require('perf_hooks');
+const logger = require('../config/logger');
+
 const GITHUB_ORG = process.env.GITHUB_ORG || 'ONSdigital';
 
+// Refresh the installation token this long before it expires
+const TOKEN_REFRESH_MARGIN_MS =
+  parseInt(process.env.GITHUB_TOKEN_REFRESH_MARGIN_MS, 10) || 5 * 60 * 1000;
+
+// One installation client per process, and the refresh in progress (if any)
+let installation = null;
+let refreshing = null;
+
+const tokenMetrics = {
+  acquisitions: 0,
+  reused: 0,
+  failures: 0,
+  totalAcquisitionMs: 0,
+  lastAcquisitionMs: 0,
+};
+
 /**
- * Get the app and installation from the GitHub API
- * @returns {Promise<Octokit>} The Octokit instance
+ * Create the GitHub App and the Octokit instance for the organisation's
+ * installation. This reads the private key from AWS Secrets Manager.
+ * @returns {Promise<Octokit>} Octokit instance authenticated as the installation
  */
-async function getAppAndInstallation() {
+async function createInstallationOctokit() {
   const secretsManager = new SecretsManagerClient({ region: 'eu-west-2' });
   const { App } = await import('@octokit/app');
 
@@ -25,20 +45,107 @@ async function getAppAndInstallation() {
 
   const secrets = await getGithubAppSecrets();
 
-  const app = new App({
+  const options = {
     appId: process.env.GITHUB_APP_ID,
     privateKey: secrets.privateKey,
-  });
+  };
+  if (process.env.GITHUB_API_URL) {
+    const { Octokit } = await import('@octokit/core');
+    options.Octokit = Octokit.defaults({ baseUrl: process.env.GITHUB_API_URL });
+  }
+  const app = new App(options);
 
-  const installation = await app.octokit.request(
+  const installationResponse = await app.octokit.request(
     `/orgs/${GITHUB_ORG}/installation`
   );
-  const installation_id = installation.data.id;
-  const octokit = await app.getInstallationOctokit(installation_id);
+  const installation_id = installationResponse.data.id;
+  return app.getInstallationOctokit(installation_id);
+}
+
+/**
+ * Acquire a new installation token, creating the installation client on first
+ * use. The token is held in the Octokit instance's auth cache, so requests made
+ * with the instance use it until the next refresh.
+ * @returns {Promise<{octokit: Octokit, expiresAt: number}>} Installation client and token expiry time
+ */
+async function refreshInstallation() {
+  const start = performance.now();
+  try {
+    const octokit =
+      installation?.octokit || (await createInstallationOctokit());
+    const { expiresAt } = await octokit.auth({
+      type: 'installation',
+      refresh: true,
+    });
+
+    installation = { octokit, expiresAt: Date.parse(expiresAt) };
+
+    const duration = performance.now() - start;
+    tokenMetrics.acquisitions++;
+    tokenMetrics.totalAcquisitionMs += duration;
+    tokenMetrics.lastAcquisitionMs = duration;
+    logger.info('Acquired GitHub installation token', {
+      durationMs: Math.round(duration),
+      expiresAt,
+    });
+
+    return installation;
+  } catch (error) {
+    tokenMetrics.failures++;
+    logger.error('Error acquiring GitHub installation token', {
+      error: error.message,
+    });
+    throw error;
+  }
+}
 
+/**
+ * Start a token refresh, or join the one already in progress.
+ * @returns {Promise<{octokit: Octokit, expiresAt: number}>} Installation client and token expiry time
+ */
+function refreshInstallationOnce() {
+  if (!refreshing) {
+    refreshing = refreshInstallation().finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+}
+
+/**
+ * Get the Octokit instance for the GitHub App installation.
+ *
+ * The instance and its installation token are reused across calls. Once the
+ * token is within the refresh margin of its expiry, a new one is requested in
+ * the background while the current one is still served; an expired or missing
+ * token is waited for. Concurrent callers share a single refresh.
+ * @returns {Promise<Octokit>} The Octokit instance
+ */
+async function getAppAndInstallation() {
+  const now = Date.now();
+
+  if (installation && now < installation.expiresAt) {
+    tokenMetrics.reused++;
+    if (now >= installation.expiresAt - TOKEN_REFRESH_MARGIN_MS) {
+      // Failures are logged and counted in refreshInstallation
+      refreshInstallationOnce().catch(() => {});
+    }
+    return installation.octokit;
+  }
+
+  const { octokit } = await refreshInstallationOnce();
   return octokit;
 }
 
+/**
+ * Get the installation token metrics.
+ * @returns {{acquisitions: number, reused: number, failures: number, totalAcquisitionMs: number, lastAcquisitionMs: number}} Token acquisition counts and time spent acquiring tokens
+ */
+function getInstallationTokenMetrics() {
+  return { ...tokenMetrics };
+}
+
 module.exports = {
   getAppAndInstallation,
+  getInstallationTokenMetrics,
 };
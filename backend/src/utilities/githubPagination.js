@@ -0,0 +1,60 @@
+const { mapWithConcurrency } = require('./mapWithConcurrency');
+const { recordGitHubRequest } = require('./metrics');
+
+/**
+ * Gets the last page number from a GitHub `Link` response header.
+ * @param {string} [link] - Link header value
+ * @returns {number} Last page number, or 1 if there are no further pages
+ */
+function getLastPage(link) {
+  const last = (link || '').split(',').find(part => /rel="last"/.test(part));
+  const match = last?.match(/[?&]page=(\d+)/);
+  return match ? parseInt(match[1], 10) : 1;
+}
+
+/**
+ * Fetches every page of a paginated GitHub list endpoint. The first page is
+ * requested on its own; once its `Link` header gives the page count, the
+ * remaining pages are fetched concurrently. Each request is counted in the
+ * GitHub metrics by route, so path parameters should be passed in `params`
+ * (e.g. 'GET /orgs/{org}/teams') rather than written into the route.
+ * @param {Object} octokit - Octokit instance
+ * @param {string} route - Request route, e.g. 'GET /user/teams'
+ * @param {Object} [options]
+ * @param {Object} [options.params] - Additional request parameters
+ * @param {number} [options.concurrency=4] - Maximum number of pages fetched at once
+ * @returns {Promise<Array>} Items from all pages, in page order
+ */
+async function paginate(octokit, route, { params = {}, concurrency = 4 } = {}) {
+  const request = async page => {
+    try {
+      const response = await octokit.request(route, {
+        headers: {
+          'X-GitHub-Api-Version': '2022-11-28',
+        },
+        ...params,
+        per_page: 100,
+        page,
+      });
+      recordGitHubRequest(route, response);
+      return response;
+    } catch (error) {
+      recordGitHubRequest(route, error);
+      throw error;
+    }
+  };
+
+  const first = await request(1);
+  const lastPage = getLastPage(first.headers?.link);
+
+  const pages = [];
+  for (let page = 2; page <= lastPage; page++) pages.push(page);
+  const rest = await mapWithConcurrency(pages, concurrency, request);
+
+  return [first, ...rest].flatMap(response => response.data || []);
+}
+
+module.exports = {
+  getLastPage,
+  paginate,
+};
@@ -0,0 +1,27 @@
+/**
+ * Maps over items with an async function, running at most `limit` calls at a
+ * time. Results keep the order of the input items.
+ * @param {Array} items - Items to map
+ * @param {number} limit - Maximum number of concurrent calls
+ * @param {function(*, number): Promise<*>} fn - Called with each item and its index
+ * @returns {Promise<Array>} Results in input order
+ */
+async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  const workers = Math.min(Math.max(1, limit), items.length);
+  await Promise.all(Array.from({ length: workers }, worker));
+  return results;
+}
+
+module.exports = {
+  mapWithConcurrency,
+};
@@ -0,0 +1,357 @@
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// Latency buckets in seconds, from a cached lookup to a cold S3 read of a large object
+const LATENCY_BUCKETS = [
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+];
+
+/**
+ * Escapes a label value for the Prometheus text format.
+ * @param {*} value - Label value
+ * @returns {string} Escaped value
+ */
+function escapeLabel(value) {
+  return String(value)
+    .replace(/\\/g, '\\\\')
+    .replace(/"/g, '\\"')
+    .replace(/\n/g, '\\n');
+}
+
+/**
+ * Formats a label set, e.g. '{route="/api/csv",status="200"}'.
+ * @param {Object} labels - Label values by name
+ * @returns {string} Formatted labels, or '' when there are none
+ */
+function formatLabels(labels) {
+  const pairs = Object.entries(labels).map(
+    ([name, value]) => `${name}="${escapeLabel(value)}"`
+  );
+  return pairs.length ? `{${pairs.join(',')}}` : '';
+}
+
+/**
+ * A counter, gauge or histogram with a fixed set of label names. Each
+ * distinct label set is kept as its own series, so label values must come
+ * from a small set (route templates and bucket names, never raw URLs).
+ */
+class Metric {
+  /**
+   * @param {Object} options
+   * @param {string} options.name - Metric name
+   * @param {string} options.help - Description shown in the exposition
+   * @param {'counter'|'gauge'|'histogram'} options.type - Metric type
+   * @param {string[]} [options.labelNames=[]] - Label names
+   * @param {number[]} [options.buckets] - Histogram bucket upper bounds
+   */
+  constructor({
+    name,
+    help,
+    type,
+    labelNames = [],
+    buckets = LATENCY_BUCKETS,
+  }) {
+    this.name = name;
+    this.help = help;
+    this.type = type;
+    this.labelNames = labelNames;
+    this.buckets = buckets;
+    this.series = new Map();
+  }
+
+  /**
+   * Gets the series for a label set, creating it on first use.
+   * @param {Object} labels - Label values by name
+   * @returns {Object} The series
+   */
+  getSeries(labels) {
+    const values = this.labelNames.map(name => labels[name] ?? '');
+    const key = values.join('\u0000');
+    let series = this.series.get(key);
+    if (!series) {
+      series = {
+        labels: Object.fromEntries(
+          this.labelNames.map((name, i) => [name, values[i]])
+        ),
+        value: 0,
+      };
+      if (this.type === 'histogram') {
+        series.counts = new Array(this.buckets.length).fill(0);
+        series.count = 0;
+      }
+      this.series.set(key, series);
+    }
+    return series;
+  }
+
+  /**
+   * Adds to a counter or gauge.
+   * @param {Object} [labels={}] - Label values by name
+   * @param {number} [value=1] - Amount to add
+   */
+  inc(labels = {}, value = 1) {
+    this.getSeries(labels).value += value;
+  }
+
+  /**
+   * Sets a gauge, or a counter whose total is kept elsewhere (e.g. cache stats).
+   * @param {Object} labels - Label values by name
+   * @param {number} value - New value
+   */
+  set(labels, value) {
+    this.getSeries(labels).value = value;
+  }
+
+  /**
+   * Records an observation in a histogram.
+   * @param {Object} labels - Label values by name
+   * @param {number} value - Observed value
+   */
+  observe(labels, value) {
+    const series = this.getSeries(labels);
+    series.value += value;
+    series.count += 1;
+    const bucket = this.buckets.findIndex(bound => value <= bound);
+    if (bucket !== -1) series.counts[bucket] += 1;
+  }
+
+  /**
+   * Formats the metric in the Prometheus text format.
+   * @returns {string[]} Exposition lines
+   */
+  render() {
+    const lines = [
+      `# HELP ${this.name} ${this.help}`,
+      `# TYPE ${this.name} ${this.type}`,
+    ];
+    for (const { labels, value, counts, count } of this.series.values()) {
+      if (this.type !== 'histogram') {
+        lines.push(`${this.name}${formatLabels(labels)} ${value}`);
+        continue;
+      }
+      // Buckets are kept per bucket and made cumulative here, once per scrape
+      const bucket = le =>
+        `${this.name}_bucket${formatLabels({ ...labels, le })}`;
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i];
+        lines.push(`${bucket(bound)} ${cumulative}`);
+      });
+      lines.push(
+        `${bucket('+Inf')} ${count}`,
+        `${this.name}_sum${formatLabels(labels)} ${value}`,
+        `${this.name}_count${formatLabels(labels)} ${count}`
+      );
+    }
+    return lines;
+  }
+}
+
+/**
+ * A set of metrics and the collectors that refresh values read from
+ * elsewhere (cache stats, memory usage) just before each scrape.
+ */
+class Registry {
+  constructor() {
+    this.metrics = new Map();
+    this.collectors = [];
+  }
+
+  /**
+   * Creates and registers a metric.
+   * @param {Object} options - See Metric
+   * @returns {Metric} The metric
+   */
+  register(options) {
+    const metric = new Metric(options);
+    this.metrics.set(metric.name, metric);
+    return metric;
+  }
+
+  /**
+   * Adds a function called before each scrape.
+   * @param {function(): void} collector - Updates metrics from their sources
+   */
+  addCollector(collector) {
+    this.collectors.push(collector);
+  }
+
+  /**
+   * Runs the collectors and formats every metric in the Prometheus text format.
+   * @returns {string} The exposition
+   */
+  render() {
+    this.collectors.forEach(collector => collector());
+    const lines = [];
+    for (const metric of this.metrics.values()) {
+      lines.push(...metric.render());
+    }
+    return `${lines.join('\n')}\n`;
+  }
+}
+
+const registry = new Registry();
+
+const httpRequestDuration = registry.register({
+  name: 'http_request_duration_seconds',
+  help: 'Time from receiving a request to finishing its response.',
+  type: 'histogram',
+  labelNames: ['method', 'route', 'status'],
+});
+const httpRequestBytes = registry.register({
+  name: 'http_request_bytes_total',
+  help: 'Request body bytes, from Content-Length.',
+  type: 'counter',
+  labelNames: ['method', 'route'],
+});
+const httpResponseBytes = registry.register({
+  name: 'http_response_bytes_total',
+  help: 'Response bytes sent, after compression and including headers.',
+  type: 'counter',
+  labelNames: ['method', 'route', 'status'],
+});
+const s3Requests = registry.register({
+  name: 's3_requests_total',
+  help: 'S3 requests by operation, object and result.',
+  type: 'counter',
+  labelNames: ['operation', 'bucket', 'key', 'result'],
+});
+const s3Bytes = registry.register({
+  name: 's3_bytes_total',
+  help: 'Object bytes read from or written to S3.',
+  type: 'counter',
+  labelNames: ['operation', 'bucket', 'key'],
+});
+const githubRequests = registry.register({
+  name: 'github_requests_total',
+  help: 'GitHub API requests by route and status.',
+  type: 'counter',
+  labelNames: ['route', 'status'],
+});
+const githubRateLimitRemaining = registry.register({
+  name: 'github_rate_limit_remaining',
+  help: 'Requests left in the GitHub rate limit window at the last response.',
+  type: 'gauge',
+  labelNames: ['resource'],
+});
+const rateLimitRejections = registry.register({
+  name: 'rate_limit_rejections_total',
+  help: 'Requests rejected with 429 by the API rate limiters.',
+  type: 'counter',
+  labelNames: ['limiter'],
+});
+const eventLoopLag = registry.register({
+  name: 'nodejs_eventloop_lag_seconds',
+  help: 'Event loop delay since the previous scrape.',
+  type: 'gauge',
+  labelNames: ['quantile'],
+});
+
+// Samples event loop delay every 20ms; read and reset on each scrape
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 20 });
+eventLoopDelay.enable();
+
+registry.addCollector(() => {
+  // The histogram reports nanoseconds, and NaN before its first sample
+  const seconds = ns => (Number.isFinite(ns) ? ns / 1e9 : 0);
+  const percentile = p => seconds(eventLoopDelay.percentile(p));
+  eventLoopLag.set({ quantile: '0.5' }, percentile(50));
+  eventLoopLag.set({ quantile: '0.99' }, percentile(99));
+  eventLoopLag.set({ quantile: '1' }, seconds(eventLoopDelay.max));
+  eventLoopDelay.reset();
+});
+
+/**
+ * Gets the route template a request was handled by, e.g. '/api/repository/project/json'.
+ * Requests that no route handled (rate limited or not found) are labelled with
+ * their router's mount path, so that arbitrary URLs do not create new series.
+ * @param {Object} req - Express request object
+ * @returns {string} Route label
+ */
+function getRouteLabel(req) {
+  if (req.route) return `${req.baseUrl}${req.route.path}`;
+  return req.baseUrl ? `${req.baseUrl}/*` : 'unmatched';
+}
+
+/**
+ * Express middleware that records each request's latency and byte counts by
+ * route. Mounted first, so that the latency covers body parsing and the
+ * response bytes are counted after compression.
+ * @param {Object} req - Express request object
+ * @param {Object} res - Express response object
+ * @param {function} next - Next middleware
+ */
+function metricsMiddleware(req, res, next) {
+  const start = process.hrtime.bigint();
+  // Keep-alive requests on a socket are handled one at a time, so the
+  // socket's byte count since the request arrived is this response's size
+  const bytesWritten = req.socket?.bytesWritten ?? 0;
+
+  res.on('finish', () => {
+    const route = getRouteLabel(req);
+    const status = String(res.statusCode);
+    httpRequestDuration.observe(
+      { method: req.method, route, status },
+      Number(process.hrtime.bigint() - start) / 1e9
+    );
+    httpRequestBytes.inc(
+      { method: req.method, route },
+      parseInt(req.headers['content-length'], 10) || 0
+    );
+    httpResponseBytes.inc(
+      { method: req.method, route, status },
+      (req.socket?.bytesWritten ?? bytesWritten) - bytesWritten
+    );
+  });
+
+  next();
+}
+
+/**
+ * Records an S3 request.
+ * @param {string} operation - 'get' or 'put'
+ * @param {string} bucket - Bucket name
+ * @param {string} key - Object key
+ * @param {string} result - 'ok', 'not_modified' or 'error'
+ * @param {number} [bytes=0] - Object bytes transferred
+ */
+function recordS3Request(operation, bucket, key, result, bytes = 0) {
+  s3Requests.inc({ operation, bucket, key, result });
+  if (bytes) s3Bytes.inc({ operation, bucket, key }, bytes);
+}
+
+/**
+ * Records a GitHub API response, or the error an Octokit request threw, and
+ * the rate limit left according to its headers.
+ * @param {string} route - Route template, e.g. 'GET /user/teams'
+ * @param {Object} response - Octokit response, or error with `status` and `response`
+ */
+function recordGitHubRequest(route, response) {
+  githubRequests.inc({ route, status: String(response?.status ?? 'error') });
+  const headers = response?.headers || response?.response?.headers || {};
+  const remaining = parseInt(headers['x-ratelimit-remaining'], 10);
+  if (Number.isFinite(remaining)) {
+    githubRateLimitRemaining.set(
+      { resource: headers['x-ratelimit-resource'] || 'core' },
+      remaining
+    );
+  }
+}
+
+/**
+ * Records a request rejected by a rate limiter.
+ * @param {string} limiter - Limiter name, e.g. 'general'
+ */
+function recordRateLimitRejection(limiter) {
+  rateLimitRejections.inc({ limiter });
+}
+
+module.exports = {
+  Metric,
+  Registry,
+  registry,
+  metricsMiddleware,
+  getRouteLabel,
+  recordS3Request,
+  recordGitHubRequest,
+  recordRateLimitRejection,
+};
@@ -0,0 +1,115 @@
+const s3Service = require('../services/s3Service');
+const githubService = require('../services/githubService');
+const { registry } = require('./metrics');
+const { responseCache } = require('./compressedResponseCache');
+const { getInstallationTokenMetrics } = require('./getAppAndInstallation');
+
+// Kept apart from metrics.js, which the services require to record their
+// requests. Loaded once at startup, so every scrape of the registry runs them.
+
+const cacheHits = registry.register({
+  name: 'cache_hits_total',
+  help: 'Lookups served from an in-process cache.',
+  type: 'counter',
+  labelNames: ['cache'],
+});
+const cacheMisses = registry.register({
+  name: 'cache_misses_total',
+  help: 'Lookups that had to load from S3 or GitHub.',
+  type: 'counter',
+  labelNames: ['cache'],
+});
+const cacheRevalidations = registry.register({
+  name: 'cache_revalidations_total',
+  help: 'Stale entries revalidated against their source.',
+  type: 'counter',
+  labelNames: ['cache'],
+});
+const cacheEvictions = registry.register({
+  name: 'cache_evictions_total',
+  help: 'Entries evicted to stay within the cache size bound.',
+  type: 'counter',
+  labelNames: ['cache'],
+});
+const cacheEntries = registry.register({
+  name: 'cache_entries',
+  help: 'Entries currently held in a cache.',
+  type: 'gauge',
+  labelNames: ['cache'],
+});
+const cacheBytes = registry.register({
+  name: 'cache_bytes',
+  help: 'Bytes held by a cache with a memory cap.',
+  type: 'gauge',
+  labelNames: ['cache'],
+});
+const memoryBytes = registry.register({
+  name: 'process_memory_bytes',
+  help: 'Process memory usage by kind (rss, heap_used, heap_total, external).',
+  type: 'gauge',
+  labelNames: ['kind'],
+});
+const tokenAcquisitions = registry.register({
+  name: 'github_token_acquisitions_total',
+  help: 'GitHub App installation tokens acquired.',
+  type: 'counter',
+});
+const tokenFailures = registry.register({
+  name: 'github_token_acquisition_failures_total',
+  help: 'Failed attempts to acquire a GitHub App installation token.',
+  type: 'counter',
+});
+const tokenReused = registry.register({
+  name: 'github_token_reused_total',
+  help: 'Requests served with the installation token already held.',
+  type: 'counter',
+});
+const tokenAcquisitionSeconds = registry.register({
+  name: 'github_token_acquisition_seconds_total',
+  help: 'Time spent acquiring installation tokens.',
+  type: 'counter',
+});
+const tokenLastAcquisitionSeconds = registry.register({
+  name: 'github_token_last_acquisition_seconds',
+  help: 'Time the most recent installation token took to acquire.',
+  type: 'gauge',
+});
+
+// The caches and the token code keep their own counters; copy them on each scrape
+registry.addCollector(() => {
+  const objectCaches = {
+    s3_objects: s3Service.objectCache,
+    github_user_teams: githubService.userTeamsCache,
+  };
+  for (const [cache, { stats, entries }] of Object.entries(objectCaches)) {
+    // Stale hits are served from memory while a refresh runs in the background
+    cacheHits.set({ cache }, stats.hits + stats.staleHits);
+    cacheMisses.set({ cache }, stats.misses);
+    cacheRevalidations.set({ cache }, stats.revalidations);
+    cacheEvictions.set({ cache }, stats.evictions);
+    cacheEntries.set({ cache }, entries.size);
+  }
+
+  const responses = responseCache.stats;
+  cacheHits.set({ cache: 'compressed_responses' }, responses.hits);
+  cacheMisses.set({ cache: 'compressed_responses' }, responses.misses);
+  cacheEvictions.set({ cache: 'compressed_responses' }, responses.evictions);
+  cacheEntries.set(
+    { cache: 'compressed_responses' },
+    responseCache.entries.size
+  );
+  cacheBytes.set({ cache: 'compressed_responses' }, responseCache.bytes);
+
+  const tokens = getInstallationTokenMetrics();
+  tokenAcquisitions.set({}, tokens.acquisitions);
+  tokenFailures.set({}, tokens.failures);
+  tokenReused.set({}, tokens.reused);
+  tokenAcquisitionSeconds.set({}, tokens.totalAcquisitionMs / 1000);
+  tokenLastAcquisitionSeconds.set({}, tokens.lastAcquisitionMs / 1000);
+
+  const memory = process.memoryUsage();
+  memoryBytes.set({ kind: 'rss' }, memory.rss);
+  memoryBytes.set({ kind: 'heap_used' }, memory.heapUsed);
+  memoryBytes.set({ kind: 'heap_total' }, memory.heapTotal);
+  memoryBytes.set({ kind: 'external' }, memory.external);
+});
@@ -0,0 +1,149 @@
+// Project fields holding arrays of technology names
+const TECHNOLOGY_ARRAY_FIELDS = [
+  ['architecture', 'languages', 'main'],
+  ['architecture', 'languages', 'others'],
+  ['architecture', 'frameworks', 'others'],
+  ['architecture', 'infrastructure', 'others'],
+  ['architecture', 'cicd', 'others'],
+  ['architecture', 'database', 'main'],
+  ['architecture', 'database', 'others'],
+  ...[
+    'code_editors',
+    'user_interface',
+    'diagrams',
+    'documentation',
+    'communication',
+    'collaboration',
+  ].flatMap(tool => [
+    ['supporting_tools', tool, 'main'],
+    ['supporting_tools', tool, 'others'],
+  ]),
+];
+
+// Project fields holding a single technology name
+const TECHNOLOGY_STRING_FIELDS = [
+  ['supporting_tools', 'project_tracking'],
+  ['supporting_tools', 'incident_management'],
+];
+
+/**
+ * Builds a lookup from technology name to its replacement.
+ * @param {Object<string, string>|Array<{from: string, to: string}>} mapping - Renames, as a `{from: to}` object or an array of pairs
+ * @param {Object} [options]
+ * @param {boolean} [options.caseInsensitive=false] - Match names regardless of case
+ * @returns {Map<string, {from: string, to: string}>} Lookup keyed by the (lowercased if case-insensitive) name to replace
+ * @throws {Error} If a rename is missing a value, or a name is mapped to two different replacements
+ */
+function buildRenameLookup(mapping, { caseInsensitive = false } = {}) {
+  const pairs = Array.isArray(mapping)
+    ? mapping.map(pair => [pair?.from, pair?.to])
+    : Object.entries(mapping || {});
+
+  if (pairs.length === 0) {
+    throw new Error('Invalid mapping: at least one rename is required');
+  }
+
+  const lookup = new Map();
+  pairs.forEach(([from, to]) => {
+    if (
+      typeof from !== 'string' ||
+      typeof to !== 'string' ||
+      !from.trim() ||
+      !to.trim()
+    ) {
+      throw new Error("Invalid mapping: 'from' and 'to' must be non-empty");
+    }
+
+    const key = caseInsensitive ? from.toLowerCase() : from;
+    const existing = lookup.get(key);
+    if (existing && existing.to !== to) {
+      throw new Error(
+        `Invalid mapping: '${from}' is mapped to both '${existing.to}' and '${to}'`
+      );
+    }
+    lookup.set(key, { from, to });
+  });
+
+  return lookup;
+}
+
+/**
+ * Applies technology renames to every technology field of every project, in a
+ * single pass. Each name is looked up once; a renamed name that duplicates one
+ * already in the same array is dropped.
+ * @param {Object[]} projects - Projects from new_project_data.json, updated in place unless `dryRun` is set
+ * @param {Map<string, {from: string, to: string}>} lookup - Lookup from buildRenameLookup
+ * @param {Object} [options]
+ * @param {boolean} [options.caseInsensitive=false] - Whether the lookup is keyed by lowercased names
+ * @param {boolean} [options.dryRun=false] - Count the renames without changing the projects
+ * @returns {{updatedProjects: number, replacements: number, hits: Object<string, number>}} Number of projects changed, number of names replaced, and the number of replacements for each name in the mapping
+ */
+function normaliseProjectTechnologies(
+  projects,
+  lookup,
+  { caseInsensitive = false, dryRun = false } = {}
+) {
+  const hits = {};
+  lookup.forEach(({ from }) => {
+    hits[from] = 0;
+  });
+
+  // Returns the replacement for a name, or undefined if it is unchanged
+  const rename = name => {
+    if (typeof name !== 'string') return undefined;
+    const match = lookup.get(caseInsensitive ? name.toLowerCase() : name);
+    if (!match || match.to === name) return undefined;
+    hits[match.from]++;
+    return match.to;
+  };
+
+  let updatedProjects = 0;
+  let replacements = 0;
+
+  (projects || []).forEach(project => {
+    let updated = false;
+
+    TECHNOLOGY_ARRAY_FIELDS.forEach(path => {
+      const parent = path
+        .slice(0, -1)
+        .reduce((value, field) => value?.[field], project);
+      const field = path[path.length - 1];
+      const array = parent?.[field];
+      if (!Array.isArray(array)) return;
+
+      let changed = false;
+      const names = array.map(name => {
+        const to = rename(name);
+        if (to === undefined) return name;
+        changed = true;
+        replacements++;
+        return to;
+      });
+      if (!changed) return;
+
+      updated = true;
+      if (!dryRun) parent[field] = [...new Set(names)];
+    });
+
+    TECHNOLOGY_STRING_FIELDS.forEach(([group, field]) => {
+      const parent = project?.[group];
+      const to = rename(parent?.[field]);
+      if (to === undefined) return;
+
+      updated = true;
+      replacements++;
+      if (!dryRun) parent[field] = to;
+    });
+
+    if (updated) updatedProjects++;
+  });
+
+  return { updatedProjects, replacements, hits };
+}
+
+module.exports = {
+  TECHNOLOGY_ARRAY_FIELDS,
+  TECHNOLOGY_STRING_FIELDS,
+  buildRenameLookup,
+  normaliseProjectTechnologies,
+};
@@ -0,0 +1,173 @@
+/**
+ * In-process LRU cache with TTL expiry and single-flight loading.
+ *
+ * Entries are stored in a Map so that insertion order doubles as recency
+ * order: reading an entry re-inserts it at the end, and the first key in the
+ * Map is always the least recently used one.
+ */
+class ObjectCache {
+  /**
+   * @param {Object} [options]
+   * @param {number} [options.maxEntries=20] - Maximum number of entries held before evicting
+   * @param {number} [options.ttlMs=300000] - Time an entry is considered fresh, in milliseconds
+   */
+  constructor({ maxEntries = 20, ttlMs = 5 * 60 * 1000 } = {}) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.entries = new Map();
+    this.inFlight = new Map();
+    this.stats = {
+      hits: 0,
+      misses: 0,
+      staleHits: 0,
+      revalidations: 0,
+      evictions: 0,
+    };
+  }
+
+  /**
+   * Get an entry and mark it as most recently used
+   * @param {string} key - Cache key
+   * @returns {Object|undefined} The cached entry, fresh or stale
+   */
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  /**
+   * Store an entry, evicting the least recently used entries past the size bound
+   * @param {string} key - Cache key
+   * @param {Object} entry - Entry to store
+   * @param {Object} [options]
+   * @param {number} [options.ttlMs] - TTL the entry was loaded with
+   * @param {number} [options.jitter=0] - Fraction of the TTL over which the refresh is spread
+   * @returns {Object} The stored entry with its fetch timestamp, and its refresh time if jittered
+   */
+  set(key, entry, { ttlMs = this.ttlMs, jitter = 0 } = {}) {
+    const stored = { ...entry, fetchedAt: Date.now() };
+    // Due at a random point in the last `jitter` of the TTL, so that
+    // instances that loaded the entry together do not all refresh it at once
+    if (jitter) {
+      stored.refreshAt =
+        stored.fetchedAt + ttlMs * (1 - jitter * Math.random());
+    }
+    this.entries.delete(key);
+    this.entries.set(key, stored);
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value;
+      this.entries.delete(oldestKey);
+      this.stats.evictions++;
+    }
+
+    return stored;
+  }
+
+  /**
+   * Remove an entry from the cache
+   * @param {string} key - Cache key
+   */
+  delete(key) {
+    this.entries.delete(key);
+  }
+
+  /**
+   * Check whether an entry is still within its TTL and not yet due for refresh
+   * @param {Object} entry - Cached entry
+   * @param {number} [ttlMs] - Optional TTL override for this lookup
+   * @returns {boolean} True if the entry is fresh
+   */
+  isFresh(entry, ttlMs = this.ttlMs) {
+    if (!entry) return false;
+    const now = Date.now();
+    return (
+      now - entry.fetchedAt < ttlMs &&
+      (entry.refreshAt === undefined || now < entry.refreshAt)
+    );
+  }
+
+  /**
+   * Return a fresh entry or load a new one. Concurrent misses for the same key
+   * share a single call to the loader.
+   *
+   * With `staleWhileRevalidate`, a stale entry is returned straight away and
+   * reloaded by one call in the background. If that reload fails, the stale
+   * entry is kept and the reload retried after `retryMs`.
+   * @param {string} key - Cache key
+   * @param {function(Object|undefined): Promise<Object>} loader - Called with the stale entry (if any) and resolving to the new entry
+   * @param {Object} [options]
+   * @param {number} [options.ttlMs] - Optional TTL override for this lookup
+   * @param {number} [options.jitter=0] - Fraction of the TTL over which refreshes of the loaded entry are spread
+   * @param {boolean} [options.staleWhileRevalidate=false] - Serve a stale entry while it is reloaded
+   * @param {number} [options.retryMs=60000] - Delay before a failed background reload is retried
+   * @returns {Promise<Object>} The cached or freshly loaded entry
+   */
+  async getOrLoad(
+    key,
+    loader,
+    {
+      ttlMs,
+      jitter = 0,
+      staleWhileRevalidate = false,
+      retryMs = 60 * 1000,
+    } = {}
+  ) {
+    const cached = this.get(key);
+    if (this.isFresh(cached, ttlMs)) {
+      this.stats.hits++;
+      return cached;
+    }
+
+    if (cached && staleWhileRevalidate) {
+      this.stats.staleHits++;
+      const retrying = Date.now() < (cached.retryAt ?? 0);
+      if (!this.inFlight.has(key) && !retrying) {
+        // The loader logs its own failures; keep serving the stale entry
+        this.load(key, loader, cached, { ttlMs, jitter }).catch(() => {
+          cached.retryAt = Date.now() + retryMs;
+        });
+      }
+      return cached;
+    }
+
+    if (this.inFlight.has(key)) {
+      return this.inFlight.get(key);
+    }
+
+    this.stats.misses++;
+    return this.load(key, loader, cached, { ttlMs, jitter });
+  }
+
+  /**
+   * Call the loader and store the entry it resolves to, sharing the call with
+   * concurrent lookups of the same key
+   * @param {string} key - Cache key
+   * @param {function(Object|undefined): Promise<Object>} loader - Called with the stale entry (if any) and resolving to the new entry
+   * @param {Object|undefined} stale - The stale entry, if any
+   * @param {Object} options - TTL and jitter to store the entry with
+   * @returns {Promise<Object>} The freshly loaded entry
+   */
+  load(key, loader, stale, options) {
+    if (stale) this.stats.revalidations++;
+
+    const pending = (async () => {
+      try {
+        const entry = await loader(stale);
+        return this.set(key, entry, options);
+      } finally {
+        this.inFlight.delete(key);
+      }
+    })();
+
+    this.inFlight.set(key, pending);
+    return pending;
+  }
+}
+
+module.exports = {
+  ObjectCache,
+};
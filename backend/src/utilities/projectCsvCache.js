@@ -0,0 +1,154 @@
+const crypto = require('crypto');
+const logger = require('../config/logger');
+const {
+  transformProjectToCSVFormat,
+  buildReverseDependencyMap,
+} = require('./projectDataTransformer');
+
+// The last built CSV data, and the build in progress (if any)
+let current = null;
+let pending = null;
+
+/**
+ * Hashes a value's JSON representation.
+ * @param {*} value - Value to hash
+ * @returns {string} Hex encoded SHA-1 digest
+ */
+function hashContent(value) {
+  return crypto.createHash('sha1').update(JSON.stringify(value)).digest('hex');
+}
+
+/**
+ * Gets the name a project is referenced by in other projects' dependencies.
+ * @param {Object} project - The raw project data object
+ * @returns {string} Project name
+ */
+function getProjectName(project) {
+  return project.details[0]?.name || project.details[0]?.short_name || '';
+}
+
+/**
+ * Builds the transformed rows for a version of the project data, reusing the
+ * rows of the previous version for projects whose content and reverse
+ * dependencies are unchanged.
+ * @param {Object[]} projects - Array of all project objects
+ * @param {Object|null} previous - Previously built CSV data
+ * @returns {Promise<Object>} Built CSV data
+ */
+async function buildProjectCsvData(projects, previous) {
+  const reverseDependencyMap = buildReverseDependencyMap(projects);
+
+  // Index the previous rows by project content hash
+  const previousRows = new Map();
+  (previous?.entries || []).forEach(entry => {
+    if (!previousRows.has(entry.hash)) previousRows.set(entry.hash, []);
+    previousRows.get(entry.hash).push(entry);
+  });
+
+  // Dependency names whose list of dependants changed need their rows rebuilt
+  const changedDependencies = new Set();
+  const previousMap = previous?.reverseDependencyMap || {};
+  new Set([
+    ...Object.keys(previousMap),
+    ...Object.keys(reverseDependencyMap),
+  ]).forEach(name => {
+    if (
+      JSON.stringify(previousMap[name]) !==
+      JSON.stringify(reverseDependencyMap[name])
+    ) {
+      changedDependencies.add(name);
+    }
+  });
+
+  let transformed = 0;
+  let columns = previous?.columns;
+  const entries = projects.map(project => {
+    const hash = hashContent(project);
+    const reusable = previousRows.get(hash)?.pop();
+
+    if (reusable && !changedDependencies.has(getProjectName(project))) {
+      return reusable;
+    }
+
+    transformed++;
+    const row = transformProjectToCSVFormat(project, reverseDependencyMap);
+    columns = columns || Object.keys(row);
+    // Keep only the serialised row; streamed exports parse it back row by row
+    return { hash, json: JSON.stringify(row) };
+  });
+
+  // Hash the JSON body without building it (it is built on a cache miss)
+  const digest = crypto.createHash('sha1').update('[');
+  entries.forEach((entry, i) => {
+    if (i > 0) digest.update(',');
+    digest.update(entry.json);
+  });
+  digest.update(']');
+
+  logger.info('Built project CSV data', {
+    projects: projects.length,
+    transformed,
+    reused: projects.length - transformed,
+  });
+
+  return {
+    entries,
+    columns: columns || [],
+    reverseDependencyMap,
+    etag: `W/"${digest.digest('hex')}"`,
+  };
+}
+
+/**
+ * Serialises built CSV data as the /api/csv JSON body.
+ * @param {Object} csvData - CSV data from getProjectCsvData
+ * @returns {string} JSON array of the transformed rows
+ */
+function serialiseProjectCsvData({ entries }) {
+  return `[${entries.map(entry => entry.json).join(',')}]`;
+}
+
+/**
+ * Yields the transformed rows of built CSV data one at a time, parsing each
+ * only when it is reached.
+ * @param {Object} csvData - CSV data from getProjectCsvData
+ * @yields {Object} Transformed row
+ */
+function* iterateProjectCsvRows({ entries }) {
+  for (const { json } of entries) yield JSON.parse(json);
+}
+
+/**
+ * Returns the transformed /api/csv rows for a cached version of
+ * new_project_data.json, building them only when the source has changed.
+ * @param {Object} entry - Cache entry from s3Service.getCachedObject
+ * @param {Object} entry.data - Parsed new_project_data.json object
+ * @returns {Promise<{entries: Object[], columns: string[], etag: string}>} Serialised rows (`entries[].json`), the row columns and the ETag of the JSON body
+ */
+async function getProjectCsvData({ data }) {
+  if (current && current.source === data) {
+    return current;
+  }
+
+  if (pending && pending.source === data) {
+    return pending.promise;
+  }
+
+  const promise = buildProjectCsvData(data.projects, current)
+    .then(built => {
+      current = { ...built, source: data };
+      return current;
+    })
+    .finally(() => {
+      if (pending?.promise === promise) pending = null;
+    });
+
+  pending = { source: data, promise };
+  return promise;
+}
+
+module.exports = {
+  getProjectCsvData,
+  serialiseProjectCsvData,
+  iterateProjectCsvRows,
+};
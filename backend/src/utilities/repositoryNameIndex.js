@@ -0,0 +1,71 @@
+// Name indexes built per repositories.json version, keyed by the parsed object
+const indexCache = new WeakMap();
+
+/**
+ * Builds a map from lowercase repository name to the positions of the
+ * repositories with that name.
+ * @param {Object[]} repositories - Array of all repository objects
+ * @returns {Map<string, number[]>} Lowercase name to array positions
+ */
+function buildRepositoryNameIndex(repositories) {
+  const index = new Map();
+  repositories.forEach((repo, position) => {
+    const name = String(repo.name).toLowerCase();
+    if (!index.has(name)) index.set(name, []);
+    index.get(name).push(position);
+  });
+  return index;
+}
+
+/**
+ * Returns the name index for a parsed repositories.json, building it on first
+ * use for each version of the data.
+ * @param {Object} jsonData - Parsed repositories.json object
+ * @returns {Map<string, number[]>} Lowercase name to array positions
+ */
+function getRepositoryNameIndex(jsonData) {
+  let index = indexCache.get(jsonData);
+  if (!index) {
+    index = buildRepositoryNameIndex(jsonData.repositories);
+    indexCache.set(jsonData, index);
+  }
+  return index;
+}
+
+/**
+ * Finds repositories by name with one hash lookup per requested name.
+ * @param {Object} jsonData - Parsed repositories.json object
+ * @param {string[]} names - Lowercase repository names
+ * @returns {Object[]} Matching repositories, in the order they appear in the data
+ */
+function findRepositoriesByName(jsonData, names) {
+  const index = getRepositoryNameIndex(jsonData);
+  const positions = [];
+  new Set(names).forEach(name => {
+    const matches = index.get(name);
+    if (matches) positions.push(...matches);
+  });
+  positions.sort((a, b) => a - b);
+  return positions.map(position => jsonData.repositories[position]);
+}
+
+/**
+ * Normalises repository names given as a comma-separated string, an array of
+ * strings (repeated query parameters or a JSON body), or a mix of both.
+ * @param {string|string[]} repositories - Requested repository names
+ * @returns {string[]} Lowercase, trimmed repository names
+ */
+function parseRepositoryNames(repositories) {
+  const values = Array.isArray(repositories) ? repositories : [repositories];
+  return values.flatMap(value =>
+    String(value)
+      .split(',')
+      .map(repo => repo.toLowerCase().trim())
+  );
+}
+
+module.exports = {
+  getRepositoryNameIndex,
+  findRepositoriesByName,
+  parseRepositoryNames,
+};
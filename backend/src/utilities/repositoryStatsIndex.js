@@ -0,0 +1,282 @@
+const { searchSorted } = require('./searchSorted');
+
+// Indexes built per repositories.json version. The S3 object cache keeps the
+// same parsed object while the ETag is unchanged, so keying on it is enough.
+const indexCache = new WeakMap();
+
+/**
+ * Calculates repository and language statistics for a list of repositories.
+ * @param {Object[]} repos - Array of repository objects
+ * @returns {{stats: Object, language_statistics: Object}} Repository counts by visibility and per-language statistics
+ */
+function calculateRepositoryStatistics(repos) {
+  const stats = {
+    total_repos: repos.length,
+    total_private_repos: 0,
+    total_public_repos: 0,
+    total_internal_repos: 0,
+  };
+
+  const languageTotals = {};
+  repos.forEach(repo => {
+    if (repo.visibility === 'PRIVATE') stats.total_private_repos++;
+    else if (repo.visibility === 'PUBLIC') stats.total_public_repos++;
+    else if (repo.visibility === 'INTERNAL') stats.total_internal_repos++;
+
+    if (!repo.technologies?.languages) return;
+
+    repo.technologies.languages.forEach(lang => {
+      if (!languageTotals[lang.name]) {
+        languageTotals[lang.name] = {
+          repo_count: 0,
+          total_percentage: 0,
+          total_size: 0,
+        };
+      }
+      languageTotals[lang.name].repo_count++;
+      languageTotals[lang.name].total_percentage += lang.percentage;
+      languageTotals[lang.name].total_size += lang.size;
+    });
+  });
+
+  const languageStats = {};
+  Object.keys(languageTotals).forEach(lang => {
+    languageStats[lang] = formatLanguageStatistic(
+      languageTotals[lang].repo_count,
+      languageTotals[lang].total_percentage,
+      languageTotals[lang].total_size
+    );
+  });
+
+  return { stats, language_statistics: languageStats };
+}
+
+/**
+ * Formats the statistics for a single language, averaging the percentage.
+ * @param {number} repoCount - Number of repositories using the language
+ * @param {number} totalPercentage - Sum of the language percentage across repositories
+ * @param {number} totalSize - Sum of the language size across repositories
+ * @returns {Object} Language statistic object
+ */
+function formatLanguageStatistic(repoCount, totalPercentage, totalSize) {
+  return {
+    repo_count: repoCount,
+    average_percentage: +(totalPercentage / repoCount).toFixed(3),
+    total_size: totalSize,
+  };
+}
+
+/**
+ * Builds a sparse table answering range-minimum queries in O(1).
+ * @param {Float64Array} values - Values to index
+ * @returns {Float64Array[]} Table levels, where level k holds minimums of 2^k values
+ */
+function buildSparseTable(values) {
+  const levels = [values];
+  for (let width = 1; width * 2 <= values.length; width *= 2) {
+    const previous = levels[levels.length - 1];
+    const level = new Float64Array(values.length - width * 2 + 1);
+    for (let i = 0; i < level.length; i++) {
+      level[i] = Math.min(previous[i], previous[i + width]);
+    }
+    levels.push(level);
+  }
+  return levels;
+}
+
+/**
+ * Returns the minimum value in [start, end) of a sparse table.
+ * @param {Float64Array[]} levels - Sparse table levels
+ * @param {number} start - Inclusive start index
+ * @param {number} end - Exclusive end index
+ * @returns {number} Minimum value
+ */
+function rangeMinimum(levels, start, end) {
+  const level = 31 - Math.clz32(end - start);
+  return Math.min(levels[level][start], levels[level][end - (1 << level)]);
+}
+
+/**
+ * Builds the index for one archived partition of the repositories.
+ *
+ * Repositories with a valid last commit date are sorted by that date, with
+ * prefix sums of visibility counts and, per language, the language
+ * occurrences in the same order. The first-seen order of each language in the
+ * original array is kept in a sparse table so that filtered responses list
+ * languages in the same order as a linear scan would.
+ * @param {Object[]} repos - Repositories in the partition, in original order
+ * @returns {Object} Partition index
+ */
+function buildPartition(repos) {
+  const dated = [];
+  let maxLanguages = 0;
+  repos.forEach((repo, position) => {
+    maxLanguages = Math.max(
+      maxLanguages,
+      repo.technologies?.languages?.length || 0
+    );
+    const time = new Date(repo.last_commit).getTime();
+    if (!isNaN(time)) dated.push({ repo, position, time });
+  });
+  dated.sort((a, b) => a.time - b.time || a.position - b.position);
+
+  const count = dated.length;
+  const times = new Float64Array(count);
+  const privatePrefix = new Int32Array(count + 1);
+  const publicPrefix = new Int32Array(count + 1);
+  const internalPrefix = new Int32Array(count + 1);
+  const occurrences = new Map();
+
+  dated.forEach(({ repo, position, time }, i) => {
+    times[i] = time;
+    privatePrefix[i + 1] = privatePrefix[i] + (repo.visibility === 'PRIVATE');
+    publicPrefix[i + 1] = publicPrefix[i] + (repo.visibility === 'PUBLIC');
+    internalPrefix[i + 1] =
+      internalPrefix[i] + (repo.visibility === 'INTERNAL');
+
+    if (!repo.technologies?.languages) return;
+
+    repo.technologies.languages.forEach((lang, langIndex) => {
+      if (!occurrences.has(lang.name)) occurrences.set(lang.name, []);
+      occurrences.get(lang.name).push({
+        index: i,
+        percentage: lang.percentage,
+        size: lang.size,
+        order: position * (maxLanguages + 1) + langIndex,
+      });
+    });
+  });
+
+  const languages = [];
+  occurrences.forEach((list, name) => {
+    const indexes = new Int32Array(list.length);
+    const order = new Float64Array(list.length);
+    list.forEach((occurrence, i) => {
+      indexes[i] = occurrence.index;
+      order[i] = occurrence.order;
+    });
+    languages.push({
+      name,
+      indexes,
+      occurrences: list,
+      order: buildSparseTable(order),
+    });
+  });
+
+  return {
+    unfiltered: calculateRepositoryStatistics(repos),
+    times,
+    privatePrefix,
+    publicPrefix,
+    internalPrefix,
+    languages,
+  };
+}
+
+/**
+ * Builds the statistics index for all archived filter combinations.
+ * @param {Object[]} repositories - Array of all repository objects
+ * @returns {Object} Index with `all`, `archived` and `active` partitions
+ */
+function buildRepositoryStatsIndex(repositories) {
+  return {
+    all: buildPartition(repositories),
+    archived: buildPartition(repositories.filter(repo => repo.is_archived)),
+    active: buildPartition(repositories.filter(repo => !repo.is_archived)),
+  };
+}
+
+/**
+ * Returns the statistics index for a parsed repositories.json, building it on
+ * first use for each version of the data.
+ * @param {Object} jsonData - Parsed repositories.json object
+ * @returns {Object} Repository statistics index
+ */
+function getRepositoryStatsIndex(jsonData) {
+  let index = indexCache.get(jsonData);
+  if (!index) {
+    index = buildRepositoryStatsIndex(jsonData.repositories);
+    indexCache.set(jsonData, index);
+  }
+  return index;
+}
+
+/**
+ * Answers a statistics query from the index. Equivalent to filtering the
+ * repositories by last commit date (between `datetime` and now) and archived
+ * status, then calling calculateRepositoryStatistics on the result.
+ * @param {Object} index - Index from getRepositoryStatsIndex
+ * @param {Object} [filters]
+ * @param {string} [filters.datetime] - ISO date string; ignored if invalid
+ * @param {string} [filters.archived] - 'true'/'false' to filter archived repositories
+ * @returns {{stats: Object, language_statistics: Object}} Repository and language statistics
+ */
+function queryRepositoryStats(index, { datetime, archived } = {}) {
+  let partition = index.all;
+  if (archived === 'true') partition = index.archived;
+  else if (archived === 'false') partition = index.active;
+
+  if (!datetime || isNaN(Date.parse(datetime))) {
+    return partition.unfiltered;
+  }
+
+  const start = searchSorted(partition.times, new Date(datetime).getTime());
+  const end = Math.max(
+    start,
+    searchSorted(partition.times, Date.now(), true)
+  );
+
+  const stats = {
+    total_repos: end - start,
+    total_private_repos:
+      partition.privatePrefix[end] - partition.privatePrefix[start],
+    total_public_repos:
+      partition.publicPrefix[end] - partition.publicPrefix[start],
+    total_internal_repos:
+      partition.internalPrefix[end] - partition.internalPrefix[start],
+  };
+
+  const matches = [];
+  partition.languages.forEach(language => {
+    const first = searchSorted(language.indexes, start);
+    const last = searchSorted(language.indexes, end);
+    if (last <= first) return;
+    matches.push({
+      language,
+      first,
+      last,
+      order: rangeMinimum(language.order, first, last),
+    });
+  });
+  matches.sort((a, b) => a.order - b.order);
+
+  const languageStats = {};
+  matches.forEach(({ language, first, last }) => {
+    // Sum in the original repository order, as a linear scan would, so that
+    // the float totals (and so the rounded averages) match it exactly
+    const matched = language.occurrences
+      .slice(first, last)
+      .sort((a, b) => a.order - b.order);
+    let totalPercentage = 0;
+    let totalSize = 0;
+    matched.forEach(occurrence => {
+      totalPercentage += occurrence.percentage;
+      totalSize += occurrence.size;
+    });
+
+    languageStats[language.name] = formatLanguageStatistic(
+      last - first,
+      totalPercentage,
+      totalSize
+    );
+  });
+
+  return { stats, language_statistics: languageStats };
+}
+
+module.exports = {
+  calculateRepositoryStatistics,
+  buildRepositoryStatsIndex,
+  getRepositoryStatsIndex,
+  queryRepositoryStats,
+};
@@ -0,0 +1,40 @@
+/**
+ * Finds the first position in a sorted array whose value is greater than
+ * (or, unless `after` is set, equal to) the given value.
+ * @param {string[]|number[]} values - Values in ascending order
+ * @param {string|number} value - Value to search for
+ * @param {boolean} [after=false] - Skip values equal to `value`
+ * @returns {number} Position, or values.length if there is none
+ */
+function searchSorted(values, value, after = false) {
+  let low = 0;
+  let high = values.length;
+  while (low < high) {
+    const middle = (low + high) >>> 1;
+    if (values[middle] < value || (after && values[middle] === value)) {
+      low = middle + 1;
+    } else {
+      high = middle;
+    }
+  }
+  return low;
+}
+
+/**
+ * Gets the positions of the values within an inclusive range.
+ * @param {string[]|number[]} values - Values in ascending order
+ * @param {string|number} [from] - Lowest value to include (no lower bound if omitted)
+ * @param {string|number} [to] - Highest value to include (no upper bound if omitted)
+ * @returns {{start: number, end: number}} Start (inclusive) and end (exclusive) positions
+ */
+function searchRange(values, from, to) {
+  return {
+    start: from === undefined ? 0 : searchSorted(values, from),
+    end: to === undefined ? values.length : searchSorted(values, to, true),
+  };
+}
+
+module.exports = {
+  searchSorted,
+  searchRange,
+};
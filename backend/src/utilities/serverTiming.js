@@ -0,0 +1,154 @@
+const { AsyncLocalStorage } = require('async_hooks');
+const logger = require('../config/logger');
+
+// Timings of the request being handled, carried across awaits
+const storage = new AsyncLocalStorage();
+
+// Requests slower than this are logged at info level rather than debug
+const SLOW_REQUEST_MS = parseInt(process.env.SLOW_REQUEST_MS, 10) || 1000;
+
+/**
+ * Milliseconds since an earlier process.hrtime.bigint() reading.
+ * @param {bigint} start - Earlier reading
+ * @returns {number} Elapsed milliseconds
+ */
+function elapsedMs(start) {
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+/**
+ * Adds a duration to a stage of the current request. Repeated stages (for
+ * example two S3 reads) are summed and counted. Does nothing outside a request.
+ * @param {string} name - Stage name, e.g. 's3_get'
+ * @param {number} durationMs - Duration in milliseconds
+ */
+function recordStage(name, durationMs) {
+  const timings = storage.getStore();
+  if (!timings) return;
+
+  const stage = timings.stages.get(name);
+  if (stage) {
+    stage.durationMs += durationMs;
+    stage.count += 1;
+  } else {
+    timings.stages.set(name, { durationMs, count: 1 });
+  }
+}
+
+/**
+ * Runs a function and records how long it took as a stage of the current
+ * request. Works for both sync functions and functions returning a promise;
+ * the stage ends when the promise settles.
+ * @param {string} name - Stage name
+ * @param {function(): *} fn - Function to time
+ * @returns {*} Whatever fn returns
+ */
+function timeStage(name, fn) {
+  if (!storage.getStore()) return fn();
+
+  const start = process.hrtime.bigint();
+  let result;
+  try {
+    result = fn();
+  } catch (error) {
+    recordStage(name, elapsedMs(start));
+    throw error;
+  }
+  if (typeof result?.then !== 'function') {
+    recordStage(name, elapsedMs(start));
+    return result;
+  }
+  return Promise.resolve(result).finally(() =>
+    recordStage(name, elapsedMs(start))
+  );
+}
+
+/**
+ * Formats stage timings as a Server-Timing header value.
+ * @param {Map<string, {durationMs: number, count: number}>} stages - Stage timings
+ * @param {number} totalMs - Time since timing started for the request
+ * @returns {string} Header value, e.g. 's3_get;dur=12.3, total;dur=15.1'
+ */
+function formatServerTiming(stages, totalMs) {
+  const metrics = [...stages].map(([name, { durationMs, count }]) => {
+    const description = count > 1 ? `;desc="${count} calls"` : '';
+    return `${name}${description};dur=${durationMs.toFixed(1)}`;
+  });
+  metrics.push(`total;dur=${totalMs.toFixed(1)}`);
+  return metrics.join(', ');
+}
+
+/**
+ * Converts stage timings to a plain object for structured logs.
+ * @param {Map<string, {durationMs: number, count: number}>} stages - Stage timings
+ * @returns {Object<string, {durationMs: number, count: number}>} Stage timings by name
+ */
+function stagesToObject(stages) {
+  return Object.fromEntries(
+    [...stages].map(([name, { durationMs, count }]) => [
+      name,
+      { durationMs: Math.round(durationMs * 10) / 10, count },
+    ])
+  );
+}
+
+/**
+ * Express middleware that collects stage timings for each request. The
+ * stages recorded while handling the request (S3 and GitHub calls, index
+ * lookups, serialisation) are sent in a Server-Timing header, with `total`
+ * as the time to the first byte, and logged with the full duration when the
+ * response finishes. Set SERVER_TIMING=false to leave out the header.
+ * @param {Object} req - Express request object
+ * @param {Object} res - Express response object
+ * @param {function} next - Next middleware
+ */
+function serverTiming(req, res, next) {
+  const timings = { start: process.hrtime.bigint(), stages: new Map() };
+
+  if (process.env.SERVER_TIMING !== 'false') {
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+      if (!res.headersSent) {
+        res.setHeader(
+          'Server-Timing',
+          formatServerTiming(timings.stages, elapsedMs(timings.start))
+        );
+      }
+      return writeHead.apply(this, args);
+    };
+  }
+
+  // Serialisation is the time between res.json() and the send it makes
+  const json = res.json;
+  res.json = function (body) {
+    const start = process.hrtime.bigint();
+    const send = res.send;
+    res.send = function (...args) {
+      res.send = send;
+      recordStage('serialise', elapsedMs(start));
+      return send.apply(this, args);
+    };
+    return json.call(this, body);
+  };
+
+  res.on('finish', () => {
+    const durationMs = elapsedMs(timings.start);
+    const log = durationMs >= SLOW_REQUEST_MS ? logger.info : logger.debug;
+    log('Request timings', {
+      method: req.method,
+      path: req.originalUrl.split('?')[0],
+      status: res.statusCode,
+      durationMs: Math.round(durationMs * 10) / 10,
+      stages: stagesToObject(timings.stages),
+    });
+  });
+
+  storage.run(timings, next);
+}
+
+module.exports = {
+  serverTiming,
+  timeStage,
+  recordStage,
+  formatServerTiming,
+};
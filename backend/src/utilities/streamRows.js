@@ -0,0 +1,138 @@
+// Flush buffered output once it reaches this many characters
+const CHUNK_SIZE = 64 * 1024;
+
+const formats = {
+  csv: {
+    contentType: 'text/csv; charset=utf-8',
+    header: fields => `${fields.map(toCSVValue).join(',')}\r\n`,
+    row: (row, fields) =>
+      `${fields.map(field => toCSVValue(row[field])).join(',')}\r\n`,
+    footer: () => '',
+  },
+  ndjson: {
+    contentType: 'application/x-ndjson; charset=utf-8',
+    header: () => '',
+    row: (row, fields) => `${JSON.stringify(projectRow(row, fields))}\n`,
+    footer: () => '',
+  },
+  json: {
+    contentType: 'application/json; charset=utf-8',
+    header: () => '[',
+    row: (row, fields, index) =>
+      `${index > 0 ? ',' : ''}${JSON.stringify(projectRow(row, fields))}`,
+    footer: () => ']',
+  },
+};
+
+/**
+ * Converts a value to a CSV cell, quoting it when needed. Arrays and objects
+ * are written as JSON.
+ * @param {*} value - Cell value
+ * @returns {string} Escaped CSV cell
+ */
+function toCSVValue(value) {
+  if (value === undefined || value === null) return '';
+  const text =
+    typeof value === 'object' ? JSON.stringify(value) : String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+/**
+ * Picks the given fields from a row, in the order given.
+ * @param {Object} row - Row object
+ * @param {string[]} fields - Field names to keep
+ * @returns {Object} Projected row
+ */
+function projectRow(row, fields) {
+  const projected = {};
+  fields.forEach(field => {
+    projected[field] = row[field];
+  });
+  return projected;
+}
+
+/**
+ * Waits until the response can accept more data or the client disconnects.
+ * @param {Object} res - Express response object
+ * @returns {Promise<void>} Resolves on 'drain' or 'close'
+ */
+function waitForDrain(res) {
+  return new Promise(resolve => {
+    const done = () => {
+      res.off('drain', done);
+      res.off('close', done);
+      resolve();
+    };
+    res.on('drain', done);
+    res.on('close', done);
+  });
+}
+
+/**
+ * Parses a comma-separated `fields` parameter and validates it against the
+ * available columns.
+ * @param {string|string[]} [fields] - Requested fields
+ * @param {string[]} columns - Available columns, in their default order
+ * @returns {string[]} Selected fields (all columns if none were requested)
+ * @throws {Error} If an unknown field is requested
+ */
+function parseFields(fields, columns) {
+  if (!fields) return columns;
+
+  const requested = (Array.isArray(fields) ? fields : [fields])
+    .flatMap(value => String(value).split(','))
+    .map(field => field.trim())
+    .filter(Boolean);
+
+  const unknown = requested.filter(field => !columns.includes(field));
+  if (unknown.length > 0) {
+    throw new Error(`Invalid fields: ${unknown.join(', ')}`);
+  }
+
+  return requested.length > 0 ? requested : columns;
+}
+
+/**
+ * Streams rows to a response one at a time, pausing whenever the response
+ * buffer is full so memory use does not grow with the number of rows.
+ * @param {Object} res - Express response object
+ * @param {Iterable<Object>} rows - Rows to write
+ * @param {Object} options
+ * @param {string} options.format - One of 'csv', 'ndjson' or 'json'
+ * @param {string[]} options.fields - Fields to write for each row
+ * @returns {Promise<void>} Resolves when the response has ended or the client disconnected
+ */
+async function streamRows(res, rows, { format, fields }) {
+  const writer = formats[format];
+  let closed = false;
+  res.on('close', () => {
+    closed = true;
+  });
+
+  res.status(200);
+  res.set('Content-Type', writer.contentType);
+
+  let buffer = writer.header(fields);
+  let index = 0;
+  for (const row of rows) {
+    if (closed) return;
+
+    buffer += writer.row(row, fields, index++);
+    if (buffer.length >= CHUNK_SIZE) {
+      const flushed = res.write(buffer);
+      buffer = '';
+      if (!flushed) {
+        await waitForDrain(res);
+      }
+    }
+  }
+
+  if (!closed) res.end(buffer + writer.footer(fields));
+}
+
+module.exports = {
+  STREAM_FORMATS: Object.keys(formats),
+  parseFields,
+  streamRows,
+  toCSVValue,
+};
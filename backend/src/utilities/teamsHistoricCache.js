@@ -1,41 +1,126 @@
 const s3Service = require('../services/s3Service');
-const logger = require('../config/logger');
+const { searchRange } = require('./searchSorted');
 
-// Cache the FULL teams_history.json data
-let teamsHistoricDataCache = null;
-let teamsHistoricDataCacheTimestamp = null;
-const TEAMS_CACHE_TTL = 60 * 60 * 1000; // 1 hour
+const TEAMS_HISTORY_KEY = 'teams_history.json';
+
+// How long teams_history.json is served before it is revalidated. Refreshes
+// are spread over the last TEAMS_CACHE_JITTER of the TTL so that instances
+// started together do not all revalidate at once.
+const TEAMS_CACHE_TTL =
+  parseInt(process.env.TEAMS_CACHE_TTL_MS, 10) || 60 * 60 * 1000; // 1 hour
+const TEAMS_CACHE_JITTER = 0.1;
+// How long to keep serving the cached data after a failed refresh before trying again
+const TEAMS_CACHE_RETRY_MS = Math.min(TEAMS_CACHE_TTL, 60 * 1000);
+
+// Team indexes built per teams_history.json version, keyed by the parsed array
+const indexCache = new WeakMap();
 
 /**
- * Get the full teams_history.json data from S3 with caching
+ * Get the full teams_history.json data from S3 with caching. The object is
+ * held in the shared S3 object cache: the first call waits for S3; after that
+ * the cached data is returned straight away and, once it is due for a
+ * refresh, revalidated by ETag in the background.
  * @param {string} bucketName - The S3 bucket name
  * @returns {Promise<Array>} Full teams historic data array
  */
 async function getTeamsHistoricDataWithCache(bucketName) {
-  const now = Date.now();
-
-  if (teamsHistoricDataCache && teamsHistoricDataCacheTimestamp) {
-    if (now - teamsHistoricDataCacheTimestamp < TEAMS_CACHE_TTL) {
-      logger.info('Returning teams historic data from cache');
-      return teamsHistoricDataCache;
-    } else {
-      logger.info('Cache expired, fetching teams historic data from S3');
+  const { data } = await s3Service.getCachedObject(
+    bucketName,
+    TEAMS_HISTORY_KEY,
+    {
+      ttlMs: TEAMS_CACHE_TTL,
+      jitter: TEAMS_CACHE_JITTER,
+      staleWhileRevalidate: true,
+      retryMs: TEAMS_CACHE_RETRY_MS,
     }
-  } else {
-    logger.info('No cache found, fetching teams historic data from S3');
+  );
+  return data;
+}
+
+/**
+ * Gets the day (YYYY-MM-DD) of a daily usage entry's date.
+ * @param {Object} day - Daily usage entry
+ * @returns {string} Day the entry is for
+ */
+function getDay(day) {
+  return String(day?.date ?? '').slice(0, 10);
+}
+
+/**
+ * Builds a map from team slug to the team's entry, with its daily usage
+ * sorted by date.
+ * @param {Object[]} teamsData - Full teams historic data array
+ * @returns {Map<string, {position: number, team: Object, data: Object[], days: string[]}>} Team entries keyed by slug
+ */
+function buildTeamsHistoricIndex(teamsData) {
+  const index = new Map();
+  teamsData.forEach((teamEntry, position) => {
+    const slug = teamEntry?.team?.slug;
+    if (!slug || index.has(slug)) return;
+
+    const data = Array.isArray(teamEntry.data) ? [...teamEntry.data] : [];
+    const days = data.map(getDay);
+    const order = data.map((_, i) => i).sort((a, b) => {
+      if (days[a] === days[b]) return a - b;
+      return days[a] < days[b] ? -1 : 1;
+    });
+
+    index.set(slug, {
+      position,
+      team: teamEntry.team,
+      data: order.map(i => data[i]),
+      days: order.map(i => days[i]),
+    });
+  });
+  return index;
+}
+
+/**
+ * Returns the team index for a parsed teams_history.json, building it on first
+ * use for each version of the data.
+ * @param {Object[]} teamsData - Full teams historic data array
+ * @returns {Map<string, Object>} Team entries keyed by slug
+ */
+function getTeamsHistoricIndex(teamsData) {
+  let index = indexCache.get(teamsData);
+  if (!index) {
+    index = buildTeamsHistoricIndex(teamsData);
+    indexCache.set(teamsData, index);
   }
+  return index;
+}
 
-  // Fetch and cache the full data
-  teamsHistoricDataCache = await s3Service.getObject(
-    bucketName,
-    'teams_history.json'
-  );
-  teamsHistoricDataCacheTimestamp = now;
-  logger.info('Cached ${teamsHistoricDataCache.length} teams');
+/**
+ * Selects teams from the teams historic data and slices each team's daily
+ * usage to a date range. Teams are looked up by slug and the range is found
+ * by binary search, so the cost depends on the size of the result. Without a
+ * date range the source entries are returned as they are, and without teams
+ * the source data itself.
+ * @param {Object[]} teamsData - Full teams historic data array
+ * @param {Object} [options]
+ * @param {string[]} [options.teams] - Slugs of the teams to return (all teams if omitted)
+ * @param {string} [options.since] - First day to include, as YYYY-MM-DD
+ * @param {string} [options.until] - Last day to include, as YYYY-MM-DD
+ * @returns {Object[]} Team entries `{team, data}`, in the order of the source data
+ */
+function queryTeamsHistoric(teamsData, { teams, since, until } = {}) {
+  if (!teams && !since && !until) return teamsData;
+  const index = getTeamsHistoricIndex(teamsData);
+
+  const entries = teams
+    ? Array.from(new Set(teams), slug => index.get(slug)).filter(Boolean)
+    : Array.from(index.values());
+  if (teams) entries.sort((a, b) => a.position - b.position);
 
-  return teamsHistoricDataCache;
+  return entries.map(({ position, team, data, days }) => {
+    if (!since && !until) return teamsData[position];
+    const { start, end } = searchRange(days, since, until);
+    return { team, data: data.slice(start, end) };
+  });
 }
 
 module.exports = {
   getTeamsHistoricDataWithCache,
+  getTeamsHistoricIndex,
+  queryTeamsHistoric,
 };
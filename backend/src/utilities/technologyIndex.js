@@ -0,0 +1,175 @@
+const {
+  TECHNOLOGY_ARRAY_FIELDS,
+  TECHNOLOGY_STRING_FIELDS,
+} = require('./normaliseTechnologies');
+
+// Technology indexes built per new_project_data.json version, keyed by the parsed object
+const indexCache = new WeakMap();
+
+const TECHNOLOGY_FIELDS = [
+  ...TECHNOLOGY_ARRAY_FIELDS,
+  ...TECHNOLOGY_STRING_FIELDS,
+].map(path => ({ path, name: path.join('.') }));
+
+/**
+ * Gets the display name of a project.
+ * @param {Object} project - The raw project data object
+ * @returns {string} Project name
+ */
+function getProjectName(project) {
+  return project.details?.[0]?.name || project.details?.[0]?.short_name || '';
+}
+
+/**
+ * Builds an inverted index from each technology to the projects and fields
+ * that use it. Technologies are grouped case-insensitively; every spelling
+ * seen is kept.
+ * @param {Object[]} projects - Array of all project objects
+ * @returns {{technologies: Map<string, Object>, summary: Object[]}} Technologies keyed by lowercase name, and usage counts sorted by most used
+ */
+function buildTechnologyIndex(projects) {
+  const technologies = new Map();
+
+  (projects || []).forEach((project, position) => {
+    TECHNOLOGY_FIELDS.forEach(({ path, name: field }) => {
+      const value = path.reduce((parent, key) => parent?.[key], project);
+      const names = Array.isArray(value) ? value : [value];
+
+      names.forEach(name => {
+        if (typeof name !== 'string' || !name.trim()) return;
+
+        const key = name.toLowerCase();
+        let technology = technologies.get(key);
+        if (!technology) {
+          technology = {
+            technology: name,
+            variants: new Set(),
+            fields: {},
+            usages: new Map(),
+          };
+          technologies.set(key, technology);
+        }
+        technology.variants.add(name);
+
+        let usage = technology.usages.get(position);
+        if (!usage) {
+          usage = { project: getProjectName(project), fields: [] };
+          technology.usages.set(position, usage);
+        }
+        if (!usage.fields.includes(field)) {
+          usage.fields.push(field);
+          technology.fields[field] = (technology.fields[field] || 0) + 1;
+        }
+      });
+    });
+  });
+
+  // Replace the build state with the final entries; positions are the
+  // projects' places in the projects array
+  technologies.forEach((technology, key) => {
+    technologies.set(key, {
+      technology: technology.technology,
+      variants: Array.from(technology.variants),
+      count: technology.usages.size,
+      fields: technology.fields,
+      projects: Array.from(technology.usages.values()),
+      positions: Array.from(technology.usages.keys()),
+    });
+  });
+
+  const summary = Array.from(technologies.values())
+    .map(({ technology, variants, count, fields }) => ({
+      technology,
+      variants,
+      count,
+      fields,
+    }))
+    .sort(
+      (a, b) => b.count - a.count || a.technology.localeCompare(b.technology)
+    );
+
+  return { technologies, summary };
+}
+
+/**
+ * Returns the technology index for a parsed new_project_data.json, building it
+ * on first use for each version of the data.
+ * @param {Object} projectData - Parsed new_project_data.json object
+ * @returns {{technologies: Map<string, Object>, summary: Object[]}} Technology index
+ */
+function getTechnologyIndex(projectData) {
+  let index = indexCache.get(projectData);
+  if (!index) {
+    index = buildTechnologyIndex(projectData.projects);
+    indexCache.set(projectData, index);
+  }
+  return index;
+}
+
+/**
+ * Looks up technologies in the index with one hash lookup per name, matching
+ * regardless of case.
+ * @param {Object} projectData - Parsed new_project_data.json object
+ * @param {string[]} names - Technology names
+ * @returns {{found: Object[], notFound: string[]}} Index entries for the technologies in use, and the names that are not used by any project
+ */
+function findProjectsByTechnology(projectData, names) {
+  const { technologies } = getTechnologyIndex(projectData);
+  const found = [];
+  const notFound = [];
+  const seen = new Set();
+
+  names.forEach(name => {
+    const key = name.toLowerCase();
+    if (seen.has(key)) return;
+    seen.add(key);
+
+    const technology = technologies.get(key);
+    if (technology) {
+      found.push(technology);
+    } else {
+      notFound.push(name);
+    }
+  });
+
+  return { found, notFound };
+}
+
+/**
+ * Gets the projects that use any of the given technologies, without scanning
+ * the projects that do not.
+ * @param {Object} projectData - Parsed new_project_data.json object
+ * @param {string[]} names - Technology names, matched regardless of case
+ * @returns {Object[]} Matching projects, in the order they appear in the data
+ */
+function getProjectsUsingTechnologies(projectData, names) {
+  const positions = new Set();
+  findProjectsByTechnology(projectData, names).found.forEach(technology => {
+    technology.positions.forEach(position => positions.add(position));
+  });
+  return Array.from(positions)
+    .sort((a, b) => a - b)
+    .map(position => projectData.projects[position]);
+}
+
+/**
+ * Normalises technology names given as a comma-separated string, an array of
+ * strings (repeated query parameters), or a mix of both.
+ * @param {string|string[]} [technologies] - Requested technology names
+ * @returns {string[]} Trimmed, non-empty technology names
+ */
+function parseTechnologyNames(technologies) {
+  if (!technologies) return [];
+  const values = Array.isArray(technologies) ? technologies : [technologies];
+  return values
+    .flatMap(value => String(value).split(','))
+    .map(name => name.trim())
+    .filter(Boolean);
+}
+
+module.exports = {
+  getTechnologyIndex,
+  findProjectsByTechnology,
+  getProjectsUsingTechnologies,
+  parseTechnologyNames,
+};
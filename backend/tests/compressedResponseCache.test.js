@@ -0,0 +1,160 @@
+import { describe, it, expect, vi } from 'vitest';
+import zlib from 'zlib';
+import { createRequire } from 'module';
+
+const require = createRequire(import.meta.url);
+const {
+  CompressedResponseCache,
+  preferredEncoding,
+  sendCompressed,
+} = require('../src/utilities/compressedResponseCache.js');
+
+/**
+ * Builds a JSON body of roughly `size` bytes that compresses well.
+ */
+function makeBody(size, label = 'item') {
+  const items = [];
+  for (let i = 0; JSON.stringify(items).length < size; i++) {
+    items.push({ id: i, name: `${label}-${i}`, tags: ['a', 'b', 'c'] });
+  }
+  return JSON.stringify(items);
+}
+
+/**
+ * Waits until every compressed copy of an entry has been built.
+ */
+async function compressed(entry, encodings = ['gzip', 'br']) {
+  await vi.waitFor(() => {
+    encodings.forEach(encoding =>
+      expect(entry.variants[encoding]).toBeTruthy()
+    );
+  });
+  return entry;
+}
+
+/**
+ * Sends an entry through sendCompressed to a client sending the given
+ * Accept-Encoding header, and returns the headers and body it was sent with.
+ */
+function send(entry, acceptEncoding) {
+  const req = { headers: { 'accept-encoding': acceptEncoding } };
+  const sent = { headers: {} };
+  const res = {
+    set(field, value) {
+      Object.assign(
+        sent.headers,
+        typeof field === 'string' ? { [field]: value } : field
+      );
+      return this;
+    },
+    status(code) {
+      sent.status = code;
+      return this;
+    },
+    send(body) {
+      sent.body = body;
+      return this;
+    },
+  };
+  sendCompressed(req, res, entry);
+  return sent;
+}
+
+describe('CompressedResponseCache', () => {
+  it('serialises and compresses a response once per data version', async () => {
+    const cache = new CompressedResponseCache();
+    const body = makeBody(50000);
+    const serialise = vi.fn(() => body);
+
+    const first = await cache.get('/api/csv', 'v1', serialise);
+    await compressed(first);
+    const second = await cache.get('/api/csv', 'v1', serialise);
+
+    expect(second).toBe(first);
+    expect(serialise).toHaveBeenCalledTimes(1);
+    expect(zlib.gunzipSync(first.variants.gzip).toString()).toBe(body);
+    expect(zlib.brotliDecompressSync(first.variants.br).toString()).toBe(body);
+    expect(first.variants.br.length).toBeLessThan(body.length / 4);
+    expect(cache.stats).toEqual({ hits: 1, misses: 1, evictions: 0 });
+
+    const updated = await cache.get('/api/csv', 'v2', () => makeBody(500));
+    expect(updated.etag).not.toBe(first.etag);
+    expect(cache.entries.size).toBe(1);
+    expect(cache.bytes).toBe(updated.bytes);
+  });
+
+  it('shares one serialisation between concurrent misses', async () => {
+    const cache = new CompressedResponseCache();
+    const serialise = vi.fn(async () => makeBody(5000));
+
+    const entries = await Promise.all(
+      Array.from({ length: 5 }, () => cache.get('/copilot', 'etag', serialise))
+    );
+
+    expect(serialise).toHaveBeenCalledTimes(1);
+    entries.forEach(entry => expect(entry).toBe(entries[0]));
+  });
+
+  it('evicts the least recently used responses past its memory cap', async () => {
+    const cache = new CompressedResponseCache({ maxBytes: 120000 });
+    const a = await compressed(
+      await cache.get('a', 1, () => makeBody(40000, 'a'))
+    );
+    await compressed(await cache.get('b', 1, () => makeBody(40000, 'b')));
+    await cache.get('a', 1, () => '');
+    await compressed(await cache.get('c', 1, () => makeBody(40000, 'c')));
+
+    expect([...cache.entries.keys()]).toEqual(['a', 'c']);
+    expect(cache.stats.evictions).toBe(1);
+    expect(cache.bytes).toBe(a.bytes + cache.entries.get('c').bytes);
+    expect(cache.bytes).toBeLessThanOrEqual(cache.maxBytes);
+
+    // A response larger than the cap is served but not kept
+    const large = await cache.get('large', 1, () => makeBody(130000));
+    expect(large.body.length).toBeGreaterThan(cache.maxBytes);
+    expect(cache.entries.has('large')).toBe(false);
+  });
+
+  it('sends the best encoding the client accepts, with Vary and an ETag', async () => {
+    const cache = new CompressedResponseCache();
+    const entry = await cache.get('/api/tech-radar/json', 'v1', () =>
+      makeBody(20000)
+    );
+
+    // Until the copies are built, the compression middleware compresses the body
+    const early = send({ ...entry, variants: {} }, 'gzip, br');
+    expect(early.headers['Content-Encoding']).toBeUndefined();
+    expect(early.body).toBe(entry.body);
+
+    await compressed(entry);
+    const br = send(entry, 'gzip, deflate, br, zstd');
+    expect(br.headers).toMatchObject({
+      'Content-Type': 'application/json; charset=utf-8',
+      'Content-Encoding': 'br',
+      ETag: entry.etag,
+      Vary: 'Accept-Encoding',
+    });
+    expect(br.body).toBe(entry.variants.br);
+
+    const gzip = send(entry, 'gzip;q=1, br;q=0.5');
+    expect(gzip.headers['Content-Encoding']).toBe('gzip');
+    expect(gzip.body).toBe(entry.variants.gzip);
+
+    const identity = send(entry, 'identity');
+    expect(identity.headers['Content-Encoding']).toBeUndefined();
+    expect(identity.body).toBe(entry.body);
+  });
+
+  it("picks the encoding by the client's q-values", () => {
+    const encodings = ['br', 'gzip', 'identity'];
+    expect(preferredEncoding('gzip;q=1, br;q=0.5', encodings)).toBe('gzip');
+    expect(preferredEncoding('gzip, deflate, br', encodings)).toBe('br');
+    expect(preferredEncoding('gzip;q=0.2, identity', encodings)).toBe(
+      'identity'
+    );
+    expect(preferredEncoding('br;q=0, *;q=0.5', encodings)).toBe('gzip');
+    expect(preferredEncoding('GZIP; Q=0.8', encodings)).toBe('identity');
+    expect(preferredEncoding(undefined, encodings)).toBe('identity');
+    expect(preferredEncoding('*;q=0', encodings)).toBeUndefined();
+  });
+});
@@ -0,0 +1,147 @@
+import {
+  describe,
+  it,
+  expect,
+  beforeAll,
+  afterAll,
+  afterEach,
+  vi,
+} from 'vitest';
+import http from 'http';
+import crypto from 'crypto';
+import { createRequire } from 'module';
+
+const INSTALLATION_ID = 42;
+const HOUR = 60 * 60 * 1000;
+
+let server;
+let tokenRequests;
+let lastAuthorization;
+let getAppAndInstallation;
+let getInstallationTokenMetrics;
+let secretsSend;
+let clock = null;
+
+beforeAll(async () => {
+  tokenRequests = 0;
+
+  server = http.createServer((req, res) => {
+    const { pathname } = new URL(req.url, 'http://localhost');
+    res.setHeader('Content-Type', 'application/json');
+
+    if (pathname === '/orgs/test-org/installation') {
+      res.end(JSON.stringify({ id: INSTALLATION_ID }));
+    } else if (
+      req.method === 'POST' &&
+      pathname === `/app/installations/${INSTALLATION_ID}/access_tokens`
+    ) {
+      tokenRequests++;
+      res.statusCode = 201;
+      res.end(
+        JSON.stringify({
+          token: `token-${tokenRequests}`,
+          expires_at: new Date(Date.now() + HOUR).toISOString(),
+          permissions: { members: 'read' },
+          repository_selection: 'all',
+        })
+      );
+    } else if (pathname === '/installation/repositories') {
+      lastAuthorization = req.headers.authorization;
+      res.end(JSON.stringify({ total_count: 0, repositories: [] }));
+    } else {
+      res.statusCode = 404;
+      res.end(JSON.stringify({ message: 'Not Found' }));
+    }
+  });
+  await new Promise(resolve => server.listen(0, resolve));
+
+  process.env.GITHUB_ORG = 'test-org';
+  process.env.GITHUB_APP_ID = '1';
+  process.env.GITHUB_API_URL = `http://localhost:${server.address().port}`;
+
+  const { privateKey } = crypto.generateKeyPairSync('rsa', {
+    modulusLength: 2048,
+    privateKeyEncoding: { type: 'pkcs8', format: 'pem' },
+    publicKeyEncoding: { type: 'spki', format: 'pem' },
+  });
+
+  // Load through Node so the spy applies to the client used by the module
+  const require = createRequire(import.meta.url);
+  const { SecretsManagerClient } = require('@aws-sdk/client-secrets-manager');
+  secretsSend = vi
+    .spyOn(SecretsManagerClient.prototype, 'send')
+    .mockResolvedValue({ SecretString: privateKey });
+
+  ({ getAppAndInstallation, getInstallationTokenMetrics } = require(
+    '../src/utilities/getAppAndInstallation.js'
+  ));
+});
+
+afterEach(() => {
+  clock?.mockRestore();
+  clock = null;
+});
+
+afterAll(() => {
+  vi.restoreAllMocks();
+  delete process.env.GITHUB_API_URL;
+  server.close();
+});
+
+/**
+ * Mocks Date.now to return a time offset from the real clock.
+ */
+function advanceClock(offsetMs) {
+  const now = Date.now();
+  clock = vi.spyOn(Date, 'now').mockReturnValue(now + offsetMs);
+}
+
+describe('getAppAndInstallation token reuse', () => {
+  it('shares one token acquisition between concurrent callers', async () => {
+    const clients = await Promise.all(
+      Array.from({ length: 5 }, () => getAppAndInstallation())
+    );
+
+    expect(new Set(clients).size).toBe(1);
+    expect(tokenRequests).toBe(1);
+    expect(secretsSend).toHaveBeenCalledTimes(1);
+    expect(getInstallationTokenMetrics().acquisitions).toBe(1);
+    expect(getInstallationTokenMetrics().totalAcquisitionMs).toBeGreaterThan(0);
+  });
+
+  it('reuses the client and token while the token is valid', async () => {
+    const octokit = await getAppAndInstallation();
+    await octokit.request('GET /installation/repositories');
+
+    expect(tokenRequests).toBe(1);
+    expect(lastAuthorization).toBe('token token-1');
+    expect(getInstallationTokenMetrics().reused).toBeGreaterThan(0);
+  });
+
+  it('refreshes the token in the background before it expires', async () => {
+    const before = await getAppAndInstallation();
+
+    advanceClock(HOUR - 60 * 1000);
+    const during = await getAppAndInstallation();
+    expect(during).toBe(before);
+
+    await vi.waitFor(() =>
+      expect(getInstallationTokenMetrics().acquisitions).toBe(2)
+    );
+    expect(tokenRequests).toBe(2);
+    await during.request('GET /installation/repositories');
+    expect(lastAuthorization).toBe('token token-2');
+    expect(secretsSend).toHaveBeenCalledTimes(1);
+  });
+
+  it('waits for a new token once the current one has expired', async () => {
+    advanceClock(3 * HOUR);
+    await getAppAndInstallation();
+
+    expect(tokenRequests).toBe(3);
+    expect(getInstallationTokenMetrics()).toMatchObject({
+      acquisitions: 3,
+      failures: 0,
+    });
+  });
+});
@@ -0,0 +1,171 @@
+import {
+  describe,
+  it,
+  expect,
+  beforeAll,
+  afterAll,
+  beforeEach,
+  vi,
+} from 'vitest';
+import http from 'http';
+import { createRequire } from 'module';
+
+// Load the CommonJS modules through Node so the service and the test share
+// the same getAppAndInstallation module object
+const require = createRequire(import.meta.url);
+const githubService = require('../src/services/githubService.js');
+const appInstallation = require('../src/utilities/getAppAndInstallation.js');
+
+const ORG = 'test-org';
+const USER_TEAMS = 250;
+const TEAM_SIZES = { big: 530, small: 3 };
+
+let server;
+let baseUrl;
+let requests;
+let inFlight;
+let maxInFlight;
+
+/**
+ * Serves a page of `total` items, with GitHub-style Link headers.
+ */
+function sendPage(req, res, total, makeItem) {
+  const url = new URL(req.url, baseUrl);
+  const perPage = parseInt(url.searchParams.get('per_page'), 10) || 30;
+  const page = parseInt(url.searchParams.get('page'), 10) || 1;
+  const lastPage = Math.max(1, Math.ceil(total / perPage));
+
+  const items = [];
+  const end = Math.min(total, page * perPage);
+  for (let i = (page - 1) * perPage; i < end; i++) {
+    items.push(makeItem(i));
+  }
+
+  const pageUrl = number => {
+    const link = new URL(url);
+    link.searchParams.set('page', number);
+    return `<${link}>`;
+  };
+  const links = [];
+  if (page < lastPage) {
+    links.push(`${pageUrl(page + 1)}; rel="next"`);
+    links.push(`${pageUrl(lastPage)}; rel="last"`);
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'application/json',
+    ...(links.length > 0 ? { Link: links.join(', ') } : {}),
+  });
+  res.end(JSON.stringify(items));
+}
+
+beforeAll(async () => {
+  server = http.createServer((req, res) => {
+    const { pathname } = new URL(req.url, baseUrl);
+    requests.push(pathname);
+    inFlight++;
+    maxInFlight = Math.max(maxInFlight, inFlight);
+
+    setTimeout(() => {
+      inFlight--;
+      const members = pathname.match(
+        /^\/orgs\/[^/]+\/teams\/([^/]+)\/members$/
+      );
+
+      if (pathname === '/user/teams') {
+        sendPage(req, res, USER_TEAMS, i => ({
+          slug: `team-${i}`,
+          name: `Team ${i}`,
+          description: null,
+          html_url: `https://github.com/orgs/${ORG}/teams/team-${i}`,
+        }));
+      } else if (members && TEAM_SIZES[members[1]] !== undefined) {
+        sendPage(req, res, TEAM_SIZES[members[1]], i => ({
+          login: `${members[1]}-user-${i}`,
+          id: i,
+        }));
+      } else {
+        res.writeHead(404, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ message: 'Not Found' }));
+      }
+    }, 20);
+  });
+
+  await new Promise(resolve => server.listen(0, resolve));
+  baseUrl = `http://localhost:${server.address().port}`;
+  process.env.GITHUB_API_URL = baseUrl;
+  githubService.org = ORG;
+
+  const { Octokit } = await import('@octokit/rest');
+  vi.spyOn(appInstallation, 'getAppAndInstallation').mockImplementation(
+    async () => new Octokit({ baseUrl })
+  );
+});
+
+afterAll(() => {
+  vi.restoreAllMocks();
+  delete process.env.GITHUB_API_URL;
+  server.close();
+});
+
+beforeEach(() => {
+  requests = [];
+  inFlight = 0;
+  maxInFlight = 0;
+  appInstallation.getAppAndInstallation.mockClear();
+});
+
+describe('GitHubService pagination', () => {
+  it('returns every page of the user teams', async () => {
+    const teams = await githubService.getUserTeams('token-all-pages');
+
+    expect(teams).toHaveLength(USER_TEAMS);
+    expect(teams[0]).toEqual({
+      slug: 'team-0',
+      name: 'Team 0',
+      description: null,
+      url: `https://github.com/orgs/${ORG}/teams/team-0`,
+    });
+    expect(teams.map(team => team.slug)).toEqual(
+      Array.from({ length: USER_TEAMS }, (_, i) => `team-${i}`)
+    );
+    expect(requests).toHaveLength(3);
+  });
+
+  it('fetches the remaining member pages concurrently, within the limit', async () => {
+    const members = await githubService.getTeamMembersAsAdmin('big');
+
+    expect(members).toHaveLength(TEAM_SIZES.big);
+    expect(members.map(member => member.id)).toEqual(
+      Array.from({ length: TEAM_SIZES.big }, (_, i) => i)
+    );
+    expect(requests).toHaveLength(6);
+    expect(maxInFlight).toBeGreaterThan(1);
+    expect(maxInFlight).toBeLessThanOrEqual(githubService.concurrency);
+  });
+
+  it('fetches the members of many teams with one installation client', async () => {
+    const members = await githubService.getMembersOfTeams([
+      'big',
+      'small',
+      'big',
+    ]);
+
+    expect(Object.keys(members)).toEqual(['big', 'small']);
+    expect(members.big).toHaveLength(TEAM_SIZES.big);
+    expect(members.small).toHaveLength(TEAM_SIZES.small);
+    expect(appInstallation.getAppAndInstallation).toHaveBeenCalledTimes(1);
+  });
+
+  it('checks membership across all pages of the user teams', async () => {
+    await expect(
+      githubService.getTeamMembers('not-a-team', 'token-membership')
+    ).rejects.toThrow('User is not a member of the team: not-a-team');
+
+    // team-249 is on the last page of /user/teams, but has no members fixture
+    await expect(
+      githubService.getTeamMembers('team-249', 'token-membership')
+    ).rejects.toThrow();
+    expect(requests.at(-1)).toBe(`/orgs/${ORG}/teams/team-249/members`);
+  });
+});
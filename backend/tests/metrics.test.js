@@ -0,0 +1,182 @@
+import { describe, it, expect, beforeAll, afterAll } from 'vitest';
+import http from 'http';
+import zlib from 'zlib';
+import { createRequire } from 'module';
+
+const require = createRequire(import.meta.url);
+const {
+  Registry,
+  registry,
+  metricsMiddleware,
+  recordS3Request,
+  recordGitHubRequest,
+  recordRateLimitRejection,
+} = require('../src/utilities/metrics.js');
+
+let server;
+let baseUrl;
+
+/**
+ * Handles a request the way Express would after routing: `/api/items/:id`
+ * matches a route, anything else is left unmatched. `?wait=` delays the
+ * response and `?gzip` compresses it.
+ */
+function handler(req, res) {
+  const url = new URL(req.url, baseUrl);
+  if (url.pathname.startsWith('/api/items/')) {
+    req.baseUrl = '/api';
+    req.route = { path: '/items/:id' };
+  }
+  const body = JSON.stringify({ items: new Array(500).fill('item') });
+  const wait = parseInt(url.searchParams.get('wait'), 10) || 0;
+
+  setTimeout(() => {
+    if (url.searchParams.has('gzip')) {
+      res.writeHead(200, { 'Content-Encoding': 'gzip' });
+      res.end(zlib.gzipSync(body));
+    } else {
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(body);
+    }
+  }, wait);
+}
+
+/**
+ * Reads the value of a sample from an exposition, e.g.
+ * sample(text, 'cache_hits_total{cache="s3"}').
+ */
+function sample(text, series) {
+  const line = text.split('\n').find(line => line.startsWith(`${series} `));
+  return line === undefined ? undefined : Number(line.slice(series.length + 1));
+}
+
+beforeAll(async () => {
+  server = http.createServer((req, res) => {
+    metricsMiddleware(req, res, () => handler(req, res));
+  });
+  await new Promise(resolve => server.listen(0, resolve));
+  baseUrl = `http://localhost:${server.address().port}`;
+});
+
+afterAll(() => {
+  server.close();
+});
+
+describe('Metrics', () => {
+  it('records latency and bytes by route template', async () => {
+    await fetch(`${baseUrl}/api/items/1?wait=30`);
+    await fetch(`${baseUrl}/api/items/2`);
+    await fetch(`${baseUrl}/api/items/3?gzip`);
+    await fetch(`${baseUrl}/unknown/path`);
+
+    const text = registry.render();
+    const labels = 'method="GET",route="/api/items/:id",status="200"';
+    const histogram = suffix =>
+      sample(text, `http_request_duration_seconds${suffix}`);
+    expect(histogram(`_count{${labels}}`)).toBe(3);
+    expect(histogram(`_bucket{${labels},le="0.01"}`)).toBeLessThanOrEqual(2);
+    expect(histogram(`_bucket{${labels},le="+Inf"}`)).toBe(3);
+    expect(histogram(`_sum{${labels}}`)).toBeGreaterThanOrEqual(0.03);
+    expect(
+      histogram('_count{method="GET",route="unmatched",status="200"}')
+    ).toBe(1);
+
+    // Two uncompressed responses and one much smaller gzipped one
+    const bytes = sample(text, `http_response_bytes_total{${labels}}`);
+    expect(bytes).toBeGreaterThan(2 * 3500);
+    expect(bytes).toBeLessThan(3 * 3500);
+  });
+
+  it('makes histogram buckets cumulative', () => {
+    const local = new Registry();
+    const histogram = local.register({
+      name: 'duration_seconds',
+      help: 'Test histogram.',
+      type: 'histogram',
+      buckets: [0.1, 1],
+    });
+    [0.05, 0.5, 0.5, 5].forEach(value => histogram.observe({}, value));
+
+    expect(local.render()).toBe(
+      [
+        '# HELP duration_seconds Test histogram.',
+        '# TYPE duration_seconds histogram',
+        'duration_seconds_bucket{le="0.1"} 1',
+        'duration_seconds_bucket{le="1"} 3',
+        'duration_seconds_bucket{le="+Inf"} 4',
+        'duration_seconds_sum 6.05',
+        'duration_seconds_count 4',
+        '',
+      ].join('\n')
+    );
+  });
+
+  it('escapes label values and refreshes collected values on each scrape', () => {
+    const local = new Registry();
+    const entries = local.register({
+      name: 'entries',
+      help: 'Test gauge.',
+      type: 'gauge',
+      labelNames: ['cache'],
+    });
+    let size = 1;
+    local.addCollector(() => entries.set({ cache: 'a "b"\\c' }, size));
+
+    expect(local.render()).toContain('entries{cache="a \\"b\\"\\\\c"} 1');
+    size = 7;
+    expect(local.render()).toContain('entries{cache="a \\"b\\"\\\\c"} 7');
+  });
+
+  it('counts S3 and GitHub requests, rate limit rejections and event loop lag', () => {
+    recordS3Request('get', 'bucket', 'repositories.json', 'ok', 1200);
+    recordS3Request('get', 'bucket', 'repositories.json', 'not_modified');
+    recordS3Request('put', 'bucket', 'array_data.json', 'ok', 300);
+    recordGitHubRequest('GET /user/teams', {
+      status: 200,
+      headers: {
+        'x-ratelimit-remaining': '4990',
+        'x-ratelimit-resource': 'core',
+      },
+    });
+    recordGitHubRequest('GET /user/teams', {
+      status: 403,
+      response: { headers: { 'x-ratelimit-remaining': '0' } },
+    });
+    recordRateLimitRejection('general');
+
+    const text = registry.render();
+    expect(
+      sample(
+        text,
+        's3_requests_total{operation="get",bucket="bucket",key="repositories.json",result="ok"}'
+      )
+    ).toBe(1);
+    expect(
+      sample(
+        text,
+        's3_bytes_total{operation="get",bucket="bucket",key="repositories.json"}'
+      )
+    ).toBe(1200);
+    expect(
+      sample(
+        text,
+        's3_bytes_total{operation="put",bucket="bucket",key="array_data.json"}'
+      )
+    ).toBe(300);
+    expect(
+      sample(
+        text,
+        'github_requests_total{route="GET /user/teams",status="403"}'
+      )
+    ).toBe(1);
+    expect(
+      sample(text, 'github_rate_limit_remaining{resource="core"}')
+    ).toBe(0);
+    expect(sample(text, 'rate_limit_rejections_total{limiter="general"}')).toBe(
+      1
+    );
+    expect(
+      sample(text, 'nodejs_eventloop_lag_seconds{quantile="0.99"}')
+    ).toBeGreaterThanOrEqual(0);
+  });
+});
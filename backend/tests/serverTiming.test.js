@@ -0,0 +1,146 @@
+import { describe, it, expect, beforeAll, afterAll, afterEach } from 'vitest';
+import http from 'http';
+import { createRequire } from 'module';
+
+const require = createRequire(import.meta.url);
+const {
+  serverTiming,
+  timeStage,
+  formatServerTiming,
+} = require('../src/utilities/serverTiming.js');
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+let server;
+let baseUrl;
+
+/**
+ * Adds the parts of Express's request and response API that the middleware uses.
+ */
+function expressLike(req, res) {
+  req.originalUrl = req.url;
+  res.send = function (body) {
+    this.end(body);
+    return this;
+  };
+  res.json = function (body) {
+    this.setHeader('Content-Type', 'application/json');
+    return this.send(JSON.stringify(body));
+  };
+}
+
+/**
+ * Handles a request the way a route would: an awaited "S3" stage whose
+ * length comes from the query string, then a synchronous "query" stage.
+ */
+async function handler(req, res) {
+  const url = new URL(req.url, baseUrl);
+  const wait = parseInt(url.searchParams.get('wait'), 10) || 0;
+
+  await timeStage('s3_get', () => sleep(wait));
+  await timeStage('s3_get', () => sleep(wait));
+  const result = timeStage('query', () => ({ wait }));
+
+  if (url.pathname === '/fail') {
+    await timeStage('github_teams', () =>
+      Promise.reject(new Error('rate limited'))
+    ).catch(() => {});
+  }
+  res.json(result);
+}
+
+/**
+ * Parses a Server-Timing header into durations by metric name.
+ */
+function parseServerTiming(header) {
+  return Object.fromEntries(
+    header.split(',').map(metric => {
+      const [name, ...params] = metric.trim().split(';');
+      const duration = params.find(param => param.startsWith('dur='));
+      return [name, parseFloat(duration.slice(4))];
+    })
+  );
+}
+
+beforeAll(async () => {
+  server = http.createServer((req, res) => {
+    expressLike(req, res);
+    serverTiming(req, res, () => handler(req, res));
+  });
+  await new Promise(resolve => server.listen(0, resolve));
+  baseUrl = `http://localhost:${server.address().port}`;
+});
+
+afterAll(() => {
+  server.close();
+});
+
+afterEach(() => {
+  delete process.env.SERVER_TIMING;
+});
+
+describe('Server-Timing', () => {
+  it('reports each stage of a request, summing repeated stages', async () => {
+    const res = await fetch(`${baseUrl}/?wait=20`);
+    expect(res.status).toBe(200);
+
+    const header = res.headers.get('server-timing');
+    expect(header).toMatch(/s3_get;desc="2 calls";dur=/);
+
+    const timings = parseServerTiming(header);
+    expect(Object.keys(timings)).toEqual([
+      's3_get',
+      'query',
+      'serialise',
+      'total',
+    ]);
+    expect(timings.s3_get).toBeGreaterThanOrEqual(38);
+    expect(timings.total).toBeGreaterThanOrEqual(timings.s3_get);
+  });
+
+  it('keeps the timings of concurrent requests apart', async () => {
+    const [slow, fast] = await Promise.all([
+      fetch(`${baseUrl}/?wait=60`),
+      fetch(`${baseUrl}/?wait=1`),
+    ]);
+
+    const slowTimings = parseServerTiming(slow.headers.get('server-timing'));
+    const fastTimings = parseServerTiming(fast.headers.get('server-timing'));
+    expect(slowTimings.s3_get).toBeGreaterThanOrEqual(118);
+    expect(fastTimings.s3_get).toBeLessThan(60);
+  });
+
+  it('records stages that fail', async () => {
+    const res = await fetch(`${baseUrl}/fail`);
+    expect(res.headers.get('server-timing')).toContain('github_teams;dur=');
+  });
+
+  it('leaves out the header when SERVER_TIMING is false', async () => {
+    process.env.SERVER_TIMING = 'false';
+    const res = await fetch(`${baseUrl}/`);
+    expect(res.status).toBe(200);
+    expect(res.headers.get('server-timing')).toBeNull();
+  });
+
+  it('runs functions untimed outside a request', async () => {
+    expect(timeStage('query', () => 42)).toBe(42);
+    await expect(timeStage('s3_get', async () => 'body')).resolves.toBe(
+      'body'
+    );
+    expect(() =>
+      timeStage('query', () => {
+        throw new Error('boom');
+      })
+    ).toThrow('boom');
+  });
+
+  it('formats stages as a header value', () => {
+    const stages = new Map([
+      ['s3_get', { durationMs: 12.345, count: 1 }],
+      ['query', { durationMs: 1.01, count: 3 }],
+    ]);
+    expect(formatServerTiming(stages, 15)).toBe(
+      's3_get;dur=12.3, query;desc="3 calls";dur=1.0, total;dur=15.0'
+    );
+  });
+});
@@ -0,0 +1,187 @@
+import {
+  describe,
+  it,
+  expect,
+  beforeAll,
+  afterAll,
+  beforeEach,
+  vi,
+} from 'vitest';
+import { createRequire } from 'module';
+
+// Load the CommonJS modules through Node so the service and the test share
+// the same s3Service instance
+const require = createRequire(import.meta.url);
+const s3Service = require('../src/services/s3Service.js');
+const techRadarService = require('../src/services/techRadarService.js');
+
+let stored;
+let etag;
+let puts;
+
+/**
+ * Builds a valid radar entry.
+ */
+function entry(id, quadrant = '1', ringId = 'adopt') {
+  return {
+    id,
+    title: id,
+    quadrant,
+    timeline: [{ moved: 0, ringId, date: '2025-01-01', description: 'Added' }],
+  };
+}
+
+/**
+ * Changes the stored radar as another writer would.
+ */
+function writeElsewhere(data) {
+  stored = JSON.parse(JSON.stringify(data));
+  etag = `"${Number(etag.slice(1, -1)) + 1}"`;
+}
+
+beforeAll(() => {
+  techRadarService.flushDelayMs = 20;
+
+  vi.spyOn(s3Service, 'getObjectWithETag').mockImplementation(async () => ({
+    data: JSON.parse(JSON.stringify(stored)),
+    etag,
+  }));
+  vi.spyOn(s3Service, 'putObject').mockImplementation(
+    async (bucket, key, data, { ifMatch } = {}) => {
+      puts++;
+      await new Promise(resolve => setTimeout(resolve, 10));
+      if (ifMatch !== etag) {
+        const error = new Error('Precondition Failed');
+        error.name = 'PreconditionFailed';
+        throw error;
+      }
+      writeElsewhere(data);
+      return { etag };
+    }
+  );
+});
+
+afterAll(() => {
+  vi.restoreAllMocks();
+});
+
+beforeEach(() => {
+  stored = {
+    quadrants: [{ id: '1' }, { id: '2' }],
+    rings: [{ id: 'adopt' }, { id: 'trial' }],
+    entries: [entry('existing')],
+  };
+  etag = '"1"';
+  puts = 0;
+});
+
+describe('TechRadarService write coalescing', () => {
+  it('writes concurrent updates with a single PUT', async () => {
+    await Promise.all([
+      techRadarService.updateTechRadarEntries([entry('a')], 'review'),
+      techRadarService.updateTechRadarEntries([entry('b', '2')], 'review'),
+      techRadarService.updateTechRadarEntries([entry('c')], 'admin'),
+    ]);
+
+    expect(puts).toBe(1);
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'c', 'existing', 'b']);
+  });
+
+  it('applies updates to the same entry in arrival order', async () => {
+    await Promise.all([
+      techRadarService.updateTechRadarEntries([entry('a', '1', 'trial')]),
+      techRadarService.updateTechRadarEntries([entry('a', '1', 'adopt')]),
+    ]);
+
+    expect(puts).toBe(1);
+    const updated = stored.entries.find(e => e.id === 'a');
+    expect(updated.timeline[0].ringId).toBe('adopt');
+  });
+
+  it('rejects an invalid update without failing the rest of the batch', async () => {
+    const results = await Promise.allSettled([
+      techRadarService.updateTechRadarEntries([entry('a')]),
+      techRadarService.updateTechRadarEntries([entry('bad', '9')]),
+    ]);
+
+    expect(results[0].status).toBe('fulfilled');
+    expect(results[1].reason.message).toBe('Invalid entry structure');
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'existing']);
+  });
+
+  it('rejects a malformed update without failing a valid one in the same batch', async () => {
+    const malformed = entry('bad');
+    malformed.timeline = [null];
+
+    const results = await Promise.allSettled([
+      techRadarService.updateTechRadarEntries([entry('a')], 'review'),
+      techRadarService.updateTechRadarEntries([null], 'review'),
+      techRadarService.updateTechRadarEntries([malformed], 'admin'),
+    ]);
+
+    expect(results[0].status).toBe('fulfilled');
+    expect(results[1].reason.message).toBe('Invalid entry structure');
+    expect(results[2].reason.message).toBe('Invalid entry structure');
+    expect(puts).toBe(1);
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'existing']);
+  });
+
+  it('rejects empty updates without queueing them', async () => {
+    await expect(techRadarService.updateTechRadarEntries([])).rejects.toThrow(
+      'Invalid or empty entries data'
+    );
+    expect(techRadarService.pending).toHaveLength(0);
+  });
+
+  it('merges into the latest radar when another writer got there first', async () => {
+    const update = techRadarService.updateTechRadarEntries([entry('a')]);
+
+    // Change the radar between this flush's read and its write
+    s3Service.getObjectWithETag.mockImplementationOnce(async () => {
+      const current = { data: JSON.parse(JSON.stringify(stored)), etag };
+      writeElsewhere({ ...stored, entries: [...stored.entries, entry('z')] });
+      return current;
+    });
+    await update;
+
+    expect(puts).toBe(2);
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'existing', 'z']);
+  });
+
+  it('rejects with a 409 when every write attempt conflicts', async () => {
+    // Another writer changes the radar after every read
+    s3Service.getObjectWithETag.mockImplementation(async () => {
+      const current = { data: JSON.parse(JSON.stringify(stored)), etag };
+      writeElsewhere(stored);
+      return current;
+    });
+
+    try {
+      await expect(
+        techRadarService.updateTechRadarEntries([entry('a')])
+      ).rejects.toMatchObject({
+        status: 409,
+        message: 'Tech radar was changed by another request, please try again',
+      });
+      expect(puts).toBe(techRadarService.writeAttempts);
+    } finally {
+      s3Service.getObjectWithETag.mockImplementation(async () => ({
+        data: JSON.parse(JSON.stringify(stored)),
+        etag,
+      }));
+    }
+  });
+
+  it('queues updates made during a flush for the next write', async () => {
+    const first = techRadarService.updateTechRadarEntries([entry('a')]);
+    await vi.waitFor(() => expect(techRadarService.flushing).not.toBeNull());
+
+    const second = techRadarService.updateTechRadarEntries([entry('b')]);
+    await first;
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'existing']);
+
+    await second;
+    expect(puts).toBe(2);
+    expect(stored.entries.map(e => e.id)).toEqual(['a', 'b', 'existing']);
+  });
+});
@@ -3,7 +3,6 @@ import { useNavigate, useParams, useSearchParams } from 'react-router-dom';
 import Header from '../components/Header/Header';
 import HistoricDashboard from '../components/Copilot/Dashboards/HistoricDashboard';
 import {
-  filterUsageData,
   processUsageData,
   fetchTeamsHistoricData,
   extractTeamData,
@@ -41,16 +40,35 @@ function CopilotDashboard() {
     };
   };
 
-  // Cancellation ref for fetchTeamData
+  // Cancellation ref for the latest team data request
   const fetchTeamDataCancelRef = React.useRef({ cancelled: false });
 
+  /**
+   * Start a team data request, superseding any request still in flight
+   * @returns {Object} - The request, whose `cancelled` flag is checked once it returns
+   */
+  const startTeamRequest = () => {
+    const request = { cancelled: false };
+    fetchTeamDataCancelRef.current = request;
+    return request;
+  };
+
+  /**
+   * Check whether a team data request was cancelled or superseded
+   * @param {Object} request - The request from startTeamRequest
+   * @returns {boolean} - Whether its response should be ignored
+   */
+  const isStaleTeamRequest = request =>
+    request.cancelled || fetchTeamDataCancelRef.current !== request;
+
   const fetchTeamData = async slug => {
-    fetchTeamDataCancelRef.current.cancelled = false;
+    const request = startTeamRequest();
     setIsTeamLoading(true);
 
-    // Extract team data from the S3 historic data
-    const teamUsageData = extractTeamData(teamsHistoricData, slug);
-    if (fetchTeamDataCancelRef.current.cancelled) return;
+    // Fetch only the selected team's usage
+    const teamsData = await fetchTeamsHistoricData({ teams: [slug] });
+    if (isStaleTeamRequest(request)) return;
+    const teamUsageData = extractTeamData(teamsData, slug);
 
     if (!teamUsageData) {
       toast.error('No data available for this team');
@@ -65,9 +83,13 @@ function CopilotDashboard() {
     setEndDate(end);
 
     setTeamData({
-      allUsage: teamUsageData ?? [],
-      filteredUsage: teamUsageData ?? [],
-      processedUsage: teamUsageData ? processUsageData(teamUsageData) : [],
+      slug,
+      firstDate: start,
+      lastDate: end,
+      since: start,
+      until: end,
+      filteredUsage: teamUsageData,
+      processedUsage: processUsageData(teamUsageData),
     });
 
     // Ensure we're showing the team data view
@@ -88,14 +110,34 @@ function CopilotDashboard() {
     if (viewDatesBy === 'Year') return historicOrgData.yearUsage;
   };
 
-  const setFilteredData = (data, setData) => {
-    if (!data || !startDate || !endDate) return;
-    const filteredData = filterUsageData(data, startDate, endDate);
-    setData(prev => ({
-      ...prev,
-      filteredUsage: filteredData,
-      processedUsage: processUsageData(filteredData),
-    }));
+  /**
+   * Fetch the selected team's usage for a date window and process it
+   * @param {string} slug - The team slug
+   * @param {string} since - First date to include
+   * @param {string} until - Last date to include
+   */
+  const fetchTeamWindow = async (slug, since, until) => {
+    const request = startTeamRequest();
+    const teamsData = await fetchTeamsHistoricData({
+      teams: [slug],
+      since,
+      until,
+    });
+    // Keep showing the previous window if the request failed
+    if (isStaleTeamRequest(request) || !teamsData) return;
+
+    const teamUsageData = extractTeamData(teamsData, slug) ?? [];
+    setTeamData(prev =>
+      prev.slug === slug
+        ? {
+            ...prev,
+            since,
+            until,
+            filteredUsage: teamUsageData,
+            processedUsage: processUsageData(teamUsageData),
+          }
+        : prev
+    );
   };
 
   const [historicOrgData, setHistoricOrgData] = useState({
@@ -105,11 +147,16 @@ function CopilotDashboard() {
     yearUsage: [],
   });
 
-  const [teamData, setTeamData] = useState({
-    allUsage: [],
+  const emptyTeamData = {
+    slug: null,
+    firstDate: null,
+    lastDate: null,
+    since: null,
+    until: null,
     filteredUsage: [],
     processedUsage: [],
-  });
+  };
+  const [teamData, setTeamData] = useState(emptyTeamData);
 
   const dateOptions = [
     { value: 'Day', label: 'Day' },
@@ -135,7 +182,6 @@ function CopilotDashboard() {
   const [isCopilotAdmin, setIsCopilotAdmin] = useState(false);
   const [userTeamSlugs, setUserTeamSlugs] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
-  const [teamsHistoricData, setTeamsHistoricData] = useState(null);
 
   // Filter listed available teams based on search term
   const filteredAvailableTeams = useMemo(() => {
@@ -164,10 +210,8 @@ function CopilotDashboard() {
       if (teamParam) {
         setTeamSlug(teamParam);
         setIsSelectingTeam(false);
-        // Set loading state if we don't have teams historic data yet
-        if (!teamsHistoricData) {
-          setIsTeamLoading(true);
-        }
+        // The team's data is fetched once the user is authenticated
+        setIsTeamLoading(true);
       } else {
         setIsSelectingTeam(true);
       }
@@ -179,7 +223,7 @@ function CopilotDashboard() {
 
     // Mark as initialised after processing URL parameters
     setIsInitialised(true);
-  }, [teamsHistoricData]); // Run when teams historic data is loaded
+  }, []);
 
   /**
    * Handle manual date input changes
@@ -198,17 +242,6 @@ function CopilotDashboard() {
   useEffect(() => {
     const code = searchParams.get('code');
 
-    const fetchTeamsHistoric = async () => {
-      try {
-        const teamsData = await fetchTeamsHistoricData();
-        if (teamsData) {
-          setTeamsHistoricData(teamsData);
-        }
-      } catch (err) {
-        console.error('Failed to fetch teams historic data:', err);
-      }
-    };
-
     const authenticateGitHubUser = async () => {
       // Exchange code for token (this will set httpOnly cookie)
       if (code) {
@@ -237,10 +270,7 @@ function CopilotDashboard() {
           setIsAuthenticated(true);
           setIsTeamsListLoading(true);
 
-          const [teamsData] = await Promise.all([
-            fetchUserTeams(),
-            fetchTeamsHistoric(),
-          ]);
+          const teamsData = await fetchUserTeams();
 
           if (teamsData && teamsData.teams && teamsData.teams.length >= 0) {
             setAvailableTeams(teamsData.teams);
@@ -289,22 +319,22 @@ function CopilotDashboard() {
   }, [hasFetchedHistoric]);
 
   /**
-   * Extract team data when we have both a team slug and historic data available
+   * Fetch the selected team's data once the user is authenticated
    */
   useEffect(() => {
-    if (teamSlug && teamsHistoricData && scope === 'team' && !isSelectingTeam) {
+    if (teamSlug && isAuthenticated && scope === 'team' && !isSelectingTeam) {
       fetchTeamData(teamSlug);
     }
-  }, [teamSlug, teamsHistoricData, scope, isSelectingTeam]);
+  }, [teamSlug, isAuthenticated, scope, isSelectingTeam]);
 
   /**
-   * Filter and then process team usage data based on start and end date
+   * Fetch and process the team's usage for the selected start and end date
    */
   useEffect(() => {
-    if (scope === 'team') {
-      setFilteredData(teamData.allUsage, setTeamData);
-    }
-  }, [scope, teamData.allUsage, startDate, endDate]);
+    if (scope !== 'team' || !teamData.slug || !startDate || !endDate) return;
+    if (startDate === teamData.since && endDate === teamData.until) return;
+    fetchTeamWindow(teamData.slug, startDate, endDate);
+  }, [scope, teamData.slug, startDate, endDate]);
 
   /**
    * Display team selection UI to choose a team to fetch data for
@@ -317,9 +347,11 @@ function CopilotDashboard() {
       setIsSelectingTeam(true);
     }
     //Reset start and end dates when switching scopes
-    const { start, end } = initialiseDateRange(data.allUsage);
-    setStartDate(start);
-    setEndDate(end);
+    if (!teamSlug) {
+      setTeamData(emptyTeamData);
+      setStartDate(null);
+      setEndDate(null);
+    }
   }, [scope, teamSlug]);
 
   const handleLogout = async () => {
@@ -395,9 +427,9 @@ function CopilotDashboard() {
                       setIsSelectingTeam(true);
                       setTeamSlug(null);
                       navigate('/copilot/team', { replace: true });
-                      const { start, end } = initialiseDateRange(data.allUsage);
-                      setStartDate(start);
-                      setEndDate(end);
+                      setTeamData(emptyTeamData);
+                      setStartDate(null);
+                      setEndDate(null);
                     }}
                     aria-label={`Return to team selection`}
                   >
@@ -440,7 +472,7 @@ function CopilotDashboard() {
                             onChange={e =>
                               handleDateChange('start', e.target.value)
                             }
-                            min={data?.allUsage?.[0]?.date}
+                            min={teamData.firstDate}
                             max={endDate}
                             aria-label="Start date for data range"
                           />
@@ -466,9 +498,7 @@ function CopilotDashboard() {
                               handleDateChange('end', e.target.value)
                             }
                             min={startDate}
-                            max={
-                              data?.allUsage?.[data.allUsage.length - 1]?.date
-                            }
+                            max={teamData.lastDate}
                             aria-label="End date for data range"
                           />
                         </div>
@@ -573,7 +603,6 @@ function CopilotDashboard() {
                           <button
                             className="team-card-button"
                             onClick={() => {
-                              fetchTeamData(team.slug);
                               setTeamSlug(team.slug);
                               setIsSelectingTeam(false);
                               navigate(`/copilot/team/${team.slug}`, {
@@ -53,15 +53,16 @@ export const fetchRepositoryData = async (
       return null;
     }
 
-    const params = new URLSearchParams();
-
-    params.append('repositories', repositories.join(','));
-    if (date) params.append('datetime', date);
-    if (archived !== null) params.append('archived', archived);
+    // Send the names in the request body so large portfolios resolve in one call
+    const body = { repositories };
+    if (date) body.datetime = date;
+    if (archived !== null) body.archived = archived;
 
-    const response = await customFetch(
-      `/api/repository/project/json?${params.toString()}`
-    );
+    const response = await customFetch(`/api/repository/project/json`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+    });
 
     if (!response.ok) {
       throw new Error(
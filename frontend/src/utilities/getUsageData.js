@@ -21,13 +21,25 @@ export const fetchOrgHistoricUsageData = async () => {
 };
 
 /**
- * Fetch all teams' historic usage data from S3
+ * Fetch teams' historic usage data from S3
  *
+ * @param {Object} [options] - Optional filters
+ * @param {string[]} [options.teams] - Slugs of the teams to fetch (defaults to all available teams)
+ * @param {string} [options.since] - First date to include, e.g. 2025-01-01
+ * @param {string} [options.until] - Last date to include, e.g. 2025-01-31
  * @returns {Promise<Array>} - Array of team objects with historic usage data
  */
-export const fetchTeamsHistoricData = async () => {
+export const fetchTeamsHistoricData = async ({ teams, since, until } = {}) => {
   try {
-    const response = await customFetch(`/copilot/api/teams/historic`);
+    const params = new URLSearchParams();
+    if (teams?.length) params.set('teams', teams.join(','));
+    if (since) params.set('since', since);
+    if (until) params.set('until', until);
+    const query = params.toString();
+
+    const response = await customFetch(
+      `/copilot/api/teams/historic${query ? `?${query}` : ''}`
+    );
     if (!response.ok) {
       return null;
     }
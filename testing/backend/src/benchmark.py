@@ -0,0 +1,288 @@
+"""
+Per-endpoint latency benchmarks with a regression gate, for ``test_benchmark.py``.
+
+Each scenario from ``scenarios.py`` is timed on its own: a few warm-up requests
+(which also fill the backend's caches), then a number of sequential samples
+over a kept-alive connection. The samples are compared with a baseline stored
+as JSON under ``testing/backend/benchmarks/``, one file per dataset, so that
+timings taken against different data volumes are never compared.
+
+A scenario has regressed when both:
+    - its p95 is more than the threshold (20% by default) above the
+      baseline p95, and at least MIN_DELTA_MS slower, and
+    - a one-sided Mann-Whitney U test says its samples are slower than the
+      baseline samples (p below alpha, 0.01 by default)
+
+The second condition keeps a single unlucky sample from failing the run.
+
+When the backend sends Server-Timing headers, each result also carries the
+per-stage breakdown, so a regression report shows where the time went.
+"""
+
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from load_harness import AsyncHttpClient, parse_server_timing, percentile, summarise_stages
+
+BASELINE_VERSION = 1
+BASELINE_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+
+# Differences smaller than this are timer noise, whatever their relative size
+MIN_DELTA_MS = 1.0
+
+
+async def sample_scenario(client, scenario, samples, warmup):
+    """Time one scenario.
+
+    Args:
+        client (AsyncHttpClient): Client connected to the backend.
+        scenario (dict): The scenario, from scenarios.py.
+        samples (int): Number of timed requests.
+        warmup (int): Number of untimed requests made first.
+
+    Returns:
+        dict: Latencies in milliseconds, response sizes in bytes, status codes
+        and parsed Server-Timing headers.
+    """
+    latencies, sizes, statuses, server_timings = [], [], [], []
+    for i in range(warmup + samples):
+        start = time.perf_counter()
+        status, headers, size = await client.request(
+            scenario["method"], scenario["path"], scenario["params"], scenario["json"],
+            scenario["auth"])
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            latencies.append(elapsed)
+            sizes.append(size)
+            statuses.append(status)
+            server_timings.append(parse_server_timing(headers.get("server-timing")))
+    return {"latencies": latencies, "sizes": sizes, "statuses": statuses,
+            "server_timings": server_timings}
+
+
+def measure(base_url, scenario, samples=30, warmup=5, timeout=30.0, cookies=None):
+    """Time one scenario against the backend (see sample_scenario)."""
+    async def run():
+        client = AsyncHttpClient(base_url, timeout=timeout, cookies=cookies)
+        try:
+            return await sample_scenario(client, scenario, samples, warmup)
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def summarise(scenario, result):
+    """Summarise a scenario's samples for the report and the baseline."""
+    latencies = result["latencies"]
+    return {
+        "method": scenario["method"],
+        "path": scenario["path"],
+        "samples": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "payload_bytes": sorted(result["sizes"])[len(result["sizes"]) // 2],
+        "stages": summarise_stages(result.get("server_timings", [])),
+        "latencies_ms": [round(value, 3) for value in latencies],
+    }
+
+
+def mann_whitney_p(baseline, current):
+    """One-sided p-value that `current` tends to be larger than `baseline`.
+
+    Uses the normal approximation to the Mann-Whitney U statistic, with a tie
+    correction and continuity correction, which is accurate from about ten
+    samples per side.
+    """
+    n1, n2 = len(baseline), len(current)
+    values = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+
+    # Average ranks over ties
+    ranks, ties, i = [0.0] * len(values), 0, 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    u = sum(rank for rank, (_, group) in zip(ranks, values) if group == 1) - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline, current, threshold=0.2, alpha=0.01):
+    """Compare a scenario's summary with its baseline.
+
+    Args:
+        baseline (dict): The baseline summary, or None.
+        current (dict): The new summary.
+        threshold (float): Allowed relative increase in p95.
+        alpha (float): Significance level for the Mann-Whitney U test.
+
+    Returns:
+        dict: The comparison, with ``regressed`` set when the gate fails, or
+        None when there is no baseline.
+    """
+    if not baseline:
+        return None
+    change = current["p95_ms"] / baseline["p95_ms"] - 1 if baseline["p95_ms"] else 0.0
+    p_value = mann_whitney_p(baseline["latencies_ms"], current["latencies_ms"])
+    return {
+        "baseline_p95_ms": baseline["p95_ms"],
+        "p95_ms": current["p95_ms"],
+        "change": change,
+        "p_value": p_value,
+        "regressed": change > threshold
+        and current["p95_ms"] - baseline["p95_ms"] >= MIN_DELTA_MS
+        and p_value < alpha,
+    }
+
+
+def dataset_label(local_s3, scale=0, seed=0):
+    """Name of the dataset a run is measured against, used for its baseline file."""
+    if not local_s3:
+        return "remote"
+    return f"scale-{scale}-seed-{seed}" if scale else "seed"
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=BASELINE_DIR.parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkSession:
+    """Collects the timings of one benchmark run and checks them against the baseline.
+
+    Args:
+        base_url (str): Base URL of the backend.
+        dataset (dict): ``name`` (see dataset_label), plus ``repositories``
+            and ``bytes`` when known.
+        baseline_path (Path): Baseline file to compare with and save to.
+        samples (int): Timed requests per scenario.
+        warmup (int): Untimed requests per scenario.
+        threshold (float): Allowed relative increase in p95.
+        alpha (float): Significance level for the comparison.
+        cookies (dict): Cookies for scenarios that need authentication.
+
+    Raises:
+        ValueError: If the baseline file has a different format version.
+    """
+
+    def __init__(self, base_url, dataset, baseline_path, samples=30, warmup=5,
+                 threshold=0.2, alpha=0.01, cookies=None):
+        self.base_url = base_url
+        self.dataset = dataset
+        self.baseline_path = Path(baseline_path)
+        self.samples = samples
+        self.warmup = warmup
+        self.threshold = threshold
+        self.alpha = alpha
+        self.cookies = cookies
+        self.baseline = self.load_baseline()
+        self.results = {}
+        self.comparisons = {}
+
+    def load_baseline(self):
+        """Read the baseline file, or return None if there is none yet."""
+        if not self.baseline_path.exists():
+            return None
+        baseline = json.loads(self.baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("version") != BASELINE_VERSION:
+            raise ValueError(f"{self.baseline_path} has format version "
+                             f"{baseline.get('version')}, expected {BASELINE_VERSION}; "
+                             "record a new baseline with --benchmark-save")
+        return baseline
+
+    def run(self, scenario):
+        """Time a scenario and compare it with the baseline.
+
+        Returns:
+            tuple: The summary, the raw result and the comparison (None
+            without a baseline entry for the scenario).
+        """
+        result = measure(self.base_url, scenario, self.samples, self.warmup,
+                         cookies=self.cookies)
+        summary = summarise(scenario, result)
+        self.results[scenario["name"]] = summary
+        baseline = (self.baseline or {}).get("endpoints", {}).get(scenario["name"])
+        comparison = compare(baseline, summary, self.threshold, self.alpha)
+        self.comparisons[scenario["name"]] = comparison
+        return summary, result, comparison
+
+    def describe(self, name):
+        """One-line description of a scenario's result, naming the endpoint,
+        dataset and payload size."""
+        summary, comparison = self.results[name], self.comparisons.get(name)
+        dataset = self.dataset["name"]
+        if self.dataset.get("repositories"):
+            dataset += f" ({self.dataset['repositories']:,} repositories)"
+        if self.dataset.get("bytes"):
+            dataset += f", {self.dataset['bytes']:,} bytes"
+        line = (f"{summary['method']} {summary['path']} [{name}]: "
+                f"p95 {summary['p95_ms']:.1f}ms")
+        if comparison:
+            line += (f" vs baseline {comparison['baseline_p95_ms']:.1f}ms "
+                     f"({comparison['change']:+.0%}, threshold {self.threshold:.0%}, "
+                     f"p={comparison['p_value']:.4f})")
+        return f"{line}; payload {summary['payload_bytes']:,} bytes; dataset {dataset}"
+
+    def save(self):
+        """Write the results as the new baseline."""
+        self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {
+            "version": BASELINE_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "dataset": self.dataset,
+            "samples": self.samples,
+            "warmup": self.warmup,
+            "endpoints": {
+                **(self.baseline or {}).get("endpoints", {}),
+                **self.results,
+            },
+        }
+        self.baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+    def report(self):
+        """Lines summarising the run, regressions first."""
+        names = sorted(self.results, key=lambda name: not (self.comparisons.get(name) or {})
+                       .get("regressed"))
+        lines = []
+        for name in names:
+            comparison = self.comparisons.get(name)
+            if comparison is None:
+                marker = "new"
+            else:
+                marker = "REGRESSED" if comparison["regressed"] else "ok"
+            lines.append(f"{marker:<10}{self.describe(name)}")
+            stages = format_stage_breakdown(self.results[name].get("stages"))
+            if stages:
+                lines.append(f"{'':<10}stages: {stages}")
+        return lines
+
+
+def format_stage_breakdown(stages, limit=5):
+    """The slowest Server-Timing stages of a result by p95, e.g. "s3_get 12.1ms, query 0.4ms"."""
+    ordered = sorted(((name, stage) for name, stage in (stages or {}).items()
+                      if name != "total"), key=lambda item: -item[1]["p95_ms"])
+    return ", ".join(f"{name} {stage['p95_ms']:.1f}ms" for name, stage in ordered[:limit])
@@ -0,0 +1,261 @@
+"""
+Shared pytest configuration for the backend tests.
+
+By default the tests expect a backend already running on localhost:5001 and
+wired to AWS. With ``--local-s3`` (or ``LOCAL_S3=1``) the suite runs fully
+offline instead: a session-wide LocalS3Server is seeded with the bucket layout
+the backend expects (see ``seed_data.py``), and the backend is started on
+localhost:5001 with ``S3_ENDPOINT`` pointed at it.
+
+Add ``--local-s3-scale N`` (or ``LOCAL_S3_SCALE=N``) to seed the stand-in with
+a generated dataset of N repositories instead (see ``synthetic_data.py``),
+for running the suite and the benchmarks against realistic data volumes.
+
+The ``run_node_script`` fixture runs a Node.js script with the backend's
+modules against a LocalS3Server, for tests that do not need the whole backend.
+
+``--benchmark`` runs the latency benchmarks in ``test_benchmark.py`` and
+compares them with the stored baseline for the dataset (see ``benchmark.py``).
+"""
+
+import json
+import os
+import socket
+import subprocess
+import time
+
+import pytest
+import requests
+
+from benchmark import BASELINE_DIR, BenchmarkSession, dataset_label
+from local_s3 import BACKEND_DIR, LocalS3Server, backend_available
+from seed_data import BUCKETS, seed
+from synthetic_data import SyntheticDataset, load_dataset
+
+BACKEND_PORT = 5001
+BACKEND_URL = f"http://localhost:{BACKEND_PORT}"
+BACKEND_START_TIMEOUT = 30
+
+
+def pytest_addoption(parser):
+    """Add the --local-s3 options."""
+    parser.addoption(
+        "--local-s3", action="store_true", default=os.environ.get("LOCAL_S3") == "1",
+        help="serve the backend's buckets from a local S3 stand-in and start the "
+             "backend against it (needs Node.js and the backend dependencies)")
+    parser.addoption(
+        "--local-s3-scale", type=int, default=int(os.environ.get("LOCAL_S3_SCALE", "0")),
+        help="with --local-s3, seed a generated dataset of this many repositories")
+    parser.addoption(
+        "--local-s3-seed", type=int, default=int(os.environ.get("LOCAL_S3_SEED", "0")),
+        help="random seed for the generated dataset")
+
+    group = parser.getgroup("benchmark", "endpoint latency benchmarks")
+    group.addoption("--benchmark", action="store_true",
+                    help="run the endpoint latency benchmarks and compare them with the baseline")
+    group.addoption("--benchmark-samples", type=int, default=30,
+                    help="timed requests per endpoint")
+    group.addoption("--benchmark-warmup", type=int, default=5,
+                    help="untimed requests per endpoint before the samples")
+    group.addoption("--benchmark-threshold", type=float, default=0.2,
+                    help="allowed relative increase in p95 before a run fails")
+    group.addoption("--benchmark-alpha", type=float, default=0.01,
+                    help="significance level for the comparison with the baseline")
+    group.addoption("--benchmark-baseline", default=None,
+                    help="baseline file (default: benchmarks/<dataset>.json)")
+    group.addoption("--benchmark-save", action="store_true",
+                    help="save the results as the new baseline instead of failing on "
+                         "regressions")
+
+
+def port_in_use(port):
+    """Whether something is already listening on a local port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def local_s3_env(endpoint, **overrides):
+    """Build the environment for a backend process that uses a local S3 endpoint.
+
+    Args:
+        endpoint (str): Base URL of the LocalS3Server.
+        **overrides: Further environment variables, e.g. bucket names.
+
+    Returns:
+        dict: The environment.
+    """
+    env = {
+        **os.environ,
+        "S3_ENDPOINT": endpoint,
+        "AWS_ACCESS_KEY_ID": "local",
+        "AWS_SECRET_ACCESS_KEY": "local",
+        **overrides,
+    }
+    env.pop("AWS_REGION", None)
+    return env
+
+
+def run_node_script(script, endpoint, env_overrides=None, timeout=60):
+    """Run a Node.js script in the backend directory against a local S3 endpoint.
+
+    The script reports its result by printing a line starting with ``RESULT ``
+    followed by JSON.
+
+    Args:
+        script (str): JavaScript source, run with ``node -e``.
+        endpoint (str): Base URL of the LocalS3Server.
+        env_overrides (dict): Further environment variables for the script.
+        timeout (float): Seconds to wait for the script to finish.
+
+    Returns:
+        object: The JSON the script printed after ``RESULT``.
+    """
+    env = local_s3_env(endpoint, LOG_LEVEL="error", **(env_overrides or {}))
+    result = subprocess.run(
+        ["node", "-e", script], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=timeout, check=False)
+    assert result.returncode == 0, result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+@pytest.fixture(name="run_node_script")
+def fixture_run_node_script():
+    """Run a Node.js script against a local S3 stand-in (see run_node_script)."""
+    return run_node_script
+
+
+def start_backend(endpoint, log_path):
+    """Start the backend against a local S3 endpoint and wait until it is healthy.
+
+    Args:
+        endpoint (str): Base URL of the LocalS3Server.
+        log_path (Path): File the backend's output is written to.
+
+    Returns:
+        subprocess.Popen: The backend process.
+    """
+    env = local_s3_env(
+        endpoint,
+        PORT=str(BACKEND_PORT),
+        NODE_ENV="development",
+        BUCKET_NAME=BUCKETS["main"],
+        TAT_BUCKET_NAME=BUCKETS["tat"],
+        COPILOT_BUCKET_NAME=BUCKETS["copilot"],
+        METRICS_ENABLED="true",
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "warn"),
+    )
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        backend = subprocess.Popen(  # pylint: disable=consider-using-with
+            ["node", "src/index.js"], cwd=BACKEND_DIR, env=env,
+            stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + BACKEND_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if backend.poll() is not None:
+            pytest.exit(f"Backend exited during startup, see {log_path}", returncode=4)
+        try:
+            if requests.get(f"{BACKEND_URL}/api/health", timeout=1).status_code == 200:
+                return backend
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+
+    backend.terminate()
+    pytest.exit(f"Backend did not become healthy, see {log_path}", returncode=4)
+    return None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_s3_backend(request, tmp_path_factory):
+    """Run the session against a seeded local S3 stand-in when --local-s3 is given.
+
+    Yields:
+        LocalS3Server: The stand-in, or None when the tests run against a
+        backend that is already running.
+    """
+    if not request.config.getoption("--local-s3"):
+        yield None
+        return
+
+    if not backend_available():
+        pytest.exit("--local-s3 needs Node.js and the backend dependencies "
+                    "(npm install in /backend)", returncode=4)
+    if port_in_use(BACKEND_PORT):
+        pytest.exit(f"--local-s3 starts its own backend, but port {BACKEND_PORT} "
+                    "is already in use", returncode=4)
+
+    server = LocalS3Server().start()
+    backend = None
+    try:
+        scale = request.config.getoption("--local-s3-scale")
+        if scale:
+            dataset_dir = tmp_path_factory.mktemp("dataset")
+            SyntheticDataset(scale, request.config.getoption("--local-s3-seed")) \
+                .write(dataset_dir)
+            load_dataset(server, dataset_dir)
+        else:
+            seed(server)
+        backend = start_backend(server.endpoint, tmp_path_factory.mktemp("backend") / "backend.log")
+        yield server
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+        server.stop()
+
+
+def dataset_info(config, server):
+    """Describe the dataset the backend is serving, for benchmark reports."""
+    local_s3 = config.getoption("--local-s3")
+    scale = config.getoption("--local-s3-scale")
+    dataset = {"name": dataset_label(local_s3, scale, config.getoption("--local-s3-seed"))}
+    if server is not None:
+        dataset["bytes"] = sum(len(data) for data, _ in server.objects.values())
+        dataset["repositories"] = scale or len(
+            server.get_object(BUCKETS["main"], "repositories.json")["repositories"])
+    return dataset
+
+
+@pytest.fixture(scope="session")
+def benchmark_session(request, local_s3_backend):
+    """The benchmark run, or None unless --benchmark is given.
+
+    With --benchmark-save the results are written as the new baseline when the
+    session ends.
+    """
+    config = request.config
+    if not config.getoption("--benchmark"):
+        yield None
+        return
+
+    dataset = dataset_info(config, local_s3_backend)
+    token = os.environ.get("TEST_GITHUBUSERTOKEN")
+    session = BenchmarkSession(
+        BACKEND_URL, dataset,
+        config.getoption("--benchmark-baseline") or BASELINE_DIR / f"{dataset['name']}.json",
+        samples=config.getoption("--benchmark-samples"),
+        warmup=config.getoption("--benchmark-warmup"),
+        threshold=config.getoption("--benchmark-threshold"),
+        alpha=config.getoption("--benchmark-alpha"),
+        cookies={"githubUserToken": token} if token else None)
+    config.benchmark_session = session
+    yield session
+    if config.getoption("--benchmark-save") and session.results:
+        session.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Print every benchmark result, regressions first."""
+    session = getattr(config, "benchmark_session", None)
+    if session is None or not session.results:
+        return
+    terminalreporter.section("endpoint latency benchmarks")
+    for line in session.report():
+        terminalreporter.write_line(line)
+    if config.getoption("--benchmark-save"):
+        terminalreporter.write_line(f"Baseline saved to {session.baseline_path}")
+    elif session.baseline is None:
+        terminalreporter.write_line(f"No baseline at {session.baseline_path}; record one "
+                                    "with --benchmark-save")
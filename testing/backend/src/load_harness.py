@@ -0,0 +1,527 @@
+"""
+Asyncio load generator for the backend API, driven by the scenarios in ``scenarios.py``.
+
+Two modes are supported:
+    - closed: a fixed number of virtual users, each sending its next request
+      when the previous one has finished (plus an optional think time)
+    - open: requests arrive at a fixed average rate whether or not earlier
+      ones have finished, as independent clients would. Latency is measured
+      from each request's scheduled arrival, so a backlog in the harness
+      counts against the backend rather than hiding it.
+
+For each scenario the harness reports throughput, p50/p95/p99 latency, the
+error rate and the rate of 429 responses, as a console table and optionally
+as JSON. When the backend sends a Server-Timing header, the report also
+breaks the latency down by stage (S3 and GitHub calls, index lookups,
+serialisation).
+
+Usage:
+    python3 src/load_harness.py --mode closed --concurrency 20 --duration 30
+    python3 src/load_harness.py --mode open --rate 100 --scenarios json,csv --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import ssl
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from scenarios import SCENARIOS, select_scenarios
+
+DEFAULT_BASE_URL = "http://localhost:5001"
+
+
+class EmptyResponse(ConnectionError):
+    """The server closed the connection without sending a response."""
+
+
+class AsyncHttpClient:
+    """Minimal HTTP/1.1 client on asyncio streams.
+
+    Connections are kept alive and reused between requests, as a browser or
+    load balancer would, so that the measurements are not dominated by TCP
+    setup.
+
+    Args:
+        base_url (str): Base URL of the backend, e.g. http://localhost:5001.
+        timeout (float): Time allowed for each request, in seconds.
+        cookies (dict): Cookies sent with requests that need authentication.
+    """
+
+    def __init__(self, base_url, timeout=10.0, cookies=None):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.cookies = cookies or {}
+        self.idle = []
+
+    async def request(self, method, path, params=None, json_body=None, auth=False):
+        """Send a request and read the whole response.
+
+        Returns:
+            tuple: The status code, the response headers (lowercase names) and
+            the number of body bytes received.
+        """
+        target = self.prefix + path
+        if params:
+            target += "?" + urlencode(params, doseq=True)
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json",
+            "Accept-Encoding: gzip, deflate",
+            "Connection: keep-alive",
+        ]
+        if json_body is not None:
+            lines.append("Content-Type: application/json")
+        if body or method not in ("GET", "HEAD"):
+            lines.append(f"Content-Length: {len(body)}")
+        if auth and self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        return await asyncio.wait_for(self._send(method, message), self.timeout)
+
+    async def _send(self, method, message):
+        """Send a request on an idle connection, or a new one if none is free.
+
+        A request on a reused connection that the server has since closed is
+        retried once on a new connection.
+        """
+        while self.idle:
+            reader, writer = self.idle.pop()
+            try:
+                return await self._exchange(reader, writer, method, message)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+            except BaseException:
+                writer.close()
+                raise
+
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        try:
+            return await self._exchange(reader, writer, method, message)
+        except BaseException:
+            writer.close()
+            raise
+
+    async def _exchange(self, reader, writer, method, message):
+        """Write a request and read its response from an open connection."""
+        writer.write(message)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise EmptyResponse()
+        status = int(status_line.split(b" ", 2)[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+        size = 0
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            pass
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                chunk_size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if chunk_size == 0:
+                    # Skip any trailers up to the blank line ending the message
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                size += len(await reader.readexactly(chunk_size + 2)) - 2
+        elif "content-length" in headers:
+            size = len(await reader.readexactly(int(headers["content-length"])))
+        else:
+            size = len(await reader.read())
+            keep_alive = False
+
+        if keep_alive:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, headers, size
+
+    async def close(self):
+        """Close all idle connections."""
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+
+
+def parse_server_timing(header):
+    """Parse a Server-Timing header into durations in milliseconds by metric name.
+
+    Metrics without a duration, and malformed ones, are left out.
+    """
+    timings = {}
+    for metric in (header or "").split(","):
+        name, *params = [part.strip() for part in metric.split(";")]
+        for param in params:
+            key, _, value = param.partition("=")
+            if name and key.strip() == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def summarise_stages(samples):
+    """Mean and p95 of each Server-Timing stage over a list of parsed headers."""
+    stages = {}
+    for timings in samples:
+        for name, duration in timings.items():
+            stages.setdefault(name, []).append(duration)
+    return {
+        name: {
+            "mean_ms": round(sum(values) / len(values), 2),
+            "p95_ms": round(percentile(sorted(values), 95), 2),
+            "requests": len(values),
+        }
+        for name, values in stages.items()
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sorted list, or None if it is empty."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+class ScenarioStats:
+    """Results collected for one scenario."""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.server_timings = []
+
+    def record(self, latency, status=None, size=0, server_timing=None):
+        """Record a completed request; a status of None means it raised an error."""
+        self.latencies.append(latency)
+        if server_timing:
+            self.server_timings.append(server_timing)
+        self.statuses[str(status) if status is not None else "error"] += 1
+        self.bytes += size
+        if status not in self.scenario["expect"]:
+            self.errors += 1
+
+    def summary(self, duration):
+        """Summarise the results over a measurement window of `duration` seconds."""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def milliseconds(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "scenario": self.scenario["name"],
+            "method": self.scenario["method"],
+            "path": self.scenario["path"],
+            "requests": count,
+            "throughput_rps": round(count / duration, 2) if duration else 0,
+            "latency_ms": {
+                "mean": milliseconds(sum(latencies) / count if count else None),
+                "p50": milliseconds(percentile(latencies, 50)),
+                "p95": milliseconds(percentile(latencies, 95)),
+                "p99": milliseconds(percentile(latencies, 99)),
+                "max": milliseconds(latencies[-1] if latencies else None),
+            },
+            "error_rate": round(self.errors / count, 4) if count else 0,
+            "rate_429": round(self.statuses["429"] / count, 4) if count else 0,
+            "mean_bytes": round(self.bytes / count) if count else 0,
+            "statuses": dict(self.statuses),
+            "dropped": self.dropped,
+            "server_timing": summarise_stages(self.server_timings),
+        }
+
+
+class LoadRun:
+    """One load run: the client, the scenario mix and the collected results.
+
+    Args:
+        client (AsyncHttpClient): Client to send the requests with.
+        scenarios (list): Scenarios to mix, chosen at random by weight.
+        duration (float): Length of the measurement window, in seconds.
+        warmup (float): Time before the measurement window whose requests are
+            sent but not recorded, in seconds.
+        seed (int): Seed for the scenario choice and arrival times.
+    """
+
+    def __init__(self, client, scenarios, duration, warmup=0.0, seed=None):
+        self.client = client
+        self.scenarios = scenarios
+        self.weights = [item["weight"] for item in scenarios]
+        self.duration = duration
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.stats = {item["name"]: ScenarioStats(item) for item in scenarios}
+        self.loop = asyncio.get_running_loop()
+        self.measure_from = self.loop.time() + warmup
+        self.deadline = self.measure_from + duration
+
+    def choose(self):
+        """Pick the next scenario."""
+        return self.rng.choices(self.scenarios, weights=self.weights)[0]
+
+    async def send(self, scenario, start):
+        """Send one request and record it if it started within the measurement window."""
+        try:
+            status, headers, size = await self.client.request(
+                scenario["method"], scenario["path"], scenario["params"],
+                scenario["json"], scenario["auth"])
+        except (OSError, EOFError, asyncio.TimeoutError, ValueError):
+            status, headers, size = None, {}, 0
+        if start >= self.measure_from:
+            self.stats[scenario["name"]].record(
+                self.loop.time() - start, status, size,
+                parse_server_timing(headers.get("server-timing")))
+
+    async def closed_loop(self, concurrency, think_time=0.0):
+        """Run `concurrency` virtual users until the deadline."""
+        async def user():
+            while self.loop.time() < self.deadline:
+                await self.send(self.choose(), self.loop.time())
+                if think_time:
+                    await asyncio.sleep(self.rng.expovariate(1 / think_time))
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    async def open_loop(self, rate, arrival="poisson", max_in_flight=1000):
+        """Start requests at an average of `rate` per second until the deadline.
+
+        Arrivals beyond `max_in_flight` outstanding requests are counted as
+        dropped rather than sent, so that an overloaded backend cannot make the
+        harness itself run out of memory or sockets.
+        """
+        in_flight = set()
+        scheduled = self.loop.time()
+        while scheduled < self.deadline:
+            await asyncio.sleep(max(0.0, scheduled - self.loop.time()))
+            scenario = self.choose()
+            if len(in_flight) >= max_in_flight:
+                if scheduled >= self.measure_from:
+                    self.stats[scenario["name"]].dropped += 1
+            else:
+                task = asyncio.create_task(self.send(scenario, scheduled))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            scheduled += self.rng.expovariate(rate) if arrival == "poisson" else 1 / rate
+
+        await asyncio.gather(*in_flight)
+
+    def report(self, config):
+        """Build the JSON report for the run."""
+        endpoints = [stats.summary(self.duration) for stats in self.stats.values()]
+        total = ScenarioStats({"name": "total", "method": "", "path": "", "expect": ()})
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+            total.errors += stats.errors
+            total.bytes += stats.bytes
+            total.dropped += stats.dropped
+            total.server_timings.extend(stats.server_timings)
+        return {
+            "config": config,
+            "endpoints": endpoints,
+            "total": total.summary(self.duration),
+        }
+
+
+async def run_load(base_url=DEFAULT_BASE_URL, scenarios=None, mode="closed", concurrency=10,
+                   rate=20.0, arrival="poisson", duration=30.0, warmup=5.0, think_time=0.0,
+                   max_in_flight=1000, timeout=10.0, seed=None, cookies=None):
+    """Run the scenarios against the backend and return the report.
+
+    Args:
+        base_url (str): Base URL of the backend.
+        scenarios (list): Scenarios to run (all of them by default).
+        mode (str): "closed" or "open".
+        concurrency (int): Number of virtual users in closed-loop mode.
+        rate (float): Average arrivals per second in open-loop mode.
+        arrival (str): "poisson" or "constant" arrival times in open-loop mode.
+        duration (float): Length of the measurement window, in seconds.
+        warmup (float): Warm-up time before the measurement window, in seconds.
+        think_time (float): Mean pause between a virtual user's requests, in seconds.
+        max_in_flight (int): Cap on outstanding requests in open-loop mode.
+        timeout (float): Time allowed for each request, in seconds.
+        seed (int): Seed for the scenario mix and arrival times.
+        cookies (dict): Cookies for scenarios that need authentication.
+
+    Returns:
+        dict: The report, with per-endpoint and total results.
+    """
+    scenarios = scenarios if scenarios is not None else SCENARIOS
+    if not scenarios:
+        raise ValueError("No scenarios to run")
+    if mode not in ("closed", "open"):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    client = AsyncHttpClient(base_url, timeout=timeout, cookies=cookies)
+    run = LoadRun(client, scenarios, duration, warmup=warmup, seed=seed)
+    started = time.time()
+    try:
+        if mode == "closed":
+            await run.closed_loop(concurrency, think_time)
+        else:
+            await run.open_loop(rate, arrival, max_in_flight)
+    finally:
+        await client.close()
+
+    return run.report({
+        "base_url": base_url,
+        "mode": mode,
+        "concurrency": concurrency if mode == "closed" else None,
+        "rate": rate if mode == "open" else None,
+        "arrival": arrival if mode == "open" else None,
+        "duration": duration,
+        "warmup": warmup,
+        "seed": seed,
+        "started": started,
+        "scenarios": [item["name"] for item in scenarios],
+    })
+
+
+def format_table(report):
+    """Format a report as a console table."""
+    columns = ["scenario", "requests", "rps", "p50 ms", "p95 ms", "p99 ms",
+               "errors", "429s", "bytes"]
+    rows = []
+    for result in report["endpoints"] + [report["total"]]:
+        latency = result["latency_ms"]
+        rows.append([
+            result["scenario"],
+            str(result["requests"]),
+            f"{result['throughput_rps']:.1f}",
+            *(f"{latency[p]:.1f}" if latency[p] is not None else "-"
+              for p in ("p50", "p95", "p99")),
+            f"{result['error_rate']:.1%}",
+            f"{result['rate_429']:.1%}",
+            str(result["mean_bytes"]),
+        ])
+
+    widths = [max(len(row[i]) for row in [columns] + rows) for i in range(len(columns))]
+
+    def line(row):
+        return "  ".join(
+            value.ljust(width) if i == 0 else value.rjust(width)
+            for i, (value, width) in enumerate(zip(row, widths)))
+
+    separator = "  ".join("-" * width for width in widths)
+    return "\n".join([line(columns), separator, *map(line, rows[:-1]), separator, line(rows[-1])])
+
+
+def format_stages(report):
+    """Format the Server-Timing breakdown of a report, or "" if the backend sent none.
+
+    Stages are listed slowest first; repeated stages (several S3 reads in one
+    request) are already summed by the backend.
+    """
+    lines = []
+    for result in report["endpoints"]:
+        stages = result.get("server_timing") or {}
+        if not stages:
+            continue
+        ordered = sorted(((name, stage) for name, stage in stages.items() if name != "total"),
+                         key=lambda item: -item[1]["mean_ms"])
+        total = stages.get("total")
+        header = f"{result['scenario']}"
+        if total:
+            header += f" (server total mean {total['mean_ms']:.1f} ms, p95 {total['p95_ms']:.1f} ms)"
+        lines.append(header)
+        lines.extend(f"  {name:<16}mean {stage['mean_ms']:>8.1f} ms   p95 {stage['p95_ms']:>8.1f} ms"
+                     f"   in {stage['requests']} requests"
+                     for name, stage in ordered)
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0].strip())
+    parser.add_argument("--base-url", default=os.environ.get("BASE_URL", DEFAULT_BASE_URL))
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="virtual users in closed-loop mode")
+    parser.add_argument("--rate", type=float, default=20.0,
+                        help="average requests per second in open-loop mode")
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds not measured")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean seconds between a virtual user's requests")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scenarios", help="comma-separated scenario names (default: all)")
+    parser.add_argument("--exclude", help="comma-separated scenario names to leave out")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the load harness from the command line."""
+    args = parse_args(argv)
+
+    if args.list:
+        for item in SCENARIOS:
+            auth = " (auth)" if item["auth"] else ""
+            print(f"{item['name']:<24}{item['method']:<6}{item['path']}{auth}  <- {item['source']}")
+        return 0
+
+    token = os.environ.get("TEST_GITHUBUSERTOKEN")
+    try:
+        scenarios = select_scenarios(
+            args.scenarios.split(",") if args.scenarios else None,
+            args.exclude.split(",") if args.exclude else None,
+            authenticated=bool(token))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    report = asyncio.run(run_load(
+        base_url=args.base_url, scenarios=scenarios, mode=args.mode,
+        concurrency=args.concurrency, rate=args.rate, arrival=args.arrival,
+        duration=args.duration, warmup=args.warmup, think_time=args.think_time,
+        max_in_flight=args.max_in_flight, timeout=args.timeout, seed=args.seed,
+        cookies={"githubUserToken": token} if token else None))
+
+    print(format_table(report))
+    stages = format_stages(report)
+    if stages:
+        print("\nServer-Timing breakdown\n" + stages)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+A minimal, in-process S3-compatible stand-in used by the backend tests and benchmarks.
+
+The server understands path-style requests (``/<bucket>/<key>``) as sent by the
+AWS SDK when ``forcePathStyle`` is enabled, including presigned URLs. Query string
+signatures are accepted without verification.
+
+Supported operations:
+    - GET / HEAD object, honouring ``If-None-Match`` (304)
+    - PUT object, honouring ``If-Match`` and ``If-None-Match: *`` (412)
+    - GET /_stats for per-object request counters
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+BACKEND_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend"))
+
+
+def backend_available():
+    """Whether Node.js and the backend dependencies are installed."""
+    return shutil.which("node") is not None and os.path.isdir(
+        os.path.join(BACKEND_DIR, "node_modules", "@aws-sdk", "client-s3"))
+
+
+def _error_body(code, message):
+    """Build an S3-style XML error document."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Error><Code>{code}</Code><Message>{message}</Message></Error>"
+    ).encode()
+
+
+class LocalS3Server:
+    """Threaded HTTP server holding objects in memory.
+
+    Args:
+        latency (float): Artificial delay, in seconds, added to every object GET
+            that returns a body. Used to approximate a network round trip.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def endpoint(self):
+        """Base URL of the running server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving on a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut down the server and wait for the thread to finish."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def put_object(self, bucket, key, data):
+        """Store an object, serialising dicts and lists as JSON.
+
+        Returns:
+            str: The quoted ETag of the stored object.
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = json.dumps(data).encode()
+        etag = f'"{hashlib.md5(data).hexdigest()}"'  # nosec - S3 ETag semantics
+        with self.lock:
+            self.objects[(bucket, key)] = (bytes(data), etag)
+        return etag
+
+    def get_object(self, bucket, key):
+        """Return the parsed JSON body of a stored object, or None."""
+        with self.lock:
+            stored = self.objects.get((bucket, key))
+        return json.loads(stored[0]) if stored else None
+
+    def request_count(self, method, bucket, key):
+        """Number of requests received for an object and method."""
+        with self.lock:
+            return self.requests[f"{method} {bucket}/{key}"]
+
+    def reset_counts(self):
+        """Clear the request counters."""
+        with self.lock:
+            self.requests.clear()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler bound to the enclosing LocalS3Server."""
+
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+            def _target(self):
+                path = unquote(urlparse(self.path).path).lstrip("/")
+                bucket, _, key = path.partition("/")
+                return bucket, key
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _count(self, bucket, key):
+                with server.lock:
+                    server.requests[f"{self.command} {bucket}/{key}"] += 1
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Serve an object or the request counters."""
+                if urlparse(self.path).path == "/_stats":
+                    with server.lock:
+                        body = json.dumps(dict(server.requests)).encode()
+                    self._send(200, body, {"Content-Type": "application/json"})
+                    return
+
+                bucket, key = self._target()
+                self._count(bucket, key)
+                with server.lock:
+                    stored = server.objects.get((bucket, key))
+
+                if stored is None:
+                    self._send(404, _error_body("NoSuchKey", "Not Found"),
+                               {"Content-Type": "application/xml"})
+                    return
+
+                data, etag = stored
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, headers={"ETag": etag})
+                    return
+
+                if server.latency:
+                    time.sleep(server.latency)
+                self._send(200, data, {
+                    "Content-Type": "application/json",
+                    "ETag": etag,
+                })
+
+            def do_HEAD(self):  # pylint: disable=invalid-name
+                """Serve object headers only."""
+                self.do_GET()
+
+            def do_PUT(self):  # pylint: disable=invalid-name
+                """Store an object, honouring conditional headers."""
+                bucket, key = self._target()
+                self._count(bucket, key)
+                length = int(self.headers.get("Content-Length") or 0)
+                data = self.rfile.read(length)
+
+                with server.lock:
+                    current = server.objects.get((bucket, key))
+                    if_match = self.headers.get("If-Match")
+                    if_none_match = self.headers.get("If-None-Match")
+                    conflict = (if_match and (current is None or current[1] != if_match)) or (
+                        if_none_match == "*" and current is not None
+                    )
+                    if not conflict:
+                        etag = f'"{hashlib.md5(data).hexdigest()}"'  # nosec - S3 ETag semantics
+                        server.objects[(bucket, key)] = (data, etag)
+
+                if conflict:
+                    self._send(
+                        412,
+                        _error_body("PreconditionFailed",
+                                    "At least one of the pre-conditions you specified did not hold"),
+                        {"Content-Type": "application/xml"},
+                    )
+                    return
+
+                self._send(200, headers={"ETag": etag})
+
+        return Handler
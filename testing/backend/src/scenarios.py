@@ -0,0 +1,111 @@
+"""
+Endpoint scenarios for load generation, taken from the API test suite.
+
+Each scenario is one request made by a test in this directory, named after
+the endpoint it exercises and recording the test it comes from. Only read-only
+requests are included, so that the scenarios can be replayed at any rate
+without changing the data the tests rely on.
+
+Scenario keys:
+    - name (str): Short name used on the command line and in reports
+    - method (str): HTTP method
+    - path (str): Path relative to the backend base URL
+    - params (dict): Query string parameters
+    - json (object): JSON request body, for POST scenarios
+    - expect (tuple): Status codes that count as a success
+    - auth (bool): Whether the request needs ``TEST_GITHUBUSERTOKEN``
+    - weight (int): Relative frequency when scenarios are mixed
+    - source (str): The test the request is taken from
+"""
+
+from datetime import datetime, timedelta, timezone
+
+SEVEN_DAYS_AGO = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+
+BULK_IDENTIFIERS = [
+    f"user{i}" if i % 2 else f"first{i}.last{i}@ons.gov.uk" for i in range(20000)
+]
+
+
+def scenario(name, path, source, method="GET", params=None, json=None,
+             expect=(200,), auth=False, weight=1):
+    """Build a scenario, filling in the defaults."""
+    return {
+        "name": name,
+        "method": method,
+        "path": path,
+        "params": params or {},
+        "json": json,
+        "expect": expect,
+        "auth": auth,
+        "weight": weight,
+        "source": source,
+    }
+
+
+SCENARIOS = [
+    scenario("health", "/api/health", "test_main.test_health_check"),
+    scenario("csv", "/api/csv", "test_main.test_csv_endpoint", weight=3),
+    scenario("csv_stream", "/api/csv", "test_main.test_csv_endpoint_stream_parity",
+             params={"format": "csv"}),
+    scenario("tech_radar", "/api/tech-radar/json",
+             "test_main.test_tech_radar_json_endpoint", weight=3),
+    scenario("json", "/api/json", "test_main.test_json_endpoint_no_params", weight=3),
+    scenario("json_filtered", "/api/json", "test_main.test_json_endpoint_combined_params",
+             params={"datetime": SEVEN_DAYS_AGO, "archived": "false"}),
+    scenario("repository_project", "/api/repository/project/json",
+             "test_main.test_repository_project_json_with_repos",
+             params={"repositories": "tech-radar"}, weight=2),
+    scenario("banners", "/api/banners", "test_main.test_banner_endpoints", weight=3),
+    scenario("technologies", "/api/technologies", "test_main.test_technologies_endpoint"),
+    scenario("technologies_projects", "/api/technologies/projects",
+             "test_main.test_technologies_projects_endpoint",
+             params={"technology": "Python"}),
+    scenario("addressbook", "/addressbook/api/request",
+             "test_address.test_addressbook_username_query",
+             params={"q": "octocat"}, weight=2),
+    scenario("addressbook_batch", "/addressbook/api/request",
+             "test_address.test_addressbook_batched_query",
+             params={"q": ",".join(BULK_IDENTIFIERS[:200])}),
+    scenario("addressbook_bulk", "/addressbook/api/request/bulk",
+             "test_address.test_addressbook_bulk_matches_single_lookup",
+             method="POST", json={"q": ["octocat", "octo.cat@ons.gov.uk"]}),
+    scenario("addressbook_bulk_large", "/addressbook/api/request/bulk",
+             "test_address.test_addressbook_bulk_large_batch",
+             method="POST", json={"q": BULK_IDENTIFIERS}),
+    scenario("org_historic", "/copilot/api/org/historic",
+             "test_copilot.test_org_historic_get"),
+    scenario("org_rollups", "/copilot/api/org/historic",
+             "test_copilot.test_org_historic_rollups",
+             params={"granularity": "week"}, weight=2),
+    scenario("teams_historic", "/copilot/api/teams/historic",
+             "test_copilot.test_teams_historic_get_with_auth", auth=True),
+]
+
+
+def select_scenarios(names=None, exclude=None, authenticated=False):
+    """Pick scenarios by name.
+
+    Args:
+        names (list): Names of the scenarios to run, or None for all of them.
+        exclude (list): Names of scenarios to leave out.
+        authenticated (bool): Whether a GitHub token is available; scenarios
+            that need one are left out otherwise.
+
+    Returns:
+        list: The selected scenarios.
+
+    Raises:
+        ValueError: If a name does not match any scenario.
+    """
+    known = {item["name"] for item in SCENARIOS}
+    unknown = sorted((set(names or []) | set(exclude or [])) - known)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    return [
+        item for item in SCENARIOS
+        if (names is None or item["name"] in names)
+        and item["name"] not in (exclude or [])
+        and (authenticated or not item["auth"])
+    ]
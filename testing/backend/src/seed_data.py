@@ -0,0 +1,267 @@
+"""
+Seed objects for the local S3 stand-in, laid out as the backend expects them.
+
+The data is small and fixed: enough for every endpoint to return realistic
+responses, and for the values the tests look for (the ``tech-radar``
+repository, the ``octocat`` address book entry, radar quadrant ``"1"`` and so
+on) to be present.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+# Buckets by S3Service bucket key, with the names the backend is pointed at
+BUCKETS = {
+    "main": "local-digital-landscape",
+    "tat": "local-tech-audit-tool-api",
+    "copilot": "local-copilot-usage-dashboard",
+}
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "Go", "R", "HCL", "Shell"]
+
+
+def build_repositories(now):
+    """repositories.json: repository metadata with language breakdowns."""
+    names = ["tech-radar", "another-repo", "digital-landscape", "survey-api",
+             "census-pipeline", "stats-frontend", "legacy-batch", "infra-modules"]
+    repositories = []
+    for i, name in enumerate(names):
+        main, other = LANGUAGES[i % len(LANGUAGES)], LANGUAGES[(i + 3) % len(LANGUAGES)]
+        repositories.append({
+            "name": name,
+            "url": f"https://github.com/ONSdigital/{name}",
+            "visibility": ("PUBLIC", "PRIVATE", "INTERNAL")[i % 3],
+            "is_archived": name == "legacy-batch",
+            # tech-radar is always recent, so the date-filtered tests find it
+            "last_commit": (now - timedelta(days=i * 30)).isoformat(),
+            "technologies": {
+                "languages": [
+                    {"name": main, "percentage": 70.0, "size": 7000 * (i + 1)},
+                    {"name": other, "percentage": 30.0, "size": 3000 * (i + 1)},
+                ]
+            },
+        })
+    return {"metadata": {"last_updated": now.isoformat()}, "repositories": repositories}
+
+
+def build_project(name, short_name, languages, dependencies=()):
+    """One project in the shape read by projectDataTransformer.js."""
+    return {
+        "user": [
+            {"email": f"{short_name}.tech@ons.gov.uk", "roles": ["Technical Contact"],
+             "grade": "SEO"},
+            {"email": f"{short_name}.dm@ons.gov.uk", "roles": ["Delivery Manager"],
+             "grade": "HEO"},
+        ],
+        "details": [{
+            "name": name,
+            "short_name": short_name,
+            "programme_name": "Digital Services",
+            "programme_short_name": "DS",
+            "project_description": f"{name} seed project",
+            "project_dependencies": [
+                {"name": dependency, "description": "Reads its data"}
+                for dependency in dependencies
+            ],
+            "documentation_link": [f"https://example.ons.gov.uk/{short_name}"],
+        }],
+        "stage": "Active Support",
+        "developed": ["In House", ""],
+        "source_control": [{
+            "type": "GitHub",
+            "links": [{"url": f"https://github.com/ONSdigital/{short_name}",
+                       "description": "Main repository"}],
+        }],
+        "architecture": {
+            "languages": {"main": languages[:1], "others": languages[1:]},
+            "frameworks": {"main": [], "others": ["Flask", "React"]},
+            "hosting": {"type": ["Cloud"], "details": ["AWS"]},
+            "environments": {"dev": True, "int": False, "uat": True, "preprod": True,
+                             "prod": True, "postprod": False},
+            "cicd": {"main": [], "others": ["GitHub Actions", "Concourse"]},
+            "database": {"main": ["PostgreSQL"], "others": ["S3"]},
+            "infrastructure": {"main": [], "others": ["Terraform"]},
+            "publishing": {"main": ["Internal"], "others": []},
+        },
+        "supporting_tools": {
+            "code_editors": {"main": ["VSCode"], "others": ["PyCharm"]},
+            "user_interface": {"main": [], "others": ["Figma"]},
+            "diagrams": {"main": [], "others": ["Draw.io"]},
+            "documentation": {"main": [], "others": ["MkDocs", "Confluence"]},
+            "communication": {"main": [], "others": ["Slack"]},
+            "collaboration": {"main": [], "others": ["GitHub"]},
+            "project_tracking": "Jira",
+            "incident_management": "ServiceNow",
+            "miscellaneous": [{"name": "Sonar", "description": "Code quality"}],
+        },
+    }
+
+
+def build_project_data():
+    """new_project_data.json: Tech Audit Tool projects."""
+    return {"projects": [
+        build_project("Digital Landscape", "digital-landscape",
+                      ["JavaScript", "Python", "HCL"]),
+        build_project("Tech Radar", "tech-radar", ["JavaScript", "TypeScript"],
+                      dependencies=["Digital Landscape"]),
+        build_project("Survey API", "survey-api", ["Python", "Go"]),
+        build_project("Census Pipeline", "census-pipeline", ["Java", "python"],
+                      dependencies=["Survey API"]),
+    ]}
+
+
+def build_radar():
+    """onsRadarSkeleton.json: tech radar quadrants, rings and entries."""
+    quadrants = [{"id": str(i), "name": name} for i, name in
+                 enumerate(["Languages", "Frameworks", "Supporting Tools", "Infrastructure"], 1)]
+    rings = [{"id": ring, "name": ring.capitalize(), "color": colour} for ring, colour in
+             [("adopt", "#5ba300"), ("trial", "#009eb0"), ("assess", "#c7ba00"),
+              ("hold", "#e09b96")]]
+    entries = [
+        {
+            "id": name.lower(),
+            "title": name,
+            "description": quadrant_name,
+            "key": name.lower(),
+            "url": "#",
+            "quadrant": quadrant,
+            "timeline": [{"moved": 0, "ringId": ring, "date": "2024-01-01",
+                          "description": "Added to the radar"}],
+            "links": [],
+        }
+        for name, quadrant, quadrant_name, ring in [
+            ("Python", "1", "Languages", "adopt"),
+            ("JavaScript", "1", "Languages", "adopt"),
+            ("Go", "1", "Languages", "trial"),
+            ("React", "2", "Frameworks", "adopt"),
+            ("Flask", "2", "Frameworks", "trial"),
+            ("Jira", "3", "Supporting Tools", "adopt"),
+            ("Terraform", "4", "Infrastructure", "adopt"),
+            ("Concourse", "4", "Infrastructure", "hold"),
+        ]
+    ]
+    return {"title": "ONS Tech Radar", "quadrants": quadrants, "rings": rings,
+            "entries": entries}
+
+
+def build_address_book():
+    """The three AddressBook/ lookup maps."""
+    users = [("octocat", "octo.cat@ons.gov.uk", 583231),
+             ("anotheruser", "another.user@ons.gov.uk", 100001)]
+    return {
+        "AddressBook/addressBookUsernameKey.json": {u: e for u, e, _ in users},
+        "AddressBook/addressBookEmailKey.json": {e: u for u, e, _ in users},
+        "AddressBook/addressBookIDKey.json": {u: i for u, _, i in users},
+    }
+
+
+def build_daily_usage(day, scale):
+    """One day of Copilot usage in the GitHub metrics API shape."""
+    return {
+        "date": day.isoformat(),
+        "total_active_users": 40 * scale,
+        "total_engaged_users": 30 * scale,
+        "copilot_ide_code_completions": {
+            "total_engaged_users": 25 * scale,
+            "editors": [{
+                "name": "vscode",
+                "total_engaged_users": 25 * scale,
+                "models": [{
+                    "name": "default",
+                    "is_custom_model": False,
+                    "total_engaged_users": 25 * scale,
+                    "languages": [
+                        {"name": language.lower(), "total_engaged_users": 10 * scale,
+                         "total_code_suggestions": (200 + day.day * 3) * scale,
+                         "total_code_acceptances": (60 + day.day) * scale,
+                         "total_code_lines_suggested": (300 + day.day * 4) * scale,
+                         "total_code_lines_accepted": (90 + day.day) * scale}
+                        for language in ("Python", "JavaScript")
+                    ],
+                }],
+            }],
+        },
+        "copilot_ide_chat": {
+            "total_engaged_users": 12 * scale,
+            "editors": [{
+                "name": "vscode",
+                "total_engaged_users": 12 * scale,
+                "models": [{"name": "default", "is_custom_model": False,
+                            "total_engaged_users": 12 * scale,
+                            "total_chats": (30 + day.day) * scale,
+                            "total_chat_insertion_events": 8 * scale,
+                            "total_chat_copy_events": 5 * scale}],
+            }],
+        },
+        "copilot_dotcom_chat": {"total_engaged_users": 0},
+        "copilot_dotcom_pull_requests": {"total_engaged_users": 0},
+    }
+
+
+def build_copilot_usage(today, days=90):
+    """historic_usage_data.json and teams_history.json for the last `days` days."""
+    dates = [today - timedelta(days=offset) for offset in range(days, 0, -1)]
+    teams = [
+        {"team": {"slug": slug, "name": name, "description": "",
+                  "url": f"https://github.com/orgs/ONSdigital/teams/{slug}"},
+         "data": [build_daily_usage(day, 1) for day in dates]}
+        for slug, name in [("keh-dev", "KEH Dev"), ("survey-team", "Survey Team")]
+    ]
+    return [build_daily_usage(day, 3) for day in dates], teams
+
+
+def build_seed_objects(now=None):
+    """Build every seed object.
+
+    Args:
+        now (datetime): Reference time for commit dates and usage history.
+
+    Returns:
+        dict: Objects keyed by ``(bucket key, object key)``, where the bucket
+        key is one of ``main``, ``tat`` or ``copilot``.
+    """
+    now = now or datetime.now(timezone.utc)
+    historic_usage, teams_history = build_copilot_usage(now.date())
+
+    objects = {
+        ("main", "repositories.json"): build_repositories(now),
+        ("main", "onsRadarSkeleton.json"): build_radar(),
+        ("main", "messages.json"): {"messages": [{
+            "title": "Welcome",
+            "message": "Local test data",
+            "description": "Local test data",
+            "type": "info",
+            "pages": ["radar", "statistics"],
+            "show": True,
+        }]},
+        ("main", "directorates.json"): [
+            {"id": 1, "name": "Digital Services", "colour": "#1f4d7a", "enabled": True},
+            {"id": 2, "name": "Data Science Campus", "colour": "#2e8540", "enabled": True},
+        ],
+        ("tat", "new_project_data.json"): build_project_data(),
+        ("tat", "array_data.json"): {
+            "languages": LANGUAGES,
+            "frameworks": ["Flask", "React", "Django"],
+            "infrastructure": ["Terraform", "AWS", "GCP"],
+        },
+        ("copilot", "historic_usage_data.json"): historic_usage,
+        ("copilot", "teams_history.json"): teams_history,
+        ("copilot", "admin_teams.json"): ["keh-dev"],
+    }
+    for key, data in build_address_book().items():
+        objects[("main", key)] = data
+    return objects
+
+
+def seed(server, objects=None, buckets=None):
+    """Store the seed objects in a LocalS3Server.
+
+    Args:
+        server (LocalS3Server): The running stand-in.
+        objects (dict): Objects from build_seed_objects() (built if omitted).
+        buckets (dict): Bucket names by bucket key (BUCKETS if omitted).
+    """
+    objects = objects if objects is not None else build_seed_objects()
+    buckets = buckets or BUCKETS
+    for (bucket, key), data in objects.items():
+        server.put_object(buckets[bucket], key, data)
+
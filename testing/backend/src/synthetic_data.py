@@ -0,0 +1,453 @@
+"""
+Deterministic synthetic datasets for testing the backend at scale.
+
+Generates the objects the backend reads from S3, in the same shapes as the
+real data, for any size from hundreds to millions of records. The output is a
+directory laid out by S3Service bucket key (``main/``, ``tat/``, ``copilot/``),
+ready to be loaded into the local S3 stand-in:
+
+    main/repositories.json
+    main/onsRadarSkeleton.json
+    main/messages.json
+    main/directorates.json
+    main/AddressBook/addressBook{Email,Username,ID}Key.json
+    tat/new_project_data.json
+    tat/array_data.json
+    copilot/historic_usage_data.json
+    copilot/teams_history.json
+    copilot/admin_teams.json
+    manifest.json
+
+Every record is written as it is generated, so memory use stays flat however
+large the dataset. The same seed, scale, number of days and reference date
+always produce the same bytes. The small fixed records from ``seed_data.py``
+are always included, so the functional tests find the values they look for.
+
+Usage:
+    python3 src/synthetic_data.py --out data/10k --scale 10000 --seed 1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+
+import seed_data
+
+# Technology vocabularies, most used first; picks follow a Zipf-like curve
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "Go", "R", "HCL", "Shell",
+             "SQL", "Scala", "C#", "Kotlin", "Ruby", "Rust", "PHP", "SAS", "Groovy",
+             "Dockerfile", "Makefile", "HTML", "CSS", "Jupyter Notebook", "Perl", "C++"]
+FRAMEWORKS = ["React", "Flask", "Django", "Spring Boot", "Express", "FastAPI", "Angular",
+              "Vue", "Next.js", "Pandas", "PySpark", "Streamlit", "Jest", "Pytest"]
+INFRASTRUCTURE = ["AWS", "GCP", "Terraform", "Kubernetes", "Docker", "Azure", "Ansible",
+                  "CloudFormation", "Helm", "OpenShift"]
+CICD = ["GitHub Actions", "Concourse", "Jenkins", "GitLab CI", "Cloud Build", "CodePipeline"]
+DATABASES = ["PostgreSQL", "MySQL", "DynamoDB", "BigQuery", "MongoDB", "Redis", "Oracle",
+             "S3", "Cloud SQL", "Elasticsearch"]
+TOOLS = {
+    "code_editors": ["VSCode", "PyCharm", "IntelliJ", "Vim", "RStudio", "Eclipse"],
+    "user_interface": ["Figma", "Sketch", "Adobe XD", "Balsamiq"],
+    "diagrams": ["Draw.io", "Lucidchart", "Miro", "Mermaid", "PlantUML"],
+    "documentation": ["MkDocs", "Confluence", "Sphinx", "GitHub Pages", "Docusaurus"],
+    "communication": ["Slack", "Microsoft Teams", "Google Chat", "Email"],
+    "collaboration": ["GitHub", "Miro", "Google Workspace", "SharePoint"],
+}
+PROJECT_TRACKING = ["Jira", "GitHub Projects", "Trello", "Azure DevOps"]
+INCIDENT_MANAGEMENT = ["ServiceNow", "PagerDuty", "Opsgenie", "Jira Service Management"]
+STAGES = ["Active Support", "Development", "Unsupported", "Decommissioned"]
+EDITORS = ["vscode", "jetbrains", "neovim", "visualstudio"]
+COPILOT_LANGUAGES = ["python", "javascript", "typescript", "java", "go", "r", "terraform",
+                     "markdown", "yaml", "sql"]
+QUADRANTS = ["Languages", "Frameworks", "Supporting Tools", "Infrastructure"]
+RINGS = ["adopt", "trial", "assess", "hold"]
+
+
+class Picker:
+    """Picks values with a Zipf-like frequency, so a few are very common.
+
+    Args:
+        rng (random.Random): Random source shared by the generator.
+        values (list): Values, most common first.
+    """
+
+    def __init__(self, rng, values):
+        self.rng = rng
+        self.values = values
+        self.cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(values))))
+
+    def one(self):
+        """Pick one value."""
+        return self.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+    def some(self, low, high):
+        """Pick between `low` and `high` distinct values."""
+        count = self.rng.randint(low, min(high, len(self.values)))
+        picked = []
+        while len(picked) < count:
+            value = self.one()
+            if value not in picked:
+                picked.append(value)
+        return picked
+
+
+def dataset_sizes(scale, days=365):
+    """Record counts for a dataset of the given scale.
+
+    Args:
+        scale (int): Number of repositories and address book users.
+        days (int): Days of Copilot usage history.
+
+    Returns:
+        dict: Number of records of each kind.
+    """
+    return {
+        "repositories": scale,
+        "users": scale,
+        "projects": max(10, scale // 20),
+        "radar_entries": min(max(20, scale // 100), 1000),
+        "teams": max(2, min(scale // 2000, 100)),
+        "days": days,
+    }
+
+
+def write_array(file, items):
+    """Write an iterable as a JSON array, one item at a time."""
+    file.write("[")
+    for i, item in enumerate(items):
+        if i:
+            file.write(",\n")
+        file.write(json.dumps(item, separators=(",", ":")))
+    file.write("]")
+
+
+def write_object(file, pairs):
+    """Write an iterable of (key, value) pairs as a JSON object, one pair at a time."""
+    file.write("{")
+    for i, (key, value) in enumerate(pairs):
+        if i:
+            file.write(",\n")
+        file.write(f"{json.dumps(key)}:{json.dumps(value, separators=(',', ':'))}")
+    file.write("}")
+
+
+class SyntheticDataset:
+    """Generator for one dataset.
+
+    Args:
+        scale (int): Number of repositories and address book users; the other
+            record counts follow from it (see dataset_sizes).
+        seed (int): Random seed.
+        days (int): Days of Copilot usage history.
+        reference_date (date): Last day of the usage history; commit dates
+            are spread over the five years before it.
+    """
+
+    def __init__(self, scale, seed=0, days=365, reference_date=None):
+        self.scale = scale
+        self.seed = seed
+        self.sizes = dataset_sizes(scale, days)
+        self.reference_date = reference_date or datetime.now(timezone.utc).date()
+        self.now = datetime.combine(self.reference_date, datetime.min.time(), timezone.utc)
+        self.anchors = seed_data.build_seed_objects(self.now)
+
+    def rng(self, name):
+        """Random source for one object, independent of the order objects are written in."""
+        return random.Random(f"{self.seed}:{name}")
+
+    def repositories(self):
+        """Repository records for repositories.json."""
+        yield from self.anchors[("main", "repositories.json")]["repositories"]
+        rng = self.rng("repositories")
+        languages = Picker(rng, LANGUAGES)
+        visibilities = ["INTERNAL"] * 5 + ["PRIVATE"] * 3 + ["PUBLIC"] * 2
+        for i in range(self.sizes["repositories"]):
+            names = languages.some(1, 5)
+            shares = [rng.random() + 0.05 for _ in names]
+            total = sum(shares)
+            # Most repositories were committed to recently; a long tail has not been
+            age = min(int(rng.expovariate(1 / 180)), 5 * 365)
+            yield {
+                "name": f"repo-{i:07d}",
+                "url": f"https://github.com/ONSdigital/repo-{i:07d}",
+                "visibility": rng.choice(visibilities),
+                "is_archived": rng.random() < 0.12,
+                "last_commit": (self.now - timedelta(days=age, seconds=rng.randrange(86400)))
+                .isoformat(),
+                "technologies": {
+                    "languages": [
+                        {"name": name, "percentage": round(share / total * 100, 3),
+                         "size": int(share / total * rng.randint(1_000, 5_000_000))}
+                        for name, share in zip(names, shares)
+                    ]
+                },
+            }
+
+    def projects(self):
+        """Project records for new_project_data.json."""
+        yield from self.anchors[("tat", "new_project_data.json")]["projects"]
+        rng = self.rng("projects")
+        languages = Picker(rng, LANGUAGES)
+        frameworks = Picker(rng, FRAMEWORKS)
+        infrastructure = Picker(rng, INFRASTRUCTURE)
+        cicd = Picker(rng, CICD)
+        databases = Picker(rng, DATABASES)
+        tools = {group: Picker(rng, values) for group, values in TOOLS.items()}
+        count = self.sizes["projects"]
+
+        for i in range(count):
+            short_name = f"project-{i:06d}"
+            project = seed_data.build_project(
+                f"Project {i:06d}", short_name, languages.some(1, 4),
+                dependencies=[f"Project {rng.randrange(count):06d}"
+                              for _ in range(rng.randint(0, 2))])
+            # Some names are entered in a different case, as in the real data
+            if rng.random() < 0.05:
+                project["architecture"]["languages"]["others"].append(languages.one().lower())
+            architecture = project["architecture"]
+            architecture["frameworks"]["others"] = frameworks.some(0, 3)
+            architecture["infrastructure"]["others"] = infrastructure.some(1, 3)
+            architecture["cicd"]["others"] = cicd.some(1, 2)
+            architecture["database"]["main"] = databases.some(0, 2)
+            architecture["database"]["others"] = databases.some(0, 2)
+            architecture["hosting"]["type"] = [rng.choice(["Cloud", "On-premises", "Hybrid"])]
+            architecture["environments"] = {
+                env: rng.random() < 0.7 for env in ("dev", "int", "uat", "preprod", "prod",
+                                                    "postprod")}
+            for group, picker in tools.items():
+                project["supporting_tools"][group] = {"main": picker.some(0, 1),
+                                                      "others": picker.some(0, 2)}
+            project["supporting_tools"]["project_tracking"] = rng.choice(PROJECT_TRACKING)
+            project["supporting_tools"]["incident_management"] = rng.choice(
+                INCIDENT_MANAGEMENT)
+            project["stage"] = rng.choices(STAGES, weights=[6, 3, 1, 1])[0]
+            project["developed"] = (["In House", ""] if rng.random() < 0.8
+                                    else ["Partnership", "Supplier Ltd"])
+            yield project
+
+    def radar(self):
+        """onsRadarSkeleton.json, with entries drawn from the technology vocabularies."""
+        radar = self.anchors[("main", "onsRadarSkeleton.json")]
+        rng = self.rng("radar")
+        pool = [(name, "1") for name in LANGUAGES] + [(name, "2") for name in FRAMEWORKS] \
+            + [(name, "3") for values in TOOLS.values() for name in values] \
+            + [(name, "4") for name in INFRASTRUCTURE + CICD + DATABASES]
+        seen = {entry["id"] for entry in radar["entries"]}
+        entries = list(radar["entries"])
+        for i in range(self.sizes["radar_entries"]):
+            name, quadrant = pool[i % len(pool)]
+            if i >= len(pool):
+                name = f"{name} {i // len(pool) + 1}"
+            entry_id = name.lower().replace(" ", "-")
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            timeline = []
+            day = self.reference_date - timedelta(days=rng.randint(30, 1500))
+            for moved in range(rng.randint(1, 4)):
+                timeline.append({"moved": 0 if moved == 0 else rng.choice([-1, 1]),
+                                 "ringId": rng.choice(RINGS), "date": day.isoformat(),
+                                 "description": f"Reviewed {name}"})
+                day += timedelta(days=rng.randint(30, 365))
+            entries.append({"id": entry_id, "title": name,
+                            "description": QUADRANTS[int(quadrant) - 1], "key": entry_id,
+                            "url": "#", "quadrant": quadrant, "timeline": timeline,
+                            "links": []})
+        return {**radar, "entries": entries}
+
+    def users(self):
+        """(username, email, account ID) for the address book."""
+        usernames = self.anchors[("main", "AddressBook/addressBookUsernameKey.json")]
+        ids = self.anchors[("main", "AddressBook/addressBookIDKey.json")]
+        for username, email in usernames.items():
+            yield username, email, ids[username]
+        for i in range(self.sizes["users"]):
+            yield f"user{i:07d}", f"user.{i:07d}@ons.gov.uk", 10_000_000 + i
+
+    def daily_usage(self, rng, day, users, breadth=1.0):
+        """One day of Copilot usage for `users` seats, in the GitHub metrics API shape.
+
+        `breadth` scales how many editors and languages appear; teams use fewer
+        than the whole organisation.
+        """
+        weekend = day.weekday() >= 5
+        engaged = max(1, int(users * rng.uniform(0.05, 0.15) if weekend
+                             else users * rng.uniform(0.5, 0.8)))
+        editors = []
+        for editor in EDITORS[:max(1, int(rng.randint(2, len(EDITORS)) * breadth))]:
+            languages = []
+            for language in rng.sample(COPILOT_LANGUAGES,
+                                       max(1, int(rng.randint(3, 8) * breadth))):
+                suggestions = int(engaged * rng.uniform(5, 40))
+                accepted = int(suggestions * rng.uniform(0.2, 0.4))
+                languages.append({
+                    "name": language,
+                    "total_engaged_users": max(1, engaged // 4),
+                    "total_code_suggestions": suggestions,
+                    "total_code_acceptances": accepted,
+                    "total_code_lines_suggested": int(suggestions * rng.uniform(1.2, 2.5)),
+                    "total_code_lines_accepted": int(accepted * rng.uniform(1.2, 2.5)),
+                })
+            editors.append({"name": editor, "total_engaged_users": max(1, engaged // 2),
+                            "models": [{"name": "default", "is_custom_model": False,
+                                        "total_engaged_users": max(1, engaged // 2),
+                                        "languages": languages}]})
+        chats = int(engaged * rng.uniform(1, 6))
+        return {
+            "date": day.isoformat(),
+            "total_active_users": int(engaged * 1.3),
+            "total_engaged_users": engaged,
+            "copilot_ide_code_completions": {"total_engaged_users": engaged,
+                                             "editors": editors},
+            "copilot_ide_chat": {
+                "total_engaged_users": max(1, engaged // 3),
+                "editors": [{"name": "vscode", "total_engaged_users": max(1, engaged // 3),
+                             "models": [{"name": "default", "is_custom_model": False,
+                                         "total_engaged_users": max(1, engaged // 3),
+                                         "total_chats": chats,
+                                         "total_chat_insertion_events": chats // 4,
+                                         "total_chat_copy_events": chats // 3}]}],
+            },
+            "copilot_dotcom_chat": {"total_engaged_users": 0},
+            "copilot_dotcom_pull_requests": {"total_engaged_users": 0},
+        }
+
+    def usage_days(self):
+        """Days of usage history, oldest first, ending the day before the reference date."""
+        return [self.reference_date - timedelta(days=offset)
+                for offset in range(self.sizes["days"], 0, -1)]
+
+    def org_usage(self):
+        """Daily records for historic_usage_data.json."""
+        rng = self.rng("org_usage")
+        seats = max(50, self.scale // 10)
+        for day in self.usage_days():
+            yield self.daily_usage(rng, day, seats)
+
+    def teams(self):
+        """Team records for teams_history.json."""
+        rng = self.rng("teams")
+        days = self.usage_days()
+        slugs = [team["team"]["slug"] for team in self.anchors[("copilot", "teams_history.json")]]
+        slugs += [f"team-{i:04d}" for i in range(self.sizes["teams"])]
+        for slug in slugs:
+            members = rng.randint(3, 40)
+            yield {
+                "team": {"slug": slug, "name": slug.replace("-", " ").title(),
+                         "description": "",
+                         "url": f"https://github.com/orgs/ONSdigital/teams/{slug}"},
+                "data": [self.daily_usage(rng, day, members, 0.5) for day in days],
+            }
+
+    def write(self, out_dir):
+        """Write the dataset and its manifest.
+
+        Args:
+            out_dir (str): Directory to write to; created if needed.
+
+        Returns:
+            dict: The manifest: parameters, record counts and each object's size
+            and SHA-256.
+        """
+        started = time.monotonic()
+        objects = {
+            ("main", "repositories.json"): lambda f: (
+                f.write('{"metadata":'
+                        + json.dumps({"last_updated": self.now.isoformat()})
+                        + ',"repositories":'),
+                write_array(f, self.repositories()), f.write("}")),
+            ("main", "onsRadarSkeleton.json"): lambda f: json.dump(self.radar(), f),
+            ("main", "AddressBook/addressBookUsernameKey.json"): lambda f: write_object(
+                f, ((u, e) for u, e, _ in self.users())),
+            ("main", "AddressBook/addressBookEmailKey.json"): lambda f: write_object(
+                f, ((e, u) for u, e, _ in self.users())),
+            ("main", "AddressBook/addressBookIDKey.json"): lambda f: write_object(
+                f, ((u, i) for u, _, i in self.users())),
+            ("tat", "new_project_data.json"): lambda f: (
+                f.write('{"projects":'), write_array(f, self.projects()), f.write("}")),
+            ("copilot", "historic_usage_data.json"): lambda f: write_array(
+                f, self.org_usage()),
+            ("copilot", "teams_history.json"): lambda f: write_array(f, self.teams()),
+        }
+        # Small objects are not scaled
+        for key in [("main", "messages.json"), ("main", "directorates.json"),
+                    ("tat", "array_data.json"), ("copilot", "admin_teams.json")]:
+            objects[key] = lambda f, data=self.anchors[key]: json.dump(data, f)
+
+        files = {}
+        for (bucket, key), write in objects.items():
+            path = os.path.join(out_dir, bucket, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                write(file)
+            files[f"{bucket}/{key}"] = {"bytes": os.path.getsize(path),
+                                        "sha256": file_sha256(path)}
+
+        manifest = {
+            "seed": self.seed,
+            "scale": self.scale,
+            "reference_date": self.reference_date.isoformat(),
+            "records": self.sizes,
+            "files": files,
+            "generated_in_seconds": round(time.monotonic() - started, 2),
+        }
+        with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        return manifest
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_dataset(server, out_dir, buckets=None):
+    """Store a generated dataset in a LocalS3Server.
+
+    Args:
+        server (LocalS3Server): The running stand-in.
+        out_dir (str): Directory written by SyntheticDataset.write().
+        buckets (dict): Bucket names by bucket key (seed_data.BUCKETS if omitted).
+    """
+    buckets = buckets or seed_data.BUCKETS
+    for bucket, name in buckets.items():
+        root = os.path.join(out_dir, bucket)
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                key = os.path.relpath(path, root).replace(os.sep, "/")
+                with open(path, "rb") as file:
+                    server.put_object(name, key, file.read())
+
+
+def main(argv=None):
+    """Generate a dataset from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0].strip())
+    parser.add_argument("--out", required=True, help="directory to write the dataset to")
+    parser.add_argument("--scale", type=int, default=1000,
+                        help="repositories and address book users (100 to 1,000,000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365, help="days of Copilot usage history")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=None,
+                        help="last day of the usage history, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    manifest = SyntheticDataset(args.scale, args.seed, args.days, args.reference_date) \
+        .write(args.out)
+    for key, info in manifest["files"].items():
+        print(f"{key:<50}{info['bytes']:>14,} bytes")
+    print(f"Generated in {manifest['generated_in_seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
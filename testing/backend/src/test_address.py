@@ -2,6 +2,7 @@
 This module contains the test cases for the address book API endpoints.
 """
 
+import json
 import os
 import requests
 
@@ -13,6 +14,14 @@ GITHUB_TOKEN = os.environ.get('TEST_GITHUBUSERTOKEN')
 # Set up cookies if ever needed (addressbook endpoints do not require auth)
 AUTH_COOKIES = {"githubUserToken": GITHUB_TOKEN} if GITHUB_TOKEN else {}
 
+# Identifiers sent by the batched lookup; its latency is gated by the
+# addressbook_batch benchmark scenario
+BATCH_SIZE = 200
+
+# Identifiers sent by the large bulk request; its throughput is gated by the
+# addressbook_bulk_large benchmark scenario
+BULK_SIZE = 20000
+
 
 def test_addressbook_missing_query():
 	"""Test should return 400 when the query is missing or empty.
@@ -160,3 +169,99 @@ def test_addressbook_split_trim():
 				"fullname",
 			]:
 				assert key in first
+
+
+def test_addressbook_batched_query():
+	"""Batched lookups should agree with the bulk endpoint and be stable.
+
+	Expects:
+	- 200 status and a JSON list for every request
+	- The users found match those the bulk endpoint finds for the same identifiers
+	- Repeating the batch returns the same result
+	"""
+	identifiers = [
+		f"user{i}" if i % 2 else f"first{i}.last{i}@ons.gov.uk" for i in range(BATCH_SIZE)
+	]
+	batch = ",".join(identifiers)
+
+	# The first request may load the index from S3
+	first = requests.get(f"{BASE_URL}/api/request", params={"q": batch}, timeout=30)
+	assert first.status_code == 200
+	assert isinstance(first.json(), list)
+
+	repeat = requests.get(f"{BASE_URL}/api/request", params={"q": batch}, timeout=10)
+	assert repeat.status_code == 200
+	assert repeat.json() == first.json()
+
+	bulk = requests.post(
+		f"{BASE_URL}/api/request/bulk", json={"q": identifiers}, timeout=30
+	)
+	assert bulk.status_code == 200
+	rows = [json.loads(line) for line in bulk.iter_lines() if line]
+	found = {row["username"].lower() for row in rows if row["found"]}
+	assert found == {item["username"].lower() for item in first.json()}
+
+
+def test_addressbook_bulk_missing_input():
+	"""The bulk endpoint should reject a request without identifiers.
+
+	Expects:
+	- 400 status for a missing or empty "q"
+	- 413 status when more than 50,000 identifiers are sent
+	"""
+	for body in [{}, {"q": []}, {"q": " , ,"}]:
+		response = requests.post(f"{BASE_URL}/api/request/bulk", json=body, timeout=10)
+		assert response.status_code == 400
+		assert response.json()["error"].lower() == "missing input"
+
+	response = requests.post(
+		f"{BASE_URL}/api/request/bulk",
+		json={"q": [f"user{i}" for i in range(50001)]},
+		timeout=30,
+	)
+	assert response.status_code == 413
+
+
+def test_addressbook_bulk_matches_single_lookup():
+	"""Bulk results should agree with the GET endpoint.
+
+	Expects:
+	- 200 status and an NDJSON response
+	- One line per unique identifier (case-insensitive), in input order
+	- Found users match those returned by GET /api/request
+	"""
+	identifiers = ["octocat", "OctoCat", "octo.cat@ons.gov.uk", "anotheruser", "nobody"]
+	response = requests.post(
+		f"{BASE_URL}/api/request/bulk", json={"q": identifiers}, timeout=10
+	)
+	assert response.status_code == 200
+	assert response.headers["Content-Type"].startswith("application/x-ndjson")
+	rows = [json.loads(line) for line in response.iter_lines() if line]
+	assert [row["input"] for row in rows] == [
+		"octocat", "octo.cat@ons.gov.uk", "anotheruser", "nobody"
+	]
+
+	expected = requests.get(
+		f"{BASE_URL}/api/request", params={"q": ",".join(identifiers)}, timeout=10
+	).json()
+	found = {row["username"].lower() for row in rows if row["found"]}
+	assert found == {item["username"].lower() for item in expected}
+
+
+def test_addressbook_bulk_large_batch():
+	"""Resolve a large batch of identifiers in one streamed request.
+
+	Expects:
+	- 200 status
+	- One streamed result per identifier, in input order
+	"""
+	identifiers = [
+		f"user{i}" if i % 2 else f"first{i}.last{i}@ons.gov.uk" for i in range(BULK_SIZE)
+	]
+
+	with requests.post(
+		f"{BASE_URL}/api/request/bulk", json={"q": identifiers}, stream=True, timeout=60
+	) as response:
+		assert response.status_code == 200
+		inputs = [json.loads(line)["input"] for line in response.iter_lines() if line]
+	assert inputs == identifiers
@@ -2,8 +2,13 @@
 This module contains the test cases for the admin API endpoints.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 import requests
 
+from local_s3 import LocalS3Server, backend_available
+
 BASE_URL = "http://localhost:5001"
 
 
@@ -220,21 +225,30 @@ def test_admin_banner_toggle_invalid():
 
     Test Data:
         - Invalid index (non-numeric)
+        - Non-integer index
         - Out of range index
         - Missing index
+        - Missing or non-boolean visibility
 
     Expects:
         - 400 status code
-        - Error message indicating invalid index
+        - Error message indicating invalid index or visibility
     """
-    # Test with string index
-    response = requests.post(
-        f"{BASE_URL}/admin/api/banners/toggle",
-        json={"index": "not-a-number", "show": True},
-        timeout=10
-    )
-    assert response.status_code == 400
-    assert "Invalid banner index" in response.json()["error"]
+    # Test with string and non-integer indexes
+    for index in ("not-a-number", 1.5, -0.5):
+        response = requests.post(
+            f"{BASE_URL}/admin/api/banners/toggle",
+            json={"index": index, "show": True},
+            timeout=10
+        )
+        assert response.status_code == 400
+        assert "Invalid banner index" in response.json()["error"]
+
+    # Test with missing and non-boolean visibility
+    for body in ({"index": 0}, {"index": 0, "show": "yes"}):
+        response = requests.post(f"{BASE_URL}/admin/api/banners/toggle", json=body, timeout=10)
+        assert response.status_code == 400
+        assert "Invalid banner visibility" in response.json()["error"]
 
     # Test with missing index
     response = requests.post(
@@ -375,6 +389,174 @@ def test_admin_banner_delete_invalid():
     assert response.status_code == 400
     assert "Banner index out of range" in response.json()["error"]
 
+
+def test_admin_banner_batch():
+    """Test the admin banners batch endpoint.
+
+    This test verifies that an ordered list of operations is applied to
+    the banner messages in a single update.
+
+    Endpoint:
+        POST /admin/api/banners/batch
+
+    Test Data:
+        - Two added banners, a toggle of the first and a delete of both
+
+    Expects:
+        - 200 status code for each batch
+        - Indexes refer to the messages as left by earlier operations
+        - The returned messages match a subsequent GET request
+    """
+    banners = requests.get(f"{BASE_URL}/admin/api/banners", timeout=10).json()["messages"]
+    first = len(banners)
+
+    response = requests.post(
+        f"{BASE_URL}/admin/api/banners/batch",
+        json={"operations": [
+            {"action": "add", "banner": {"message": "Batch Banner 1", "pages": ["radar"]}},
+            {"action": "add", "banner": {"message": "Batch Banner 2", "pages": ["statistics"]}},
+            {"action": "toggle", "index": first, "show": False},
+        ]},
+        timeout=10
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["message"] == "Banners updated successfully"
+    assert data["messages"][first]["message"] == "Batch Banner 1"
+    assert data["messages"][first]["show"] is False
+    assert data["messages"][first + 1]["message"] == "Batch Banner 2"
+    assert data["messages"][first + 1]["show"] is True
+
+    get_response = requests.get(f"{BASE_URL}/admin/api/banners", timeout=10)
+    assert get_response.json()["messages"] == data["messages"]
+
+    # Deleting the first banner moves the second one to its index
+    response = requests.post(
+        f"{BASE_URL}/admin/api/banners/batch",
+        json={"operations": [
+            {"action": "delete", "index": first},
+            {"action": "delete", "index": first},
+        ]},
+        timeout=10
+    )
+    assert response.status_code == 200
+    messages = [banner["message"] for banner in response.json()["messages"]]
+    assert "Batch Banner 1" not in messages
+    assert "Batch Banner 2" not in messages
+
+
+def test_admin_banner_batch_invalid():
+    """Test the admin banners batch endpoint with invalid operations.
+
+    Endpoint:
+        POST /admin/api/banners/batch
+
+    Test Data:
+        - Missing and empty operations lists
+        - An unknown action
+        - A valid add followed by an out of range delete
+
+    Expects:
+        - 400 status code with an error message for each
+        - No operation in a rejected batch is applied
+    """
+    for body in ({}, {"operations": []}):
+        response = requests.post(f"{BASE_URL}/admin/api/banners/batch", json=body, timeout=10)
+        assert response.status_code == 400
+        assert response.json()["error"] == "Invalid banner operations"
+
+    response = requests.post(
+        f"{BASE_URL}/admin/api/banners/batch",
+        json={"operations": [{"action": "rename", "index": 0}]},
+        timeout=10
+    )
+    assert response.status_code == 400
+    assert response.json()["error"] == "Invalid banner action"
+
+    before = requests.get(f"{BASE_URL}/admin/api/banners", timeout=10).json()["messages"]
+    response = requests.post(
+        f"{BASE_URL}/admin/api/banners/batch",
+        json={"operations": [
+            {"action": "add", "banner": {"message": "Rejected Batch Banner", "pages": ["radar"]}},
+            {"action": "delete", "index": len(before) + 100},
+        ]},
+        timeout=10
+    )
+    assert response.status_code == 400
+    assert "Banner index out of range" in response.json()["error"]
+
+    after = requests.get(f"{BASE_URL}/admin/api/banners", timeout=10).json()["messages"]
+    assert after == before
+
+
+BANNER_WRITER_SCRIPT = """
+const bannerService = require('./src/services/bannerService');
+
+const worker = process.env.BANNER_WORKER;
+const count = parseInt(process.env.BANNER_COUNT, 10);
+
+(async () => {
+  const results = await Promise.all(
+    Array.from({ length: count }, (_, i) =>
+      bannerService.mutate([
+        {
+          action: 'add',
+          banner: { message: `${worker}-${i}`, pages: ['radar'] },
+        },
+      ])
+    )
+  );
+  console.log('RESULT ' + JSON.stringify(results.map(result => result.attempts)));
+})().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
+"""
+
+
+@pytest.mark.skipif(not backend_available(), reason="backend dependencies not installed")
+def test_admin_banner_concurrent_mutations(run_node_script):
+    """Test that concurrent banner mutations from several instances are not lost.
+
+    Unlike the other tests in this module, this test does not need a running
+    backend. It starts three Node.js processes against a LocalS3Server, each
+    adding banners through BannerService concurrently, so that conditional
+    writes conflict both within and between processes.
+
+    Test Data:
+        - 3 processes x 10 concurrent single-banner additions
+
+    Expects:
+        - Every banner is present in messages.json afterwards
+        - Each attempt made exactly one conditional PUT, and conflicting
+          attempts were retried rather than overwriting other writes
+    """
+    bucket, key, workers, count = "bench-main", "messages.json", 3, 10
+    local_s3 = LocalS3Server().start()
+    try:
+        local_s3.put_object(bucket, key, {"messages": []})
+
+        def write(worker):
+            return run_node_script(BANNER_WRITER_SCRIPT, local_s3.endpoint, {
+                "BUCKET_NAME": bucket,
+                "BANNER_COUNT": str(count),
+                "BANNER_WRITE_ATTEMPTS": "50",
+                "BANNER_WORKER": f"worker{worker}",
+            }, timeout=120)
+
+        # One thread per process, so that the processes write concurrently
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            attempts = [attempt for result in pool.map(write, range(workers))
+                        for attempt in result]
+
+        messages = [banner["message"] for banner in local_s3.get_object(bucket, key)["messages"]]
+
+        assert sorted(messages) == sorted(
+            f"worker{worker}-{i}" for worker in range(workers) for i in range(count))
+        assert local_s3.request_count("PUT", bucket, key) == sum(attempts)
+    finally:
+        local_s3.stop()
+
 # Helper functions for array data tests
 def _get_initial_array_data(base_url):
     """Fetches the current array_data.json from the server."""
@@ -568,3 +750,82 @@ def test_admin_normalise_technology_invalid():
     response3 = requests.post(f"{BASE_URL}/admin/api/normalise-technology", json=payload3, timeout=10)
     assert response3.status_code == 400
     assert response3.json()["error"] == "Both 'from' and 'to' values are required"
+
+
+def test_admin_normalise_technology_bulk_dry_run():
+    """Test a dry run of the bulk technology normalisation endpoint.
+
+    Endpoint: POST /admin/api/normalise-technology/bulk
+    Test Data:
+        - A case-insensitive mapping with one name that is not in use
+    Expects:
+        - 200 status code
+        - A hit count for every name in the mapping
+        - Repeating the dry run gives the same counts, as nothing is saved
+    """
+    payload = {
+        "mapping": {"NonExistentTech123": "SomeNewTechABC", "python": "Python"},
+        "caseInsensitive": True,
+        "dryRun": True,
+    }
+    response = requests.post(
+        f"{BASE_URL}/admin/api/normalise-technology/bulk", json=payload, timeout=10)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["message"] == "Technology normalisation dry run completed"
+    assert data["dryRun"] is True
+    assert set(data["hits"]) == {"NonExistentTech123", "python"}
+    assert data["hits"]["NonExistentTech123"] == 0
+    assert data["replacements"] == sum(data["hits"].values())
+    assert isinstance(data["updatedProjects"], int)
+
+    repeat = requests.post(
+        f"{BASE_URL}/admin/api/normalise-technology/bulk", json=payload, timeout=10)
+    assert repeat.status_code == 200
+    assert repeat.json() == data
+
+
+def test_admin_normalise_technology_bulk():
+    """Test applying a bulk technology normalisation.
+
+    Endpoint: POST /admin/api/normalise-technology/bulk
+    Test Data:
+        - A mapping of names that are not in use, given as pairs
+    Expects:
+        - 200 status code
+        - No projects are updated
+    """
+    payload = {"mapping": [
+        {"from": "NonExistentTech123", "to": "SomeNewTechABC"},
+        {"from": "NonExistentTech456", "to": "SomeNewTechABC"},
+    ]}
+    response = requests.post(
+        f"{BASE_URL}/admin/api/normalise-technology/bulk", json=payload, timeout=10)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["message"] == "Technology names normalised successfully"
+    assert data["dryRun"] is False
+    assert data["updatedProjects"] == 0
+    assert data["hits"] == {"NonExistentTech123": 0, "NonExistentTech456": 0}
+
+
+def test_admin_normalise_technology_bulk_invalid():
+    """Test the bulk technology normalisation endpoint with invalid mappings.
+
+    Endpoint: POST /admin/api/normalise-technology/bulk
+    Expects:
+        - 400 status code for a missing or empty mapping, an empty name,
+          and a name mapped to two different technologies
+    """
+    invalid_payloads = [
+        {},
+        {"mapping": {}},
+        {"mapping": {"OldTech": ""}},
+        {"mapping": [{"from": "OldTech"}]},
+        {"mapping": {"oldtech": "NewTech", "OLDTECH": "OtherTech"}, "caseInsensitive": True},
+    ]
+    for payload in invalid_payloads:
+        response = requests.post(
+            f"{BASE_URL}/admin/api/normalise-technology/bulk", json=payload, timeout=10)
+        assert response.status_code == 400
+        assert response.json()["error"].startswith("Invalid mapping")
@@ -0,0 +1,120 @@
+"""
+This module benchmarks each endpoint scenario and fails on latency regressions.
+
+The endpoint benchmarks only run with ``--benchmark``; see ``benchmark.py``
+for how the samples are taken and compared with the baseline. The tests of the
+comparison itself always run and do not need a running backend.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from benchmark import BASELINE_VERSION, BenchmarkSession, compare, mann_whitney_p
+from scenarios import scenario, select_scenarios
+
+
+@pytest.mark.parametrize(
+    "item", select_scenarios(authenticated=bool(os.environ.get("TEST_GITHUBUSERTOKEN"))),
+    ids=lambda item: item["name"])
+def test_endpoint_latency(item, benchmark_session, request):
+    """Benchmark one endpoint scenario against its baseline.
+
+    Expects:
+        - Every sampled request succeeds
+        - p95 latency has not regressed beyond the threshold, unless the run
+          is recording a new baseline
+    """
+    if benchmark_session is None:
+        pytest.skip("run with --benchmark")
+
+    _, result, comparison = benchmark_session.run(item)
+    failed = [status for status in result["statuses"] if status not in item["expect"]]
+    assert not failed, f"{item['name']} returned {failed[:5]}"
+
+    if comparison and comparison["regressed"] and not request.config.getoption(
+            "--benchmark-save"):
+        pytest.fail(f"Latency regression: {benchmark_session.describe(item['name'])}",
+                    pytrace=False)
+
+
+def summary(latencies):
+    """A baseline-style summary of some latencies."""
+    ordered = sorted(latencies)
+    return {"p95_ms": ordered[int(len(ordered) * 0.95) - 1], "latencies_ms": latencies}
+
+
+def test_benchmark_comparison():
+    """Test the regression check.
+
+    Test Data:
+        - 30 baseline samples around 20ms, compared with samples from the same
+          distribution, a 50% slower one and a distribution with one outlier
+
+    Expects:
+        - No regression for the same distribution or a single outlier
+        - A regression, with a small p-value, for the slower samples
+        - No comparison without a baseline
+    """
+    rng = random.Random(1)
+    baseline = summary([rng.gauss(20, 1) for _ in range(30)])
+    same = summary([rng.gauss(20, 1) for _ in range(30)])
+    slower = summary([rng.gauss(30, 1.5) for _ in range(30)])
+    outlier = summary([rng.gauss(20, 1) for _ in range(29)] + [200])
+
+    assert not compare(baseline, same)["regressed"]
+    assert not compare(baseline, outlier)["regressed"]
+    result = compare(baseline, slower)
+    assert result["regressed"]
+    assert result["change"] > 0.4
+    assert result["p_value"] < 0.001
+    assert compare(None, slower) is None
+
+    assert mann_whitney_p([1, 2, 3], [1, 2, 3]) > 0.4
+    assert mann_whitney_p([5] * 10, [5] * 10) == 1.0
+
+
+def test_benchmark_baseline_round_trip(tmp_path, monkeypatch):
+    """Test saving a baseline and comparing a later run with it.
+
+    Test Data:
+        - A run of 20ms samples saved as the baseline, then a run of 40ms samples
+
+    Expects:
+        - The baseline file records its format version, dataset and samples
+        - The second run is reported as a regression naming the endpoint,
+          dataset size and payload size
+        - A baseline with another format version is rejected
+    """
+    item = scenario("json", "/api/json", "test_main.test_json_endpoint_no_params")
+    dataset = {"name": "scale-1000-seed-0", "repositories": 1000, "bytes": 123456}
+    path = tmp_path / "baseline.json"
+
+    def run_with(latency):
+        monkeypatch.setattr("benchmark.measure", lambda *args, **kwargs: {
+            "latencies": [latency + i % 3 * 0.1 for i in range(30)],
+            "sizes": [5000] * 30, "statuses": [200] * 30})
+        session = BenchmarkSession("http://localhost:5001", dataset, path)
+        return session, session.run(item)
+
+    first, (_, _, comparison) = run_with(20)
+    assert comparison is None
+    first.save()
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["version"] == BASELINE_VERSION
+    assert saved["dataset"] == dataset
+    assert len(saved["endpoints"]["json"]["latencies_ms"]) == 30
+
+    second, (_, _, comparison) = run_with(40)
+    assert comparison["regressed"]
+    description = second.describe("json")
+    assert "GET /api/json" in description
+    assert "1,000 repositories" in description
+    assert "payload 5,000 bytes" in description
+    assert second.report()[0].startswith("REGRESSED")
+
+    path.write_text(json.dumps({**saved, "version": BASELINE_VERSION + 1}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        BenchmarkSession("http://localhost:5001", dataset, path)
@@ -3,10 +3,13 @@ This module contains the test cases for the copilot API endpoints.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import pytest
 
 BASE_URL = "http://localhost:5001/copilot"
+METRICS_URL = "http://localhost:5001/metrics"
 
 # Get authentication token from environment variable
 GITHUB_TOKEN = os.environ.get('TEST_GITHUBUSERTOKEN')
@@ -71,6 +74,72 @@ def test_org_historic_get():
         assert "copilot_ide_chat" in first_item and isinstance(first_item["copilot_ide_chat"], dict)
         assert "copilot_ide_code_completions" in first_item and isinstance(first_item["copilot_ide_code_completions"], dict)
 
+def test_org_historic_rollups():
+    """Test the copilot org historic endpoint's rollups and date ranges.
+
+    Endpoint:
+        GET /api/org/historic?granularity=&since=&until=
+
+    Expects:
+        - With since= and until=, the raw days within the range, sorted by date
+        - With granularity=month, one point per month whose metrics are the
+          sums of that month's raw data
+        - Weekly points that add up to the same totals as the monthly points
+        - 400 status code for an invalid granularity or date
+    """
+    data = requests.get(f"{BASE_URL}/api/org/historic", timeout=10).json()
+    if not data:
+        pytest.skip("No organisation historic data")
+
+    dates = sorted(day["date"][:10] for day in data)
+    since, until = dates[len(dates) // 3], dates[2 * len(dates) // 3]
+    sliced = requests.get(
+        f"{BASE_URL}/api/org/historic",
+        params={"since": since, "until": until},
+        timeout=10
+    )
+    assert sliced.status_code == 200
+    assert [day["date"][:10] for day in sliced.json()] == [
+        date for date in dates if since <= date <= until]
+
+    monthly = requests.get(
+        f"{BASE_URL}/api/org/historic",
+        params={"granularity": "month"},
+        timeout=10
+    )
+    assert monthly.status_code == 200
+    rollups = monthly.json()
+    assert rollups["granularity"] == "month"
+
+    expected = {}
+    for day in data:
+        month = day["date"][:7]
+        completions = expected.setdefault(month, {"suggestions": 0, "chats": 0})
+        for editor in day["copilot_ide_code_completions"].get("editors", []):
+            for model in editor.get("models", []):
+                for lang in model.get("languages", []):
+                    completions["suggestions"] += lang.get("total_code_suggestions", 0)
+        for editor in day["copilot_ide_chat"].get("editors", []):
+            for model in editor.get("models", []):
+                completions["chats"] += model.get("total_chats", 0)
+
+    assert [point["date"] for point in rollups["points"]] == sorted(expected)
+    for point in rollups["points"]:
+        assert point["completions"]["suggestions"] == expected[point["date"]]["suggestions"]
+        assert point["chat"]["chats"] == expected[point["date"]]["chats"]
+    assert rollups["totals"]["days"] == len(data)
+
+    weekly = requests.get(
+        f"{BASE_URL}/api/org/historic",
+        params={"granularity": "week"},
+        timeout=10
+    ).json()
+    assert weekly["totals"] == rollups["totals"]
+
+    for params in ({"granularity": "year"}, {"granularity": "day", "since": "not-a-date"}):
+        invalid = requests.get(f"{BASE_URL}/api/org/historic", params=params, timeout=10)
+        assert invalid.status_code == 400
+
 def test_teams_historic_get_no_auth():
     """Test the copilot teams historic get endpoint without authentication.
 
@@ -110,6 +179,10 @@ def test_teams_historic_get_with_auth():
     Expects:
         - Either 200 status code with team live data
         - Or 500 status code with "Resource not accessible by integration" error
+        - Each team's daily data sorted by date
+        - With teams=, since= and until=, only the requested team and the
+          days within the range, matching a slice of the full response
+        - 400 status code for an invalid date
     """
     if not GITHUB_TOKEN:
         pytest.skip("TEST_GITHUBUSERTOKEN not set")
@@ -153,6 +226,46 @@ def test_teams_historic_get_with_auth():
             assert "copilot_ide_chat" in first_day and isinstance(first_day["copilot_ide_chat"], dict)
             assert "copilot_ide_code_completions" in first_day and isinstance(first_day["copilot_ide_code_completions"], dict)
 
+    for team in data:
+        dates = [day["date"][:10] for day in team["data"]]
+        assert dates == sorted(dates)
+
+    # Request one team and the middle of its date range
+    team = next((team for team in data if len(team["data"]) >= 3), None)
+    if team is None:
+        return
+    dates = [day["date"][:10] for day in team["data"]]
+    since, until = dates[len(dates) // 3], dates[2 * len(dates) // 3]
+    sliced = requests.get(
+        f"{BASE_URL}/api/teams/historic",
+        params={"teams": team["team"]["slug"], "since": since, "until": until},
+        cookies=AUTH_COOKIES,
+        timeout=10
+    )
+    assert sliced.status_code == 200
+    assert sliced.json() == [{
+        "team": team["team"],
+        "data": [day for day in team["data"] if since <= day["date"][:10] <= until],
+    }]
+
+    # Open-ended ranges
+    since_only = requests.get(
+        f"{BASE_URL}/api/teams/historic",
+        params={"teams": team["team"]["slug"], "since": until},
+        cookies=AUTH_COOKIES,
+        timeout=10
+    ).json()
+    assert [day["date"][:10] for day in since_only[0]["data"]] == [
+        date for date in dates if date >= until]
+
+    invalid = requests.get(
+        f"{BASE_URL}/api/teams/historic",
+        params={"since": "not-a-date"},
+        cookies=AUTH_COOKIES,
+        timeout=10
+    )
+    assert invalid.status_code == 400
+
 
 def test_teams_get_no_auth():
     """Test the teams get endpoint without authentication.
@@ -195,3 +308,111 @@ def test_teams_get_with_auth():
         assert "slug" in first_team and isinstance(first_team["slug"], str)
         assert "name" in first_team and isinstance(first_team["name"], str)
         assert "url" in first_team and isinstance(first_team["url"], str)
+
+def test_teams_members_no_auth():
+    """Test the bulk team members endpoint without authentication.
+
+    Expects:
+        - 401 status code
+        - JSON response with error message
+    """
+    response = requests.post(
+        f"{BASE_URL}/api/teams/members", json={"teams": ["team-a"]}, timeout=10)
+    assert response.status_code == 401
+    assert "Missing GitHub user token" in response.json()["error"]
+
+def test_teams_members_with_auth():
+    """Test the bulk team members endpoint with authentication.
+
+    This test requires TEST_GITHUBUSERTOKEN to be set.
+
+    Expects:
+        - 400 status code when no teams are given
+        - 200 status code with members keyed by team slug for the user's own teams
+    """
+    if not GITHUB_TOKEN:
+        pytest.skip("TEST_GITHUBUSERTOKEN not set")
+
+    response = requests.post(
+        f"{BASE_URL}/api/teams/members", json={}, cookies=AUTH_COOKIES, timeout=10)
+    assert response.status_code == 400
+
+    teams = requests.get(f"{BASE_URL}/api/teams", cookies=AUTH_COOKIES, timeout=10).json()
+    slugs = teams.get("userTeamSlugs", [])[:3]
+    if not slugs:
+        pytest.skip("User is not a member of any teams")
+
+    response = requests.post(
+        f"{BASE_URL}/api/teams/members", json={"teams": slugs}, cookies=AUTH_COOKIES, timeout=30)
+    if response.status_code == 500 and "Resource not accessible by integration" in response.text:
+        pytest.xfail("GitHub API permission error: Resource not accessible by integration")
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(data.keys()) == sorted(set(slugs))
+    for members in data.values():
+        assert isinstance(members, list)
+
+def cache_counters(cache):
+    """Scrape the backend metrics for a cache's hit and miss counters.
+
+    Returns:
+        dict: ``hits`` and ``misses`` totals, or None if metrics are disabled.
+    """
+    response = requests.get(METRICS_URL, timeout=10)
+    if response.status_code == 404:
+        return None
+    assert response.status_code == 200
+    counters = {"hits": 0.0, "misses": 0.0}
+    for line in response.text.splitlines():
+        for name in counters:
+            series = f'cache_{name}_total{{cache="{cache}"}} '
+            if line.startswith(series):
+                counters[name] = float(line[len(series):])
+    return counters
+
+
+def test_copilot_page_load_cached():
+    """Test that the Copilot page endpoints share the cached user teams.
+
+    A dashboard page load calls /teams, /admin/status and /teams/historic
+    together. After the first load, the user's teams and admin_teams.json are
+    served from the backend caches, which is checked with the cache counters
+    from /metrics.
+
+    This test requires TEST_GITHUBUSERTOKEN to be set, and the backend to be
+    started with METRICS_ENABLED=true.
+
+    Expects:
+        - Concurrent page loads return the same admin status and team slugs
+        - Warm page loads add hits but no misses to the user teams and S3 object caches
+    """
+    if not GITHUB_TOKEN:
+        pytest.skip("TEST_GITHUBUSERTOKEN not set")
+
+    paths = ["/api/teams", "/api/admin/status", "/api/teams/historic"]
+
+    def page_load():
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            return list(executor.map(
+                lambda path: requests.get(f"{BASE_URL}{path}", cookies=AUTH_COOKIES, timeout=30),
+                paths))
+
+    responses = page_load()
+    if responses[0].status_code != 200:
+        pytest.skip(f"Copilot teams unavailable: {responses[0].status_code}")
+    expected = responses[0].json()
+
+    before = {cache: cache_counters(cache) for cache in ("github_user_teams", "s3_objects")}
+    if None in before.values():
+        pytest.skip("metrics endpoint disabled, start the backend with METRICS_ENABLED=true")
+
+    for _ in range(5):
+        responses = page_load()
+        teams, status = responses[0].json(), responses[1].json()
+        assert teams["isAdmin"] == status["isAdmin"] == expected["isAdmin"]
+        assert teams["userTeamSlugs"] == status["userTeamSlugs"] == expected["userTeamSlugs"]
+
+    for cache, counters in before.items():
+        after = cache_counters(cache)
+        assert after["misses"] == counters["misses"], cache
+        assert after["hits"] > counters["hits"], cache
@@ -0,0 +1,184 @@
+"""
+This module tests the asyncio load harness against an in-process HTTP server.
+
+Unlike the other test modules, these tests do not need a running backend.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from load_harness import format_stages, format_table, parse_server_timing, percentile, run_load
+from scenarios import SCENARIOS, scenario, select_scenarios
+
+# Simulated service time of the in-process server, in seconds
+SERVICE_TIME = 0.01
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves fixed responses: Content-Length (with Server-Timing), chunked, 429
+    and a JSON echo."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output quiet."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve the fixed responses."""
+        time.sleep(SERVICE_TIME)
+        if self.path.startswith("/ok"):
+            self._send(200, b'{"ok": true}', {
+                "Server-Timing": 's3_get;desc="2 calls";dur=6.5, query;dur=0.5, total;dur=10.2'})
+        elif self.path.startswith("/chunked"):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in (b"a" * 100, b"b" * 50):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path.startswith("/limited"):
+            self._send(429, b'{"error": "Too many requests"}')
+        else:
+            self._send(404, b"")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Echo the request body."""
+        time.sleep(SERVICE_TIME)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(200, body)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url():
+    """Start the in-process HTTP server."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    host, port = httpd.server_address[:2]
+    yield f"http://{host}:{port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scenarios_come_from_the_test_suite():
+    """Test that every scenario names the test it is taken from.
+
+    Expects:
+        - Unique scenario names
+        - Each source refers to an existing test function
+        - Scenarios needing authentication are only selected with a token
+    """
+    names = [item["name"] for item in SCENARIOS]
+    assert len(names) == len(set(names))
+    for item in SCENARIOS:
+        module, test = item["source"].split(".")
+        assert callable(getattr(__import__(module), test))
+
+    assert all(not item["auth"] for item in select_scenarios())
+    assert any(item["auth"] for item in select_scenarios(authenticated=True))
+    with pytest.raises(ValueError):
+        select_scenarios(["no_such_scenario"])
+
+
+def test_percentile():
+    """Test the nearest-rank percentile.
+
+    Expects:
+        - p50, p95 and p99 of 1..100 are 50, 95 and 99
+        - None for no values
+    """
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([3], 99) == 3
+    assert percentile([], 50) is None
+
+
+def test_parse_server_timing():
+    """Test parsing Server-Timing headers.
+
+    Expects:
+        - Durations by metric name, with descriptions ignored
+        - Metrics without a valid duration are left out
+    """
+    header = 's3_get;desc="2 calls";dur=12.5, query;dur=0.4, cache, bad;dur=x, total;dur=15'
+    assert parse_server_timing(header) == {"s3_get": 12.5, "query": 0.4, "total": 15.0}
+    assert not parse_server_timing(None)
+
+
+def test_load_harness_closed_loop(server_url):
+    """Test a closed-loop run over a mix of scenarios.
+
+    Test Data:
+        - 4 virtual users for 1 second, with 10ms simulated service time
+
+    Expects:
+        - Every response is read, whether sized by Content-Length or chunked
+        - 429 responses are reported as errors and in the 429 rate
+        - Throughput is bounded by concurrency / service time
+        - Latency percentiles are ordered and at least the service time
+        - Server-Timing stages are collected for the endpoint that sends them
+    """
+    scenarios = [
+        scenario("ok", "/ok", "local"),
+        scenario("chunked", "/chunked", "local"),
+        scenario("limited", "/limited", "local"),
+        scenario("echo", "/echo", "local", method="POST", json={"q": ["octocat"]}),
+    ]
+    report = asyncio.run(run_load(
+        base_url=server_url, scenarios=scenarios, mode="closed", concurrency=4,
+        duration=1.0, warmup=0.2, seed=1))
+    print("\n" + format_table(report))
+
+    results = {result["scenario"]: result for result in report["endpoints"]}
+    assert all(result["requests"] > 0 for result in results.values())
+    assert results["ok"]["error_rate"] == 0
+    assert results["chunked"]["mean_bytes"] == 150
+    assert results["echo"]["mean_bytes"] == len('{"q": ["octocat"]}')
+    assert results["limited"]["error_rate"] == 1
+    assert results["limited"]["rate_429"] == 1
+    assert results["ok"]["server_timing"]["s3_get"]["mean_ms"] == 6.5
+    assert results["ok"]["server_timing"]["total"]["p95_ms"] == 10.2
+    assert not results["chunked"]["server_timing"]
+    assert "s3_get" in format_stages(report)
+
+    total = report["total"]
+    # One request per user may finish just after the window closes
+    assert total["requests"] <= 4 * (1.0 / SERVICE_TIME + 1)
+    latency = total["latency_ms"]
+    assert SERVICE_TIME * 1000 <= latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+
+def test_load_harness_open_loop(server_url):
+    """Test an open-loop run at a constant arrival rate.
+
+    Test Data:
+        - 50 requests per second for 1 second
+
+    Expects:
+        - About 50 requests are made, independent of the response times
+        - No errors or dropped arrivals
+    """
+    report = asyncio.run(run_load(
+        base_url=server_url, scenarios=[scenario("ok", "/ok", "local")], mode="open",
+        rate=50, arrival="constant", duration=1.0, warmup=0, seed=1))
+
+    total = report["total"]
+    assert 45 <= total["requests"] <= 51
+    assert total["error_rate"] == 0
+    assert total["dropped"] == 0
@@ -2,7 +2,13 @@
 This module contains the test cases for the backend API.
 """
 
+import csv
+import gzip
+import io
+import json
+import time
 from datetime import datetime, timedelta
+import pytest
 import requests
 
 BASE_URL = "http://localhost:5001"
@@ -26,6 +32,7 @@ def test_health_check():
             - Server uptime in seconds
             - Memory usage statistics
             - Process ID
+            - GitHub installation token metrics
     """
     response = requests.get(f"{BASE_URL}/api/health", timeout=10)
     assert response.status_code == 200
@@ -35,6 +42,40 @@ def test_health_check():
     assert "uptime" in data
     assert "memory" in data
     assert "pid" in data
+    assert "acquisitions" in data["githubInstallationToken"]
+
+
+def test_metrics_endpoint():
+    """Test the Prometheus metrics endpoint.
+
+    This test makes a request to the health check endpoint and then scrapes
+    the metrics, checking that the request was counted under its route
+    template and that the internal metrics are exposed.
+
+    Endpoint:
+        GET /metrics
+
+    Skipped unless the backend was started with METRICS_ENABLED=true.
+
+    Expects:
+        - 200 status code with a Prometheus text exposition
+        - A latency histogram series for the /api/health route
+        - Cache, rate limiter, installation token, event loop and memory metrics
+    """
+    requests.get(f"{BASE_URL}/api/health", timeout=10)
+    response = requests.get(f"{BASE_URL}/metrics", timeout=10)
+    if response.status_code == 404:
+        pytest.skip("metrics endpoint disabled, start the backend with METRICS_ENABLED=true")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+
+    text = response.text
+    assert ('http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}'
+            in text)
+    for name in ("http_response_bytes_total", "cache_hits_total", "rate_limit_rejections_total",
+                 "github_token_acquisitions_total", "nodejs_eventloop_lag_seconds",
+                 "process_memory_bytes"):
+        assert f"# TYPE {name} " in text
 
 
 def test_csv_endpoint():
@@ -64,6 +105,120 @@ def test_csv_endpoint():
         assert len(first_item.keys()) > 1  # Verify it's not empty
 
 
+def test_precompressed_responses():
+    """Test that large responses are served from the compressed response cache.
+
+    The compressed copies are built in the background after the first request,
+    so each endpoint is requested until the encoding asked for is served.
+
+    Endpoints:
+        GET /api/csv
+        GET /api/tech-radar/json
+        GET /copilot/api/org/historic
+
+    Expects:
+        - gzip and br Content-Encoding when accepted, with Vary: Accept-Encoding
+        - A gzip body that decompresses to the uncompressed response
+        - 304 status code for a request with the response's ETag
+    """
+    def fetch(path, encoding):
+        for _ in range(20):
+            response = requests.get(f"{BASE_URL}{path}", headers={"Accept-Encoding": encoding},
+                                    stream=True, timeout=30)
+            body = response.raw.read(decode_content=False)
+            if response.headers.get("Content-Encoding") == encoding:
+                return response, body
+            time.sleep(1)
+        raise AssertionError(f"{path} was not served with {encoding} encoding")
+
+    for path in ("/api/csv", "/api/tech-radar/json", "/copilot/api/org/historic"):
+        plain = requests.get(f"{BASE_URL}{path}", headers={"Accept-Encoding": "identity"},
+                             timeout=30)
+        assert plain.status_code == 200
+        assert "Content-Encoding" not in plain.headers
+
+        response, body = fetch(path, "gzip")
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(body) == plain.content
+
+        response, body = fetch(path, "br")
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert 0 < len(body) < len(plain.content)
+
+        cached = requests.get(f"{BASE_URL}{path}",
+                              headers={"If-None-Match": plain.headers["ETag"]}, timeout=30)
+        assert cached.status_code == 304
+
+
+def test_csv_endpoint_stream_parity():
+    """Test the streamed CSV and NDJSON forms of the CSV data endpoint.
+
+    This test reads each streamed format incrementally and verifies that it
+    contains the same rows as the JSON form, and that field projection limits
+    the returned columns.
+
+    Endpoint:
+        GET /api/csv?format=csv
+        GET /api/csv?format=ndjson
+        GET /api/csv?format=ndjson&fields=Project,Stage
+
+    Expects:
+        - 200 status code and the matching content type for each format
+        - CSV header matching the JSON keys, with one row per JSON entry
+        - CSV cells equal to the JSON values (arrays and objects as JSON text)
+        - NDJSON lines equal to the JSON entries
+        - Projected rows containing only the requested fields
+        - 400 status code for an unknown field or format
+    """
+    expected = requests.get(f"{BASE_URL}/api/csv", timeout=10).json()
+
+    with requests.get(f"{BASE_URL}/api/csv", params={"format": "csv"},
+                      stream=True, timeout=10) as response:
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/csv")
+        response.raw.decode_content = True
+        reader = csv.reader(io.TextIOWrapper(response.raw, encoding="utf-8", newline=""))
+        header = next(reader)
+        if expected:
+            assert header == list(expected[0].keys())
+        rows = list(reader)
+        assert len(rows) == len(expected)
+        for row, item in zip(rows, expected):
+            assert len(row) == len(header)
+            for key, cell in zip(header, row):
+                value = item[key]
+                if isinstance(value, (list, dict)):
+                    assert json.loads(cell) == value
+                elif value is None:
+                    assert cell == ""
+                else:
+                    assert cell == str(value)
+
+    with requests.get(f"{BASE_URL}/api/csv", params={"format": "ndjson"},
+                      stream=True, timeout=10) as response:
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+        assert rows == expected
+
+    response = requests.get(
+        f"{BASE_URL}/api/csv",
+        params={"format": "ndjson", "fields": "Project,Stage"},
+        timeout=10)
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.iter_lines() if line]
+    assert len(rows) == len(expected)
+    for row, item in zip(rows, expected):
+        assert row == {"Project": item.get("Project"), "Stage": item.get("Stage")}
+
+    if expected:
+        response = requests.get(
+            f"{BASE_URL}/api/csv", params={"fields": "NotAField"}, timeout=10)
+        assert response.status_code == 400
+    response = requests.get(f"{BASE_URL}/api/csv", params={"format": "xml"}, timeout=10)
+    assert response.status_code == 400
+
+
 def test_tech_radar_json_endpoint():
     """Test the tech radar JSON endpoint functionality.
 
@@ -411,6 +566,74 @@ def test_repository_project_json_multiple_repos():
     assert "another-repo" in data["metadata"]["requested_repos"]
 
 
+def test_repository_project_json_repeated_params():
+    """Test the repository project JSON endpoint with repeated repository parameters.
+
+    Parameters:
+        repositories (str): Repeated once per repository name
+
+    Example:
+        GET /api/repository/project/json?repositories=tech-radar&repositories=another-repo
+
+    Expects:
+        - 200 status code
+        - Metadata containing every requested repository name
+    """
+    params = [("repositories", "tech-radar"), ("repositories", "another-repo")]
+    response = requests.get(
+        f"{BASE_URL}/api/repository/project/json", params=params, timeout=10)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metadata"]["requested_repos"] == ["tech-radar", "another-repo"]
+
+
+def test_repository_project_json_bulk_post():
+    """Test the bulk (POST) form of the repository project JSON endpoint.
+
+    This test verifies that hundreds of repository names can be requested in
+    one call through the request body, and that the response matches the GET
+    form for the same names.
+
+    Endpoint:
+        POST /api/repository/project/json
+
+    Test Data:
+        - "tech-radar" plus 500 repository names that do not exist
+
+    Expects:
+        - 200 status code
+        - All requested names in metadata.requested_repos
+        - The same found_repos and stats as the GET form for "tech-radar"
+        - 400 status code when the repositories list is empty
+    """
+    names = ["tech-radar"] + [f"missing-repo-{i}" for i in range(500)]
+    response = requests.post(
+        f"{BASE_URL}/api/repository/project/json",
+        json={"repositories": names, "archived": "false"},
+        timeout=10,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["metadata"]["requested_repos"]) == len(names)
+    assert data["metadata"]["filter_archived"] == "false"
+
+    single = requests.get(
+        f"{BASE_URL}/api/repository/project/json",
+        params={"repositories": "tech-radar", "archived": "false"},
+        timeout=10,
+    ).json()
+    assert data["metadata"]["found_repos"] == single["metadata"]["found_repos"]
+    assert data["stats"] == single["stats"]
+
+    response = requests.post(
+        f"{BASE_URL}/api/repository/project/json",
+        json={"repositories": []},
+        timeout=10,
+    )
+    assert response.status_code == 400
+    assert response.json()["error"] == "No repositories specified"
+
+
 def test_repository_project_json_combined_filters():
     """Test the repository project JSON endpoint with multiple filter parameters.
 
@@ -516,3 +739,105 @@ def test_banner_endpoints():
     # Test error case with non-existent endpoint
     response = requests.get(f"{BASE_URL}/api/banners/nonexistent", timeout=10)
     assert response.status_code in [404, 500]
+
+
+def test_banner_endpoints_page_filter():
+    """Test the page filter of the active banners endpoint.
+
+    Endpoint:
+        GET /api/banners?page=<page>
+
+    Expects:
+        - 200 status code for every page, including unknown pages
+        - Only active banners for the requested page (its "page", or "pages"
+          when no single page is set)
+        - The same banners as filtering the unfiltered response
+        - An empty list for a page with no banners
+    """
+    all_active = requests.get(f"{BASE_URL}/api/banners", timeout=10).json()["messages"]
+
+    def for_page(banner, page):
+        if banner.get("page"):
+            return banner["page"] == page
+        return page in (banner.get("pages") or [])
+
+    for page in ["radar", "statistics", "projects"]:
+        response = requests.get(f"{BASE_URL}/api/banners", params={"page": page}, timeout=10)
+        assert response.status_code == 200
+        messages = response.json()["messages"]
+        assert messages == [banner for banner in all_active if for_page(banner, page)]
+        for banner in messages:
+            assert banner["show"] is True
+
+    response = requests.get(
+        f"{BASE_URL}/api/banners", params={"page": "no-such-page"}, timeout=10)
+    assert response.status_code == 200
+    assert response.json() == {"messages": []}
+
+
+def test_technologies_endpoint():
+    """Test the technology usage endpoint.
+
+    Endpoint:
+        GET /api/technologies
+
+    Expects:
+        - 200 status code
+        - Technologies sorted by the number of projects using them
+        - Each technology's per-field counts are no more than its project count
+    """
+    response = requests.get(f"{BASE_URL}/api/technologies", timeout=10)
+    assert response.status_code == 200
+    technologies = response.json()["technologies"]
+    assert isinstance(technologies, list)
+
+    counts = [technology["count"] for technology in technologies]
+    assert counts == sorted(counts, reverse=True)
+    for technology in technologies:
+        assert technology["count"] > 0
+        assert technology["technology"] in technology["variants"]
+        assert all(0 < count <= technology["count"]
+                   for count in technology["fields"].values())
+
+
+def test_technologies_projects_endpoint():
+    """Test looking up the projects that use given technologies.
+
+    Endpoint:
+        GET /api/technologies/projects?technology=<names>
+
+    Test Data:
+        - The most used technologies, requested in lower case
+        - A technology that no project uses
+        - No technology
+
+    Expects:
+        - 200 status code, with each technology matched regardless of case
+        - Project lists whose length and fields agree with the usage counts
+        - Unused technologies listed in not_found
+        - 400 status code when no technology is given
+    """
+    summary = requests.get(f"{BASE_URL}/api/technologies", timeout=10).json()["technologies"]
+    top = summary[:5]
+    names = [technology["technology"].lower() for technology in top]
+
+    response = requests.get(
+        f"{BASE_URL}/api/technologies/projects",
+        params={"technology": ",".join(names + ["NonExistentTech123"])},
+        timeout=10,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["not_found"] == ["NonExistentTech123"]
+    assert [technology["technology"] for technology in data["technologies"]] == [
+        technology["technology"] for technology in top]
+
+    for technology, expected in zip(data["technologies"], top):
+        assert technology["count"] == expected["count"] == len(technology["projects"])
+        assert technology["fields"] == expected["fields"]
+        for field, count in technology["fields"].items():
+            assert count == sum(field in project["fields"] for project in technology["projects"])
+
+    response = requests.get(f"{BASE_URL}/api/technologies/projects", timeout=10)
+    assert response.status_code == 400
+    assert response.json()["error"] == "At least one technology is required"
@@ -0,0 +1,192 @@
+"""
+This module tests the S3Service object cache and the teams historic cache
+against a local S3 stand-in, by counting the requests that reach S3.
+
+Unlike the other test modules, these tests do not need a running backend. They
+load ``backend/src/services/s3Service.js`` in a Node.js subprocess with
+``S3_ENDPOINT`` pointed at an in-process LocalS3Server, so they are skipped when
+Node.js or the backend dependencies are not installed.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from local_s3 import LocalS3Server, backend_available
+
+BUCKET = "bench-main"
+KEY = "repositories.json"
+
+BENCHMARK_SCRIPT = """
+const s3Service = require('./src/services/s3Service');
+
+const read = options =>
+  s3Service.getCachedObject('main', 'repositories.json', options);
+const stats = () => ({ ...s3Service.objectCache.stats });
+
+(async () => {
+  const cold = await read();
+  const afterCold = stats();
+  for (let i = 0; i < 50; i++) await read();
+  const afterWarm = stats();
+  const revalidated = await read({ ttlMs: 0 });
+  const afterRevalidation = stats();
+
+  s3Service.objectCache.delete(`${s3Service.getBucketName('main')}/repositories.json`);
+  await Promise.all(Array.from({ length: 10 }, () => read()));
+
+  console.log('RESULT ' + JSON.stringify({
+    afterCold, afterWarm, afterRevalidation, final: stats(),
+    revalidatedSameData: revalidated.data === cold.data,
+  }));
+})().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
+"""
+
+TEAMS_BUCKET = "bench-copilot"
+TEAMS_KEY = "teams_history.json"
+
+TEAMS_CACHE_SCRIPT = """
+const { PutObjectCommand } = require('@aws-sdk/client-s3');
+const s3Service = require('./src/services/s3Service');
+const {
+  getTeamsHistoricDataWithCache,
+} = require('./src/utilities/teamsHistoricCache');
+
+const bucket = process.env.TEAMS_BUCKET;
+const ttl = parseInt(process.env.TEAMS_CACHE_TTL_MS, 10);
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+// Fire concurrent requests and report the slugs they saw
+const burst = async count => {
+  const results = await Promise.all(
+    Array.from({ length: count }, async () => {
+      const data = await getTeamsHistoricDataWithCache(bucket);
+      return data[0].team.slug;
+    })
+  );
+  return [...new Set(results)];
+};
+
+(async () => {
+  const initial = await burst(20);
+
+  // At expiry: unchanged object, revalidated with a 304
+  await sleep(ttl * 1.5);
+  const unchanged = await burst(50);
+  await sleep(ttl / 2);
+
+  // At expiry: object changed by another writer, downloaded once
+  await s3Service.s3Client.send(new PutObjectCommand({
+    Bucket: bucket,
+    Key: 'teams_history.json',
+    Body: JSON.stringify([{ team: { slug: 'team-b' }, data: [] }]),
+  }));
+  await sleep(ttl * 1.5);
+  const changed = await burst(50);
+  await sleep(ttl / 2);
+  const refreshed = await burst(1);
+
+  console.log('RESULT ' + JSON.stringify({
+    initial, unchanged, changed, refreshed, stats: s3Service.objectCache.stats,
+  }));
+})().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
+"""
+
+
+def build_repositories(count):
+    """Build a repositories.json payload with the given number of repositories."""
+    now = datetime.now(timezone.utc)
+    return {
+        "metadata": {"last_updated": now.isoformat()},
+        "repositories": [
+            {
+                "name": f"repo-{i}",
+                "visibility": ("PUBLIC", "PRIVATE", "INTERNAL")[i % 3],
+                "is_archived": i % 7 == 0,
+                "last_commit": (now - timedelta(days=i % 400)).isoformat(),
+                "technologies": {
+                    "languages": [
+                        {"name": "Python", "percentage": 60.5, "size": 1000 + i},
+                        {"name": "JavaScript", "percentage": 39.5, "size": 500 + i},
+                    ]
+                },
+            }
+            for i in range(count)
+        ],
+    }
+
+
+@pytest.fixture(name="local_s3")
+def fixture_local_s3():
+    """Start a LocalS3Server with a simulated network latency."""
+    server = LocalS3Server(latency=0.05).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.skipif(not backend_available(), reason="backend dependencies not installed")
+def test_s3_cache_cold_vs_warm(local_s3, run_node_script):
+    """Test cold, warm and revalidated reads of repositories.json.
+
+    Test Data:
+        - 5,000 synthetic repositories served with 50ms simulated latency
+
+    Expects:
+        - The cold read is the only one of the first 51 reads to reach S3
+        - A revalidation with an unchanged ETag is answered with a 304 and
+          keeps the parsed data
+        - Ten concurrent misses are collapsed into a single upstream GET
+    """
+    local_s3.put_object(BUCKET, KEY, build_repositories(5000))
+
+    run = run_node_script(BENCHMARK_SCRIPT, local_s3.endpoint, {"BUCKET_NAME": BUCKET})
+
+    assert run["afterCold"]["misses"] == 1
+    assert run["afterWarm"]["hits"] == 50
+    assert run["afterWarm"]["misses"] == 1
+    assert run["afterRevalidation"]["revalidations"] == 1
+    assert run["revalidatedSameData"]
+    assert run["final"]["misses"] == 3
+    # cold + revalidation (304) + one shared fetch for the ten concurrent misses
+    assert local_s3.request_count("GET", BUCKET, KEY) == 3
+
+
+@pytest.mark.skipif(not backend_available(), reason="backend dependencies not installed")
+def test_teams_historic_cache_single_flight(local_s3, run_node_script):
+    """Test that the teams historic cache refreshes once, in the background, at expiry.
+
+    Test Data:
+        - teams_history.json served with 50ms simulated latency and a 400ms cache TTL
+        - 50 concurrent requests once the cache has expired, first with the
+          object unchanged and then after it has been replaced
+
+    Expects:
+        - Requests at expiry are served the stale copy without waiting for S3
+        - Each expiry causes exactly one upstream GET; the unchanged object is
+          revalidated with a 304 and the changed one downloaded
+        - The new data is served once the background refresh has finished
+    """
+    local_s3.put_object(TEAMS_BUCKET, TEAMS_KEY, [{"team": {"slug": "team-a"}, "data": []}])
+
+    run = run_node_script(TEAMS_CACHE_SCRIPT, local_s3.endpoint, {
+        "TEAMS_BUCKET": TEAMS_BUCKET,
+        "TEAMS_CACHE_TTL_MS": "400",
+    })
+
+    # Requests at expiry still see team-a: they were served the stale copy
+    assert run["initial"] == ["team-a"]
+    assert run["unchanged"] == ["team-a"]
+    assert run["changed"] == ["team-a"]
+    assert run["refreshed"] == ["team-b"]
+
+    # initial load + one 304 revalidation + one download of the changed object
+    assert local_s3.request_count("GET", TEAMS_BUCKET, TEAMS_KEY) == 3
+    assert run["stats"]["misses"] == 1
+    assert run["stats"]["staleHits"] == 100
+    assert run["stats"]["revalidations"] == 2
@@ -0,0 +1,113 @@
+"""
+This module tests the synthetic dataset generator.
+
+Unlike the other test modules, these tests do not need a running backend.
+"""
+
+import json
+from datetime import date
+
+from local_s3 import LocalS3Server
+from seed_data import BUCKETS, build_project
+from synthetic_data import SyntheticDataset, dataset_sizes, load_dataset
+
+REFERENCE_DATE = date(2025, 6, 1)
+
+
+def read(out_dir, bucket, key):
+    """Parse one generated object."""
+    with open(out_dir / bucket / key, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_synthetic_data_is_deterministic(tmp_path):
+    """Test that a seed always produces the same bytes.
+
+    Test Data:
+        - Two datasets with seed 1 and one with seed 2, 200 repositories, 30 days
+
+    Expects:
+        - Identical object hashes for the same seed
+        - Different repositories for a different seed
+    """
+    manifests = [
+        SyntheticDataset(200, seed, days=30, reference_date=REFERENCE_DATE)
+        .write(tmp_path / str(i))
+        for i, seed in enumerate([1, 1, 2])
+    ]
+    assert manifests[0]["files"] == manifests[1]["files"]
+    assert manifests[0]["files"]["main/repositories.json"]["sha256"] \
+        != manifests[2]["files"]["main/repositories.json"]["sha256"]
+
+
+def test_synthetic_data_shapes(tmp_path):
+    """Test that the generated objects have the shapes the backend reads.
+
+    Test Data:
+        - 500 repositories with 30 days of usage history
+
+    Expects:
+        - The record counts in the manifest, plus the fixed seed records
+        - Unique repository names and language percentages summing to 100
+        - Projects with the same fields as the seed projects
+        - Address book maps that agree with each other
+        - Usage history for every day before the reference date, for the
+          organisation and every team
+    """
+    manifest = SyntheticDataset(500, 7, days=30, reference_date=REFERENCE_DATE).write(tmp_path)
+    sizes = dataset_sizes(500, 30)
+    assert manifest["records"] == sizes
+
+    repositories = read(tmp_path, "main", "repositories.json")["repositories"]
+    names = [repository["name"] for repository in repositories]
+    assert len(names) == len(set(names)) >= sizes["repositories"]
+    assert "tech-radar" in names
+    for repository in repositories:
+        total = sum(language["percentage"] for language in
+                    repository["technologies"]["languages"])
+        assert abs(total - 100) < 0.1
+
+    projects = read(tmp_path, "tat", "new_project_data.json")["projects"]
+    assert len(projects) >= sizes["projects"]
+    shape = build_project("Name", "name", ["Python"])
+    for project in projects:
+        assert project.keys() == shape.keys()
+        assert project["architecture"].keys() == shape["architecture"].keys()
+        assert project["supporting_tools"].keys() == shape["supporting_tools"].keys()
+
+    by_username = read(tmp_path, "main", "AddressBook/addressBookUsernameKey.json")
+    by_email = read(tmp_path, "main", "AddressBook/addressBookEmailKey.json")
+    by_id = read(tmp_path, "main", "AddressBook/addressBookIDKey.json")
+    assert len(by_username) >= sizes["users"]
+    assert by_username["octocat"] == "octo.cat@ons.gov.uk"
+    assert all(by_email[email] == username for username, email in by_username.items())
+    assert by_id.keys() == by_username.keys()
+
+    radar = read(tmp_path, "main", "onsRadarSkeleton.json")
+    ids = [entry["id"] for entry in radar["entries"]]
+    assert len(ids) == len(set(ids))
+    assert any(entry["quadrant"] == "1" for entry in radar["entries"])
+
+    usage = read(tmp_path, "copilot", "historic_usage_data.json")
+    assert len(usage) == 30
+    assert usage[-1]["date"] == "2025-05-31"
+    teams = read(tmp_path, "copilot", "teams_history.json")
+    assert len(teams) >= sizes["teams"]
+    assert all([day["date"] for day in team["data"]] == [day["date"] for day in usage]
+               for team in teams)
+
+
+def test_synthetic_data_loads_into_local_s3(tmp_path):
+    """Test loading a generated dataset into the local S3 stand-in.
+
+    Expects:
+        - Every object is stored under its bucket and key
+        - The stored objects are the generated files
+    """
+    manifest = SyntheticDataset(100, days=7, reference_date=REFERENCE_DATE).write(tmp_path)
+    server = LocalS3Server()
+    load_dataset(server, tmp_path)
+
+    for path in manifest["files"]:
+        bucket, key = path.split("/", 1)
+        assert server.get_object(BUCKETS[bucket], key) == read(tmp_path, bucket, key)